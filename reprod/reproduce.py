@@ -0,0 +1,116 @@
+"""Reproduce the results of script1.py to script5.py at once.
+
+The figures and the table are written to ``results`` without showing
+any window. The intermediate tables are cached in ``results/.cache``,
+so running this again only redoes what has changed.
+
+Usage::
+
+    python3 reproduce.py [--workers N] [--force]
+"""
+import argparse
+import os
+
+import pandas as pd
+import rsuanalyzer as ra
+
+RESULTS_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), os.pardir, "results")
+THETAS = list(range(0, 91, 1))
+
+SCRIPT3_RINGS = [
+    # (name, ring_id, theta, description)
+    ("syn-T-1", "RLFFRLFFRLFF", 0,
+        "three membered ring in Pd6L4 (L=1)"),
+    ("1,3-alt-S", "RRFFRRBBRRFFRRBB", 0,
+        "four membered ring in Pd6L4 (L=1)"),
+    ("syn-T-1", "RLFFRLFFRLFF", 34,
+        "three membered ring in Pd9L6 (L=2)"),
+    ("syn-S-2", "RRFBRLBBRRFBRLBB", 30,
+        "four membered ring in Pd9L6 (L=2)"),
+    ("syn-S-1", "RRFFLLBBRRFFLLBB", 38,
+        "four membered ring in Pd12L8 (L=2)"),
+]
+
+
+def rsu_vs_theta(ring_id: str, delta_: float = 87) -> ra.ReproTable:
+    return ra.ReproTable(
+        "rsu_vs_theta",
+        {"ring_id": ring_id, "thetas": THETAS, "delta_": delta_})
+
+
+def plot(dfs: list[pd.DataFrame], path: str, labels: list[str]) -> None:
+    ra.plot_rsu_vs_theta(*dfs, labels=labels, show=False).savefig(path)
+
+
+def write_script3_csv(
+        dfs: list[pd.DataFrame], path: str, names: list[str],
+        descriptions: list[str]) -> None:
+    df = dfs[0]
+    pd.DataFrame({
+        "name": names, "ring_id": df["Ring ID"], "theta": df["theta"],
+        "rsu": [f"{rsu:.3f}" for rsu in df["RSU"]],
+        "description": descriptions}).to_csv(path, index=False)
+
+
+TARGETS = [
+    ra.ReproTarget(
+        "script1.png",
+        (rsu_vs_theta("RRFFLLBBRRFFLLBB", 87),
+         rsu_vs_theta("RRFFLLBBRRFFLLBB", 90)),
+        plot, {"labels": ["syn-S-1 (delta=87)", "syn-S-1 (delta=90)"]}),
+    ra.ReproTarget(
+        "script2.png",
+        (rsu_vs_theta("RRFBRLBBRRFBRLBB", 87),
+         rsu_vs_theta("RRFBRLBBRRFBRLBB", 90),
+         rsu_vs_theta("RLFFRLFFRLFF", 87),
+         rsu_vs_theta("RLFFRLFFRLFF", 90)),
+        plot, {"labels": [
+            "syn-S-2 (delta=87)", "syn-S-2 (delta=90)",
+            "syn-T-1 (delta=87)", "syn-T-1 (delta=90)"]}),
+    ra.ReproTarget(
+        "script3.csv",
+        (ra.ReproTable("rsu", {
+            "ring_ids": [ring_id for _, ring_id, _, _ in SCRIPT3_RINGS],
+            "thetas": [theta for _, _, theta, _ in SCRIPT3_RINGS]}),),
+        write_script3_csv, {
+            "names": [name for name, _, _, _ in SCRIPT3_RINGS],
+            "descriptions": [
+                description for _, _, _, description in SCRIPT3_RINGS]}),
+    ra.ReproTarget(
+        "script4.png",
+        (rsu_vs_theta("RRFFLLBBRRFFLLBB", 103),
+         rsu_vs_theta("RRFFLRFBRRFFLLBB", 103)),
+        plot, {"labels": ["syn-S-1 (delta=103)", "syn-S-3 (delta=103)"]}),
+    ra.ReproTarget(
+        "script5.png",
+        (rsu_vs_theta("RRFBRLBBRRFBRLBB"),
+         rsu_vs_theta("RRFFLLBBRRFFLLBB"),
+         rsu_vs_theta("RLFFRLFFRLFF"),
+         ra.ReproTable("min_rsu_vs_theta", {
+             "ring_ids": sorted(ra.enum_ring_ids(2)), "thetas": THETAS})),
+        plot, {"labels": [
+            "syn-S-2", "syn-S-1", "syn-T-1", "min of dimeric rings"]}),
+]
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Reproduce the results of the scripts.")
+    parser.add_argument(
+        "--workers", type=int,
+        help="the number of worker processes; the number of CPUs if "
+        "omitted")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="render all the results again, reusing the cached tables")
+    args = parser.parse_args(argv)
+
+    status = ra.run_reproduction(
+        TARGETS, RESULTS_DIR, workers=args.workers, force=args.force)
+    for path, state in status.items():
+        print(f"{path}: {state}")
+
+
+if __name__ == "__main__":
+    main()
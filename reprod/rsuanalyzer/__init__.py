@@ -1,11 +1,40 @@
-from .analyze_rsu.calc_min_rsu_vs_theta import create_min_rsu_vs_theta_df
+from .analyze_rsu.calc_min_rsu_vs_theta import (
+    create_min_rsu_vs_theta_df, create_min_rsu_vs_theta_multi_n)
 from .analyze_rsu.calc_rsu_vs_theta import create_rsu_vs_theta_df
+from .analyze_rsu.monte_carlo_rsu import create_rsu_monte_carlo_df
 from .analyze_rsu.plot_rsu_vs_theta import plot_rsu_vs_theta
+from .analyze_rsu.reproduction import (ReproTable, ReproTarget,
+                                       run_reproduction)
+from .analyze_rsu.rsu_index import RSUIndex
+from .analyze_rsu.rsu_server import serve_rsu
+from .analyze_rsu.sharded_sweep import merge_shards, plan_sweep, run_shard
 from .analyze_rsu.small_rsu_ranking import create_small_rsu_ranking
 from .core.calc_rsu import calc_rsu
+from .core.calc_rsu_batch import (calc_rsu_batch, calc_rsu_batch_per_site,
+                                  calc_smallest_rsus)
+from .core.calc_rsu_parallel import calc_rsu_parallel
+from .core.certified_min_rsu import (CertifiedMinRSU,
+                                     calc_certified_min_rsu)
+from .core.closure_metrics import calc_closure_metrics
+from .core.ligand_geometry import LigandGeometry
+from .core.rsu_surrogate import RSUSurrogate
+from .core.strain_metrics import (CutChainEnds, calc_strain_metrics,
+                                  register_strain_metric,
+                                  strain_metric_names)
+from .enum_ring_ids.constrained import enum_constrained_ring_ids
+from .enum_ring_ids.count_ring_ids import count_ring_ids
+from .enum_ring_ids.dedupe_ring_ids import dedupe_ring_ids
 from .enum_ring_ids.enum_ring_ids import enum_ring_ids
-from .visualize_chain.carbons import calc_carbon_positions
-from .visualize_chain.metals import calc_metal_positions
+from .enum_ring_ids.incremental import enum_ring_ids_incrementally
+from .enum_ring_ids.rank_ring_ids import (ring_rank, ring_unrank,
+                                          ring_unrank_range)
+from .visualize_chain.animate_chain import animate_chain
+from .visualize_chain.carbons import (calc_carbon_positions,
+                                      calc_carbon_positions_batch)
+from .visualize_chain.export_structures import export_structures
+from .visualize_chain.metals import (calc_metal_positions,
+                                     calc_metal_positions_batch)
+from .visualize_chain.render_chains import render_chains
 from .visualize_chain.visualize_chain import visualize_chain
 
 __all__ = []
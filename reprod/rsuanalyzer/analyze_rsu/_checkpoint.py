@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+import time
+
+
+class _Checkpoint:
+    """Periodically saved state of a long-running calculation.
+
+    The state is a JSON-serializable object, which is saved atomically,
+    i.e. written to a temporary file and then renamed, so that the
+    checkpoint file is always complete. Floats are saved with their
+    shortest exact representation, so the calculation resumed from a
+    checkpoint gives bit-identical results.
+
+    Args:
+        path (str): The path of the checkpoint file.
+        job (object):
+            JSON-serializable description of the calculation, e.g. the
+            name of the function and its arguments. A checkpoint saved
+            for a different job is not resumed.
+        interval (float):
+            The minimum interval between saves in seconds.
+    """
+
+    def __init__(self, path: str, job: object, interval: float) -> None:
+        self.path = path
+        self.job_hash = hashlib.sha256(
+            json.dumps(job, default=float).encode()).hexdigest()
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def load(self) -> object | None:
+        """Load the saved state.
+
+        Returns:
+            object | None: The state, or None if there is no checkpoint.
+
+        Raises:
+            ValueError: If the checkpoint was saved for a different job.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            saved = json.load(f)
+        if saved["job_hash"] != self.job_hash:
+            raise ValueError(
+                f"The checkpoint {self.path} was saved for a different "
+                "calculation. Remove it or use another path.")
+        return saved["state"]
+
+    def save(self, state: object) -> None:
+        """Save the state atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"job_hash": self.job_hash, "state": state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def save_if_due(self, state: object) -> None:
+        """Save the state if the interval has passed since the last save."""
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save(state)
+
+    def remove(self) -> None:
+        """Remove the checkpoint after the calculation is completed."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
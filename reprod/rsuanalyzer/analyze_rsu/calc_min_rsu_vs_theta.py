@@ -1,17 +1,38 @@
 from typing import Iterable
 
+import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
 
+from ..core._transforms import _unit_tables
 from ..core.calc_rsu import calc_rsu
+from ..core.calc_rsu_batch import (_MAX_BLOCK_SIZE, _compose, _end_vecs,
+                                   _sum_of_dists)
+from ..enum_ring_ids._canonical import _codes_to_ids
+from ..enum_ring_ids.incremental import _sorted_codes
+from ._checkpoint import _Checkpoint
+
+# The largest number of the prefixes times the angles computed at once.
+_MAX_PREFIX_BLOCK_SIZE = 1 << 20
+# The RSUs closer than this are ties. The rounding errors of the RSUs
+# are a few ulps, about 1e-16, and depend on the order of the operations.
+_RSU_TIE_TOL = 1e-14
 
 
 def create_min_rsu_vs_theta_df(
         ring_ids: Iterable[str], 
         thetas: Iterable[float] = range(0, 91, 1), 
-        delta_: float = 87) -> pd.DataFrame:
+        delta_: float = 87, checkpoint_path: str | None = None,
+        checkpoint_interval: float = 60) -> pd.DataFrame:
     """Calculate the minimum RSU in the given rings for each theta.
 
+    For a long calculation, ``checkpoint_path`` can be given. Then, the
+    progress is saved there periodically, and the calculation resumes
+    from the saved progress when the function is called again with the
+    same arguments, e.g. after the previous call was killed. The result
+    is bit-identical to that of an uninterrupted calculation. The
+    checkpoint file is removed when the calculation is completed.
+
     Args:
         ring_ids (Iterable[str]): 
             The list of conformation IDs of rings, 
@@ -28,6 +49,12 @@ def create_min_rsu_vs_theta_df(
         delta_ (float, optional): 
             N-Pd-N angle. (unit: degree) 0 < delta\_ <= 180. 
             Default is 87.
+        checkpoint_path (str, optional):
+            The path of the checkpoint file. Default is None, which
+            means no checkpoint.
+        checkpoint_interval (float, optional):
+            The minimum interval between saves of the checkpoint in
+            seconds. Default is 60.
     
     Returns:
         pd.DataFrame:
@@ -77,9 +104,14 @@ def create_min_rsu_vs_theta_df(
         :func:`plot_rsu_vs_theta \
         <rsuanalyzer.analyze_rsu.plot_rsu_vs_theta.plot_rsu_vs_theta>`
     """
-    min_rsu_list = [
-        _calc_min_rsu_for_specific_theta(ring_ids, theta, delta_)
-        for theta in thetas]
+    if checkpoint_path is None:
+        min_rsu_list = [
+            _calc_min_rsu_for_specific_theta(ring_ids, theta, delta_)
+            for theta in thetas]
+    else:
+        thetas = list(thetas)
+        min_rsu_list = _calc_min_rsus_with_checkpoint(
+            ring_ids, thetas, delta_, checkpoint_path, checkpoint_interval)
     
     min_rsu_table = pd.DataFrame({
         "theta": thetas,
@@ -90,6 +122,177 @@ def create_min_rsu_vs_theta_df(
     return min_rsu_table
 
 
+def create_min_rsu_vs_theta_multi_n(
+        ns: Iterable[int],
+        thetas: Iterable[float] = range(0, 91, 1),
+        delta_: float = 87) -> pd.DataFrame:
+    """Calculate the minimum RSU in all the rings of each number of
+    ligands for each theta in one job.
+
+    This gives the same curves of the RSU as calling
+    :func:`create_min_rsu_vs_theta_df
+    <rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta.create_min_rsu_vs_theta_df>`
+    with ``enum_ring_ids(n)`` for each n, within rounding errors, but
+    the transforms of the units are computed once for all the thetas,
+    and the products of the first units of the rings are computed once
+    for each distinct sequence of the units, which is shared by the
+    rings of all the numbers of ligands, e.g. "RRFFRLFB" is the
+    beginning of both "RRFFRLFBLLBB" and "RRFFRLFBLLBBRRFF".
+
+    Args:
+        ns (Iterable[int]):
+            The numbers of ligands in a ring, e.g. ``[2, 3, 4]``.
+        thetas (Iterable[float], optional):
+            The list of tilt angles of C-C bonds. (unit: degree)
+            0 <= theta <= 90. Default is ``range(0, 91, 1)``.
+        delta_ (float, optional):
+            N-Pd-N angle. (unit: degree) 0 < delta\_ <= 180.
+            Default is 87.
+
+    Returns:
+        pd.DataFrame:
+            A long-form pandas DataFrame containing the minimum RSU for
+            each number of ligands and theta. The columns are "n",
+            "theta", "Ring ID", and "RSU". The RSUs are the same as
+            those of :func:`calc_rsu_batch
+            <rsuanalyzer.core.calc_rsu_batch.calc_rsu_batch>`. Of the
+            rings whose RSUs are the minimum within rounding errors,
+            the one with the largest ID is chosen, so that the IDs do
+            not depend on the rounding errors. Thus, they can differ
+            from those of ``create_min_rsu_vs_theta_df``, which breaks
+            such ties by the rounding errors of :func:`calc_rsu
+            <rsuanalyzer.core.calc_rsu.calc_rsu>`.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> df = ra.create_min_rsu_vs_theta_multi_n([2, 3], [0, 45, 90])
+        >>> df.pivot(index="theta", columns="n", values="RSU").shape
+        (3, 2)
+    """
+    ns = sorted(set(ns))
+    if not ns or ns[0] < 1:
+        raise ValueError(f"Invalid numbers of ligands: {ns}")
+    thetas = np.asarray(list(thetas), dtype=float)
+    unit_rots, unit_trans = _unit_tables(thetas, float(delta_))
+    # Shapes: (9, n_thetas, 16) and (3, n_thetas, 16)
+    unit_rots = np.ascontiguousarray(unit_rots.transpose(2, 3, 0, 1)).reshape(
+        9, len(thetas), 16)
+    unit_trans = np.ascontiguousarray(unit_trans.transpose(2, 0, 1))
+
+    codes = {n: _sorted_codes(n, "general", None) for n in ns}
+    prefix_idxs, parents, last_units = _prefix_tree(codes)
+    n_prefixes = sum(len(units) for units in last_units)
+    chunk_size = max(1, _MAX_PREFIX_BLOCK_SIZE // max(1, n_prefixes))
+
+    min_idxs = {n: np.empty(len(thetas), dtype=np.intp) for n in ns}
+    min_rsus = {n: np.empty(len(thetas)) for n in ns}
+    for start in range(0, len(thetas), chunk_size):
+        angles = slice(start, start + chunk_size)
+        chunk_rots = unit_rots[:, angles]
+        chunk_trans = unit_trans[:, angles]
+        n_angles = chunk_rots.shape[1]
+        block_size = max(1, _MAX_BLOCK_SIZE // n_angles)
+
+        # The products of the units of the distinct prefixes of each
+        # length, computed by blocks to stay in the cache.
+        rots: list[np.ndarray] = []
+        trans: list[np.ndarray] = []
+        for parent, units in zip(parents, last_units):
+            rot = np.empty((9, n_angles, len(units)))
+            tran = np.empty((3, n_angles, len(units)))
+            for block_start in range(0, len(units), block_size):
+                block = slice(block_start, block_start + block_size)
+                if not rots:
+                    rot[:, :, block] = chunk_rots[:, :, units[block]]
+                    tran[:, :, block] = chunk_trans[:, :, units[block]]
+                    continue
+                rot[:, :, block], tran[:, :, block] = _compose(
+                    list(rots[-1][:, :, parent[block]]),
+                    list(trans[-1][:, :, parent[block]]),
+                    chunk_rots[:, :, units[block]],
+                    chunk_trans[:, :, units[block]])
+            rots.append(rot)
+            trans.append(tran)
+
+        for n in ns:
+            rsus = np.empty((n_angles, len(codes[n])))
+            for ring_start in range(0, rsus.shape[1], block_size):
+                rings = slice(ring_start, ring_start + block_size)
+                idxs = [idxs_j[rings] for idxs_j in prefix_idxs[n]]
+                # The last units are appended to the shared prefixes,
+                # in the same way as calc_rsu_batch.
+                units = _ring_last_units(codes[n][rings])
+                rot = list(chunk_rots[:, :, units])
+                tran = list(chunk_trans[:, :, units])
+                if n > 1:
+                    rot, tran = _compose(
+                        list(rots[n - 2][:, :, idxs[-1]]),
+                        list(trans[n - 2][:, :, idxs[-1]]), rot, tran)
+                rsus[:, rings] = _sum_of_dists(_end_vecs(
+                    rot, tran,
+                    [list(trans[j][:, :, idxs[j]]) for j in range(n - 1)]
+                    )) / n**2
+            # The last one of the tied rings, i.e. the largest ID.
+            tied = rsus <= rsus.min(axis=1, keepdims=True) + _RSU_TIE_TOL
+            last = rsus.shape[1] - 1 - np.argmax(tied[:, ::-1], axis=1)
+            min_idxs[n][angles] = last
+            min_rsus[n][angles] = rsus[np.arange(n_angles), last]
+
+    return pd.DataFrame({
+        "n": np.repeat(ns, len(thetas)),
+        "theta": np.tile(thetas, len(ns)),
+        "Ring ID": [
+            ring_id for n in ns
+            for ring_id in _codes_to_ids(codes[n][min_idxs[n]], n)],
+        "RSU": np.concatenate([min_rsus[n] for n in ns])})
+
+
+def _prefix_tree(
+        codes: dict[int, np.ndarray]
+        ) -> tuple[dict[int, list[np.ndarray]], list[np.ndarray],
+                   list[np.ndarray]]:
+    """Find the distinct proper prefixes of the rings of all the numbers
+    of ligands.
+
+    Args:
+        codes (dict[int, np.ndarray]):
+            The codes of the rings for each number of ligands.
+
+    Returns:
+        tuple[dict[int, list[np.ndarray]], list[np.ndarray], \
+                list[np.ndarray]]:
+            The indices of the prefixes of each length j + 1 < n of the
+            rings for each number of ligands n, and the indices of the
+            parents, i.e. the prefixes of length j, and the indices in
+            ``_unit_tables`` of the last units of the distinct prefixes
+            of each length j + 1.
+    """
+    prefixes_of_rings: dict[int, list[np.ndarray]] = {n: [] for n in codes}
+    parents, last_units = [], []
+    prev_prefixes = np.zeros(1, dtype=np.uint64)
+    for j in range(1, max(codes)):
+        # The prefixes of length j of the rings of n > j ligands.
+        prefixes = {
+            n: ring_codes >> np.uint64(4 * (n - j))
+            for n, ring_codes in codes.items() if n > j}
+        distinct = np.unique(np.concatenate(list(prefixes.values())))
+        for n, ring_prefixes in prefixes.items():
+            prefixes_of_rings[n].append(
+                np.searchsorted(distinct, ring_prefixes))
+        parents.append(
+            np.searchsorted(prev_prefixes, distinct >> np.uint64(4)))
+        last_units.append(_ring_last_units(distinct))
+        prev_prefixes = distinct
+    return prefixes_of_rings, parents, last_units
+
+
+def _ring_last_units(codes: np.ndarray) -> np.ndarray:
+    """Return the indices in ``_unit_tables`` of the last units of the
+    codes, which are in the reverse order of the units of the codes,
+    e.g. 0 for "RRFF", whose code is 15."""
+    return 15 - (codes & np.uint64(15)).astype(np.intp)
+
+
 def _calc_min_rsu_for_specific_theta(
         ring_ids: Iterable[str], theta: float, delta_: float
         ) -> tuple[str, float]:
@@ -119,3 +322,51 @@ def _calc_min_rsu_for_specific_theta(
     min_rsu_ring_id = ring_ids[min_rsu_idx]
 
     return min_rsu_ring_id, min_rsu
+
+
+def _calc_min_rsus_with_checkpoint(
+        ring_ids: Iterable[str], thetas: list[float], delta_: float,
+        checkpoint_path: str, checkpoint_interval: float
+        ) -> list[tuple[str, float]]:
+    """Calculate the minimum RSUs in the given rings for each theta,
+    saving the progress to a checkpoint.
+
+    The RSUs are calculated in the same order as
+    ``_calc_min_rsu_for_specific_theta``, so the results are the same.
+
+    Args:
+        ring_ids (Iterable[str]): The conformation IDs of rings.
+        thetas (list[float]): The tilt angles of C-C bonds.
+        delta_ (float): N-Pd-N angle.
+        checkpoint_path (str): The path of the checkpoint file.
+        checkpoint_interval (float):
+            The minimum interval between saves in seconds.
+
+    Returns:
+        list[tuple[str, float]]:
+            The conformation ID of the ring with the minimum RSU and
+            the minimum RSU for each theta.
+    """
+    ring_ids = sorted(list(ring_ids), reverse=True)
+    checkpoint = _Checkpoint(
+        checkpoint_path,
+        ["create_min_rsu_vs_theta_df", ring_ids, thetas, delta_],
+        checkpoint_interval)
+
+    # "min_rsus" are the results of the completed thetas, and "rsus" are
+    # the RSUs calculated so far for the next theta.
+    state = checkpoint.load() or {"min_rsus": [], "rsus": []}
+    for theta in thetas[len(state["min_rsus"]):]:
+        rsu_list = state["rsus"]
+        for ring_id in ring_ids[len(rsu_list):]:
+            rsu_list.append(calc_rsu(ring_id, theta, delta_))
+            checkpoint.save_if_due(state)
+
+        min_rsu = min(rsu_list)
+        state["min_rsus"].append(
+            (ring_ids[rsu_list.index(min_rsu)], min_rsu))
+        state["rsus"] = []
+        checkpoint.save_if_due(state)
+
+    checkpoint.remove()
+    return [(ring_id, rsu) for ring_id, rsu in state["min_rsus"]]
@@ -0,0 +1,196 @@
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from ..core._transforms import _encode_ids
+from ..core.calc_rsu_batch import _calc_rsu_of_sampled_angles
+from ..core.ligand_geometry import LigandGeometry
+
+# The maximum number of the RSU samples held in memory at once.
+_MAX_NUM_OF_RSUS = 1 << 25
+
+
+def create_rsu_monte_carlo_df(
+        ring_ids: Iterable[str], theta_dist: Any, delta_dist: Any = 87,
+        num_of_samples: int = 100_000,
+        quantiles: Iterable[float] = (0.05, 0.5, 0.95),
+        num_of_bins: int = 32, seed: int | np.random.Generator | None = None,
+        geometry: LigandGeometry | None = None
+        ) -> pd.DataFrame:
+    """Calculate the statistics of RSU when the angles of the ligands
+    and the metals fluctuate independently.
+
+    The tilting angle of each ligand, and optionally the N-M-N angle of
+    each metal, are sampled independently from the given distributions.
+    The same samples are used for all the rings, so that the rings are
+    compared under the same fluctuations.
+
+    The sensitivity index of an angle is the first-order index, i.e. the
+    fraction of the variance of RSU explained by the angle alone. It is
+    estimated from the same samples by splitting them into bins of the
+    angle with the same number of samples, and comparing the variance of
+    the mean RSUs of the bins with the total variance.
+
+    Args:
+        ring_ids (Iterable[str]):
+            The conformation IDs of rings with the same number of
+            ligands, e.g. ``["RRFFLLBBRLFB", "RLFFRLFFRLFF"]``.
+        theta_dist (Any):
+            The distribution of the tilting angles in degrees. A frozen
+            distribution of ``scipy.stats``, e.g.
+            ``scipy.stats.norm(30, 5)``, or a fixed angle. A sequence of
+            them gives the distribution of each ligand.
+        delta_dist (Any, optional):
+            The distribution of the N-M-N angles in degrees, given in
+            the same way as ``theta_dist``. The i-th element of a
+            sequence is for the metal connecting the i-th ligand and the
+            next one. The samples should be in 0 < delta\_ <= 180.
+            Default is 87.
+        num_of_samples (int, optional):
+            The number of the samples. Default is 100000.
+        quantiles (Iterable[float], optional):
+            The quantiles of RSU to calculate.
+            Default is (0.05, 0.5, 0.95).
+        num_of_bins (int, optional):
+            The number of the bins to estimate the sensitivity indices.
+            Default is 32.
+        seed (int | np.random.Generator, optional):
+            The seed of the random numbers. Default is None.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        pd.DataFrame:
+            A pandas DataFrame with the columns "Ring ID", "mean",
+            "var" (unbiased variance), "q<quantile>" for each quantile,
+            e.g. "q0.05", and the sensitivity indices "S_theta<i>" and
+            "S_delta<i>" for the i-th ligand and metal, starting from 1.
+            The indices of fixed angles are 0.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> from scipy import stats
+        >>> df = ra.create_rsu_monte_carlo_df(
+        ...     ["RLFFRLFFRLFF", "RRFFLLBBRLFB"], stats.norm(34, 3),
+        ...     stats.uniform(85, 5), num_of_samples=10**6, seed=0)
+        >>> df.columns.to_list()
+        ['Ring ID', 'mean', 'var', 'q0.05', 'q0.5', 'q0.95', 'S_theta1',
+        'S_theta2', 'S_theta3', 'S_delta1', 'S_delta2', 'S_delta3']
+    """
+    ring_ids = list(ring_ids)
+    quantiles = list(quantiles)
+    lengths = {len(ring_id) for ring_id in ring_ids}
+    if len(lengths) != 1:
+        raise ValueError(
+            "The rings should be given and have the same number of ligands.")
+    num_of_ligs = lengths.pop() // 4
+    if num_of_samples < 2 or num_of_bins < 1:
+        raise ValueError("Invalid num_of_samples or num_of_bins.")
+
+    rng = np.random.default_rng(seed)
+    thetas = _sample(theta_dist, num_of_samples, num_of_ligs, rng)
+    deltas = _sample(delta_dist, num_of_samples, num_of_ligs, rng)
+    inputs = {
+        f"S_theta{i + 1}": thetas[:, i] for i in range(num_of_ligs)} | {
+        f"S_delta{i + 1}": deltas[:, i] for i in range(num_of_ligs)}
+    bins = {
+        name: _equal_count_bins(values, num_of_bins)
+        for name, values in inputs.items() if np.ptp(values) > 0}
+
+    lig_codes, con_codes = _encode_ids(ring_ids)
+    stats: dict[str, list[np.ndarray]] = {
+        name: [] for name in ["mean", "var"] + list(inputs)}
+    quantile_list = []
+    group_size = max(1, _MAX_NUM_OF_RSUS // num_of_samples)
+    for start in range(0, len(ring_ids), group_size):
+        # Shape: (n_rings_in_group, num_of_samples)
+        rsus = _calc_rsu_of_sampled_angles(
+            lig_codes[start:start+group_size],
+            con_codes[start:start+group_size], thetas, deltas, geometry)
+        means = rsus.mean(axis=1)
+        stats["mean"].append(means)
+        stats["var"].append(rsus.var(axis=1, ddof=1))
+        quantile_list.append(np.quantile(rsus, quantiles, axis=1))
+        total_vars = rsus.var(axis=1)
+        for name in inputs:
+            if name not in bins:
+                stats[name].append(np.zeros(len(rsus)))
+                continue
+            stats[name].append(_first_order_indices(
+                rsus, means, total_vars, *bins[name]))
+
+    df = pd.DataFrame({"Ring ID": ring_ids})
+    df["mean"] = np.concatenate(stats["mean"])
+    df["var"] = np.concatenate(stats["var"])
+    for q, values in zip(
+            quantiles, np.concatenate(quantile_list, axis=1)):
+        df[f"q{q:g}"] = values
+    for name in inputs:
+        df[name] = np.concatenate(stats[name])
+    return df
+
+
+def _sample(
+        dist: Any, num_of_samples: int, num_of_ligs: int,
+        rng: np.random.Generator) -> np.ndarray:
+    """Sample the angles of each position from the distribution(s).
+
+    Returns:
+        np.ndarray: The angles. Shape: (num_of_samples, num_of_ligs).
+    """
+    if hasattr(dist, "rvs"):
+        return np.asarray(
+            dist.rvs(size=(num_of_samples, num_of_ligs), random_state=rng),
+            dtype=float)
+    if np.ndim(dist) == 0:
+        return np.full((num_of_samples, num_of_ligs), float(dist))
+
+    dists = list(dist)
+    if len(dists) != num_of_ligs:
+        raise ValueError(
+            "The number of the distributions should be the number of "
+            f"ligands: {len(dists)} != {num_of_ligs}")
+    return np.stack(
+        [_sample(d, num_of_samples, 1, rng)[:, 0] for d in dists], axis=1)
+
+
+def _equal_count_bins(
+        values: np.ndarray, num_of_bins: int
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Split the samples into the bins with the same number of samples.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The bin of each sample, and the number of the samples in
+            each bin.
+    """
+    ranks = np.empty(len(values), dtype=np.intp)
+    ranks[np.argsort(values, kind="stable")] = np.arange(len(values))
+    bin_idxs = ranks * num_of_bins // len(values)
+    return bin_idxs, np.bincount(bin_idxs, minlength=num_of_bins)
+
+
+def _first_order_indices(
+        rsus: np.ndarray, means: np.ndarray, total_vars: np.ndarray,
+        bin_idxs: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Estimate the first-order sensitivity indices of an input.
+
+    Returns:
+        np.ndarray:
+            Var(E[RSU | bin]) / Var(RSU) for each ring, or 0 if the
+            variance of RSU is 0.
+    """
+    indices = np.zeros(len(rsus))
+    for i, (rsus_of_ring, mean, total_var) in enumerate(
+            zip(rsus, means, total_vars)):
+        if total_var == 0:
+            continue
+        bin_sums = np.bincount(
+            bin_idxs, weights=rsus_of_ring, minlength=len(counts))
+        nonempty = counts > 0
+        bin_means = bin_sums[nonempty] / counts[nonempty]
+        indices[i] = counts[nonempty] @ (bin_means - mean)**2 \
+            / len(rsus_of_ring) / total_var
+    return indices
@@ -2,14 +2,17 @@ from typing import Iterable
 
 import pandas as pd
 from matplotlib import pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
 
 def plot_rsu_vs_theta(
         *dfs: pd.DataFrame,
         labels: Iterable[str] = None,
         title: str = r"RSU vs tilt angle $\theta$",
-        xlabel: str = r"Tilt angle $\theta$ /deg.", ylabel: str = "RSU"
-        ) -> None:
+        xlabel: str = r"Tilt angle $\theta$ /deg.", ylabel: str = "RSU",
+        show: bool = True
+        ) -> Figure:
     """Plot the RSU vs theta.
 
     Args:
@@ -41,10 +44,13 @@ def plot_rsu_vs_theta(
             ``r"Tilt angle $\\theta$ /deg."``.
         ylabel (str): 
             The label of the y-axis. Default is ``"RSU"``.
-
+        show (bool):
+            Whether to show the plot in a window. If False, the figure
+            is drawn without pyplot, so that no display is needed, e.g.
+            to save it with ``fig.savefig(path)``. Default is True.
 
     Returns:
-        None
+        Figure: The figure of the plot.
 
     Example:
         Case 1: Plot a single DataFrame
@@ -57,8 +63,19 @@ def plot_rsu_vs_theta(
             >>> df1 = ra.create_rsu_vs_theta_df("RRFFLLBBRRFFLLBB", delta_=87)
             >>> df2 = ra.create_rsu_vs_theta_df("RRFFLLBBRRFFLLBB", delta_=90)
             >>> ra.plot_rsu_vs_theta(df1, df2, labels=["delta=87", "delta=90"])
+
+        Case 3: Save the plot without showing it
+            >>> import rsuanalyzer as ra
+            >>> df1 = ra.create_rsu_vs_theta_df("RLFFRLFFRLFF")
+            >>> fig = ra.plot_rsu_vs_theta(df1, show=False)
+            >>> fig.savefig("rsu_vs_theta.png")
     """
-    fig, ax = plt.subplots()
+    if show:
+        fig, ax = plt.subplots()
+    else:
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
 
     if labels is None:
         labels = [f"df{i + 1}" for i in range(len(dfs))]
@@ -73,4 +90,6 @@ def plot_rsu_vs_theta(
     ax.set_xlabel(xlabel)
     ax.set_ylabel(ylabel)
     ax.legend()
-    plt.show()
+    if show:
+        plt.show()
+    return fig
@@ -0,0 +1,333 @@
+"""Cached, dependency-aware runner for reproducing the results.
+
+Each output, e.g. a figure of RSU vs theta, is a :class:`ReproTarget`
+made from intermediate tables, each of which is a :class:`ReproTable`,
+i.e. a call of a function of the library with JSON-serializable
+arguments. A table is identified by the hash of the function, the
+arguments and the source code of the library, and is saved in the cache
+directory, so that it is computed only once, even if several targets
+use it or the reproduction is run again. A target is rendered again
+only if its tables, its renderer or its options have changed, or its
+file is missing.
+
+:func:`run_reproduction` computes the tables and renders the targets in
+worker processes, each target as soon as all of its tables are ready.
+"""
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import uuid
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor,
+                                wait)
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Iterable
+
+import pandas as pd
+
+from ..core.calc_rsu import calc_rsu
+from .calc_min_rsu_vs_theta import (create_min_rsu_vs_theta_df,
+                                    create_min_rsu_vs_theta_multi_n)
+from .calc_rsu_vs_theta import create_rsu_vs_theta_df
+from .sharded_sweep import _write_atomically
+
+_CACHE_DIR = ".cache"
+_TABLES_DIR = "tables"
+_STAMPS_NAME = "targets.json"
+
+
+def _create_rsu_df(
+        ring_ids: Iterable[str], thetas: Iterable[float],
+        delta_: float = 87) -> pd.DataFrame:
+    """Calculate the RSU of each pair of a ring and a theta.
+
+    Returns:
+        pd.DataFrame: The columns are "Ring ID", "theta", and "RSU".
+    """
+    ring_ids, thetas = list(ring_ids), list(thetas)
+    if len(ring_ids) != len(thetas):
+        raise ValueError(
+            "The number of ring IDs and thetas should be the same.")
+    return pd.DataFrame({
+        "Ring ID": ring_ids, "theta": thetas,
+        "RSU": [
+            calc_rsu(ring_id, theta, delta_)
+            for ring_id, theta in zip(ring_ids, thetas)]})
+
+
+# The functions computing the tables by their names.
+_TABLE_FUNCS: dict[str, Callable[..., pd.DataFrame]] = {
+    "rsu": _create_rsu_df,
+    "rsu_vs_theta": create_rsu_vs_theta_df,
+    "min_rsu_vs_theta": create_min_rsu_vs_theta_df,
+    "min_rsu_vs_theta_multi_n": create_min_rsu_vs_theta_multi_n,
+}
+
+
+@dataclass(frozen=True)
+class ReproTable:
+    """An intermediate table of a reproduction.
+
+    Attributes:
+        func (str):
+            The name of the function computing the table:
+
+            - "rsu": The RSUs of pairs of a ring and a theta, with the
+              arguments ``ring_ids``, ``thetas`` and ``delta_``.
+            - "rsu_vs_theta": :func:`create_rsu_vs_theta_df
+              <rsuanalyzer.analyze_rsu.calc_rsu_vs_theta.create_rsu_vs_theta_df>`
+            - "min_rsu_vs_theta": :func:`create_min_rsu_vs_theta_df
+              <rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta.create_min_rsu_vs_theta_df>`
+            - "min_rsu_vs_theta_multi_n":
+              :func:`create_min_rsu_vs_theta_multi_n
+              <rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta.create_min_rsu_vs_theta_multi_n>`
+        kwargs (dict):
+            The JSON-serializable keyword arguments of the function,
+            e.g. ``{"ring_id": "RLFFRLFFRLFF", "delta_": 90}``.
+    """
+    func: str
+    kwargs: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.func not in _TABLE_FUNCS:
+            raise ValueError(f"Unknown table function: {self.func}")
+
+    def key(self) -> str:
+        """Return the hash of the function, the arguments and the
+        source code of the library."""
+        return _hash([self.func, self.kwargs, _library_version()])
+
+    def compute(self) -> pd.DataFrame:
+        """Compute the table."""
+        return _TABLE_FUNCS[self.func](**self.kwargs)
+
+
+@dataclass(frozen=True)
+class ReproTarget:
+    """An output file of a reproduction.
+
+    Attributes:
+        path (str):
+            The path of the file relative to the output directory,
+            e.g. "script1.png".
+        tables (tuple[ReproTable, ...]): The tables the file is made of.
+        render (Callable[..., None]):
+            The function writing the file, which is called as
+            ``render(dfs, path, **options)`` with the list of the
+            tables. It should be defined at the top level of a module
+            so that it can be sent to the worker processes; otherwise
+            ``ValueError`` is raised.
+        options (dict):
+            The JSON-serializable keyword arguments of ``render``, e.g.
+            ``{"labels": ["syn-S-1"]}``.
+    """
+    path: str
+    tables: tuple[ReproTable, ...]
+    render: Callable[..., None]
+    options: dict = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        try:
+            pickle.dumps(self.render)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise ValueError(
+                f"The renderer of {self.path} cannot be sent to the worker "
+                "processes. Define it at the top level of a module instead "
+                "of a lambda or a nested function.") from e
+
+    def key(self) -> str:
+        """Return the hash of the tables, the renderer and the options."""
+        return _hash([
+            self.path, [table.key() for table in self.tables],
+            _source_of(self.render), self.options])
+
+
+def run_reproduction(
+        targets: Iterable[ReproTarget], out_dir: str,
+        cache_dir: str | None = None, workers: int | None = None,
+        force: bool = False) -> dict[str, str]:
+    """Build the outputs of a reproduction that are not up to date.
+
+    The tables needed by the outdated targets and missing in the cache
+    are computed first, in parallel, and each target is rendered as
+    soon as all of its tables are ready. Each table is computed only
+    once even if several targets use it. The tables and the files are
+    written atomically, so that an interrupted run is resumed by
+    running it again.
+
+    Args:
+        targets (Iterable[ReproTarget]): The outputs to build.
+        out_dir (str): The directory to write the outputs to.
+        cache_dir (str, optional):
+            The directory to save the tables and the hashes of the
+            built targets. Default is None, which means ``.cache`` in
+            ``out_dir``.
+        workers (int, optional):
+            The number of worker processes. Default is None, which
+            means the number of CPUs. If 1, everything is done in the
+            current process.
+        force (bool, optional):
+            Whether to render all the targets again, even if they are
+            up to date. The cached tables are still used.
+            Default is False.
+
+    Returns:
+        dict[str, str]:
+            "built" or "up to date" for the path of each target.
+
+    Example:
+        >>> import tempfile
+        >>> import rsuanalyzer as ra
+        >>> from reproduce import plot  # a renderer at the top level
+        >>> target = ra.ReproTarget(
+        ...     "syn-T-1.png",
+        ...     (ra.ReproTable("rsu_vs_theta", {"ring_id": "RLFFRLFFRLFF"}),),
+        ...     plot, {"labels": ["syn-T-1"]})
+        >>> out_dir = tempfile.mkdtemp()
+        >>> ra.run_reproduction([target], out_dir, workers=1)
+        {'syn-T-1.png': 'built'}
+        >>> ra.run_reproduction([target], out_dir, workers=1)
+        {'syn-T-1.png': 'up to date'}
+    """
+    targets = list(targets)
+    if len({target.path for target in targets}) != len(targets):
+        raise ValueError("The paths of the targets should be unique.")
+    if cache_dir is None:
+        cache_dir = os.path.join(out_dir, _CACHE_DIR)
+    stamps_path = os.path.join(cache_dir, _STAMPS_NAME)
+    stamps = {}
+    if os.path.exists(stamps_path):
+        with open(stamps_path) as f:
+            stamps = json.load(f)
+
+    status = {}
+    outdated = []
+    for target in targets:
+        if not force and stamps.get(target.path) == target.key() \
+                and os.path.exists(os.path.join(out_dir, target.path)):
+            status[target.path] = "up to date"
+        else:
+            outdated.append(target)
+    tables = {
+        table.key(): table for target in outdated for table in target.tables}
+    ready = {
+        key for key in tables
+        if os.path.exists(_table_path(cache_dir, key))}
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    n_jobs = len(tables) - len(ready) + len(outdated)
+    executor = ProcessPoolExecutor(max_workers=workers) \
+        if workers > 1 and n_jobs > 1 else _SerialExecutor()
+    with executor:
+        pending: dict[Future, str | ReproTarget] = {
+            executor.submit(_compute_table, table, cache_dir): key
+            for key, table in tables.items() if key not in ready}
+        while outdated or pending:
+            for target in list(outdated):
+                if all(table.key() in ready for table in target.tables):
+                    outdated.remove(target)
+                    pending[executor.submit(
+                        _render_target, target, out_dir, cache_dir)] = target
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = pending.pop(future)
+                future.result()
+                if isinstance(job, ReproTarget):
+                    stamps[job.path] = job.key()
+                    _write_atomically(
+                        stamps_path, json.dumps(stamps, indent=1).encode())
+                    status[job.path] = "built"
+                else:
+                    ready.add(job)
+
+    return {target.path: status[target.path] for target in targets}
+
+
+class _SerialExecutor:
+    """An executor running the functions in the current process when
+    they are submitted."""
+
+    def __enter__(self) -> "_SerialExecutor":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def submit(self, fn: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _compute_table(table: ReproTable, cache_dir: str) -> None:
+    """Compute the table and save it in the cache."""
+    _write_atomically(
+        _table_path(cache_dir, table.key()), pickle.dumps(table.compute()))
+
+
+def _render_target(target: ReproTarget, out_dir: str, cache_dir: str
+                   ) -> None:
+    """Render the target from the cached tables.
+
+    The file is written to a temporary path with the same extension,
+    since the format can be chosen by it, and then renamed.
+    """
+    dfs = [
+        pd.read_pickle(_table_path(cache_dir, table.key()))
+        for table in target.tables]
+    out_path = os.path.join(out_dir, target.path)
+    out_dir_of_target, name = os.path.split(out_path)
+    os.makedirs(out_dir_of_target or ".", exist_ok=True)
+    tmp_path = os.path.join(out_dir_of_target, f".{uuid.uuid4().hex}.{name}")
+    try:
+        target.render(dfs, tmp_path, **target.options)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _table_path(cache_dir: str, key: str) -> str:
+    return os.path.join(cache_dir, _TABLES_DIR, f"{key}.pkl")
+
+
+def _hash(obj: object) -> str:
+    """Return the hash of a JSON-serializable object."""
+    return hashlib.sha256(json.dumps(
+        obj, sort_keys=True, default=list).encode()).hexdigest()
+
+
+def _source_of(func: Callable) -> list[str]:
+    """Return the name and the source code of the function, so that
+    the targets are rendered again when the function is changed."""
+    try:
+        source = inspect.getsource(func)
+    except (OSError, TypeError):
+        source = ""
+    return [
+        getattr(func, "__module__", ""), getattr(func, "__qualname__", ""),
+        source]
+
+
+@lru_cache(maxsize=None)
+def _library_version() -> str:
+    """Return the hash of the source code of the library, with which
+    the cached tables are computed again when the library is changed.
+    """
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    hasher = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                hasher.update(os.path.relpath(path, package_dir).encode())
+                with open(path, "rb") as f:
+                    hasher.update(f.read())
+    return hasher.hexdigest()
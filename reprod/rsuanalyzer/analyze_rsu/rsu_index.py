@@ -0,0 +1,236 @@
+import io
+import json
+import math
+import os
+from typing import Iterator
+
+import numpy as np
+
+from ..core.calc_rsu_batch import _DTYPES, _calc_rsu_of_codes
+from ..enum_ring_ids._canonical import (_canonicalize, _codes_to_ids,
+                                        _ids_to_codes, _split_codes,
+                                        _theta_class)
+from ..enum_ring_ids.incremental import _sorted_codes
+from .sharded_sweep import _write_atomically
+
+_META_NAME = "meta.json"
+_ARRAY_NAMES = ("rsus", "ranks", "positions", "codes")
+# The number of rings whose RSUs are calculated at once.
+_CHUNK_SIZE = 100_000
+# The tolerance of the number of the rings below a percentile.
+_PERCENTILE_TOL = 1e-6
+
+
+class RSUIndex:
+    """The RSUs of all the unique rings of a number of ligands at a
+    theta and a delta, sorted once for range and percentile queries.
+
+    A ring is identified by its rank, i.e. the index in the sorted
+    unique ring IDs (see :func:`ring_rank
+    <rsuanalyzer.enum_ring_ids.rank_ring_ids.ring_rank>`). The index
+    holds the sorted RSUs, the ranks of the rings in that order, the
+    position of each rank in the order, and the packed codes of the
+    rings in the order of the ranks, so that the rings in a range of
+    RSU and the rank of a ring are found by binary search in O(log N),
+    without enumerating the rings again. Rings with the same RSU are
+    ordered by their ranks.
+
+    Use :meth:`build` to create an index, and :meth:`save` and
+    :meth:`load` to persist it. A loaded index is memory-mapped, so
+    that queries read only the parts of the arrays they need.
+
+    Attributes:
+        num_of_ligs (int): The number of ligands in a ring.
+        theta (float): Tilting angle of the ligand in degrees.
+        delta_ (float): N-Pd-N angle in degrees.
+        rsus (np.ndarray): The sorted RSUs. Shape: (N,).
+        ranks (np.ndarray): The ranks of the rings in the order of
+            ``rsus``. Shape: (N,).
+        positions (np.ndarray): The position of each rank in the order
+            of ``rsus``. Shape: (N,).
+        codes (np.ndarray): The packed codes of the representatives of
+            the rings in the order of the ranks. Shape: (N,).
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> index = ra.RSUIndex.build(4, 34)
+        >>> index.count_range(0, 0.2)
+        5
+        >>> index.percentile("RLFFRLFFRLFFRLFF")
+        5.539906103286385
+    """
+
+    def __init__(
+            self, num_of_ligs: int, theta: float, delta_: float,
+            rsus: np.ndarray, ranks: np.ndarray, positions: np.ndarray,
+            codes: np.ndarray) -> None:
+        self.num_of_ligs = num_of_ligs
+        self.theta = theta
+        self.delta_ = delta_
+        self.rsus = rsus
+        self.ranks = ranks
+        self.positions = positions
+        self.codes = codes
+
+    @classmethod
+    def build(
+            cls, num_of_ligs: int, theta: float, delta_: float = 87,
+            precision: str = "float64", cache_dir: str | None = None
+            ) -> "RSUIndex":
+        """Calculate the RSUs of all the unique rings and sort them.
+
+        Args:
+            num_of_ligs (int): The number of ligands in a ring.
+            theta (float):
+                Tilting angle of the ligand in degrees. 0 <= theta <= 90.
+            delta_ (float, optional):
+                N-Pd-N angle in degrees. 0 < delta\_ <= 180.
+                Default is 87.
+            precision (str, optional):
+                "float64" or "float32". Default is "float64".
+            cache_dir (str, optional):
+                The directory to save and load the sorted unique rings.
+                See :func:`ring_rank
+                <rsuanalyzer.enum_ring_ids.rank_ring_ids.ring_rank>`.
+                Default is None.
+
+        Returns:
+            RSUIndex: The index.
+        """
+        if precision not in _DTYPES:
+            raise ValueError(f"Invalid precision: {precision}")
+        codes = _sorted_codes(num_of_ligs, _theta_class(theta), cache_dir)
+        rsus = np.empty(len(codes), dtype=_DTYPES[precision])
+        for start in range(0, len(codes), _CHUNK_SIZE):
+            rsus[start:start+_CHUNK_SIZE] = _calc_rsu_of_codes(
+                *_split_codes(codes[start:start+_CHUNK_SIZE], num_of_ligs),
+                np.array([theta], dtype=float),
+                np.array([delta_], dtype=float),
+                dtype=_DTYPES[precision])[0, 0]
+
+        ranks = np.argsort(rsus, kind="stable")
+        positions = np.empty_like(ranks)
+        positions[ranks] = np.arange(len(ranks))
+        return cls(
+            num_of_ligs, float(theta), float(delta_), rsus[ranks], ranks,
+            positions, codes)
+
+    def save(self, index_dir: str) -> None:
+        """Save the index in a directory.
+
+        Each array is written atomically, and the metadata last, so
+        that an interrupted save is detected by :meth:`load`.
+        """
+        meta_path = os.path.join(index_dir, _META_NAME)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name in _ARRAY_NAMES:
+            buffer = io.BytesIO()
+            np.save(buffer, getattr(self, name))
+            _write_atomically(
+                os.path.join(index_dir, f"{name}.npy"), buffer.getvalue())
+        _write_atomically(meta_path, json.dumps({
+            "num_of_ligs": self.num_of_ligs, "theta": self.theta,
+            "delta": self.delta_, "num_of_rings": len(self)}).encode())
+
+    @classmethod
+    def load(cls, index_dir: str, mmap_mode: str | None = "r"
+             ) -> "RSUIndex":
+        """Load the index saved by :meth:`save`.
+
+        Args:
+            index_dir (str): The directory of the index.
+            mmap_mode (str, optional):
+                The mode of ``np.load``. Default is "r", which maps the
+                arrays without reading them.
+
+        Returns:
+            RSUIndex: The index.
+        """
+        with open(os.path.join(index_dir, _META_NAME)) as f:
+            meta = json.load(f)
+        arrays = [
+            np.load(os.path.join(index_dir, f"{name}.npy"),
+                    mmap_mode=mmap_mode)
+            for name in _ARRAY_NAMES]
+        if any(len(array) != meta["num_of_rings"] for array in arrays):
+            raise ValueError(f"The index is broken: {index_dir}")
+        return cls(
+            meta["num_of_ligs"], meta["theta"], meta["delta"], *arrays)
+
+    def __len__(self) -> int:
+        return len(self.rsus)
+
+    def count_range(self, lower: float, upper: float) -> int:
+        """Count the rings with lower <= RSU <= upper."""
+        start, stop = self._range(lower, upper)
+        return stop - start
+
+    def range_ranks(self, lower: float, upper: float) -> np.ndarray:
+        """Return the ranks of the rings with lower <= RSU <= upper in
+        ascending order of RSU."""
+        start, stop = self._range(lower, upper)
+        return np.asarray(self.ranks[start:stop])
+
+    def iter_range(
+            self, lower: float, upper: float, chunk_size: int = 10_000
+            ) -> Iterator[tuple[str, float]]:
+        """Iterate over the rings with lower <= RSU <= upper in
+        ascending order of RSU.
+
+        The ring IDs are restored from the ranks by chunks, so that
+        a wide range does not hold all the IDs in memory.
+
+        Yields:
+            tuple[str, float]: The conformation ID and the RSU.
+        """
+        start, stop = self._range(lower, upper)
+        for chunk_start in range(start, stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, stop)
+            ring_ids = _codes_to_ids(
+                self.codes[self.ranks[chunk_start:chunk_stop]],
+                self.num_of_ligs)
+            yield from zip(
+                ring_ids, self.rsus[chunk_start:chunk_stop].tolist())
+
+    def position(self, ring_id: str) -> int:
+        """Return the position of the ring in ascending order of RSU,
+        starting from 0."""
+        if len(ring_id) != 4 * self.num_of_ligs:
+            raise ValueError(
+                f"The ring should have {self.num_of_ligs} ligands: "
+                f"{ring_id}")
+        code = _canonicalize(
+            _ids_to_codes([ring_id]), self.num_of_ligs, self.theta)[0]
+        return int(self.positions[np.searchsorted(self.codes, code)])
+
+    def rsu(self, ring_id: str) -> float:
+        """Return the RSU of the ring."""
+        return float(self.rsus[self.position(ring_id)])
+
+    def percentile(self, ring_id: str) -> float:
+        """Return the percentage of the rings whose RSUs are smaller
+        than that of the ring."""
+        smaller = np.searchsorted(self.rsus, self.rsu(ring_id), "left")
+        return 100 * int(smaller) / len(self)
+
+    def rsu_at_percentile(self, q: float) -> float:
+        """Return the RSU at the percentile q, 0 <= q <= 100, of the
+        rings with the nearest rank method.
+
+        The ring is the last one in ascending order of RSU with at most
+        q percent of the rings before it, so that this is the inverse
+        of :meth:`percentile`.
+        """
+        if not 0 <= q <= 100:
+            raise ValueError(f"Invalid percentile: {q}")
+        # The tolerance keeps e.g. 100 * 7 / 9 percent of 9 rings from
+        # being rounded down to less than 7 rings.
+        position = math.floor(q * len(self) / 100 + _PERCENTILE_TOL)
+        return float(self.rsus[min(max(position, 0), len(self) - 1)])
+
+    def _range(self, lower: float, upper: float) -> tuple[int, int]:
+        """Return the positions of the rings with lower <= RSU <= upper."""
+        start = int(np.searchsorted(self.rsus, lower, "left"))
+        stop = int(np.searchsorted(self.rsus, upper, "right"))
+        return start, max(start, stop)
@@ -0,0 +1,368 @@
+"""Local HTTP/JSON service answering RSU queries.
+
+The service keeps the library imported and its caches warm, so that
+interactive tools can query RSUs without paying the import and warm-up
+costs on each run. Concurrent requests for single rings are coalesced
+into vectorized batches.
+
+Usage:
+    python -m rsuanalyzer.analyze_rsu.rsu_server --port 8765
+
+Endpoints (all the bodies are JSON objects):
+    GET /health
+        ``{"status": "ok"}``
+    POST /rsu
+        Request: ``{"ring_id": "RRFFLLBB", "theta": 30, "delta": 87}``
+        Response: ``{"ring_id": ..., "theta": ..., "delta": ...,
+        "rsu": 0.5}``
+    POST /ranking
+        Request: ``{"num_of_ligs": 3, "theta": 40, "delta": 87,
+        "top_num": 5}``, where ``"ring_ids"`` can be given instead of
+        ``"num_of_ligs"``.
+        Response: ``{"ranking": [{"rank": 1, "ring_id": ..., "rsu": ...},
+        ...]}``
+    POST /min-rsu
+        Request: ``{"num_of_ligs": 3, "thetas": [0, 45, 90],
+        "delta": 87}``, where ``"ring_ids"`` can be given instead of
+        ``"num_of_ligs"``.
+        Response: ``{"min_rsus": [{"theta": 0, "ring_id": ..., "rsu": ...},
+        ...]}``
+
+Invalid requests are answered with the status 400 and
+``{"error": "..."}``.
+"""
+import argparse
+import asyncio
+import json
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from ..core._transforms import _encode_ids
+from ..core.calc_rsu_batch import _select_top, calc_rsu_batch
+from ..enum_ring_ids._canonical import _theta_class
+from ..enum_ring_ids.incremental import enum_ring_ids_incrementally
+
+_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class RSUServer:
+    """Asyncio HTTP/JSON server answering RSU queries.
+
+    See the module docstring for the endpoints.
+
+    Args:
+        host (str, optional): The host to bind. Default is "127.0.0.1".
+        port (int, optional):
+            The port to bind. Default is 0, which means a free port.
+        coalesce_window (float, optional):
+            The time in seconds to wait for other single-ring requests
+            to be calculated in the same batch. Default is 0.005.
+        max_batch_size (int, optional):
+            The number of pending single-ring requests which starts a
+            batch without waiting. Default is 4096.
+
+    Example:
+        >>> async def main():
+        ...     async with RSUServer(port=8765) as server:
+        ...         await server.serve_forever()
+        >>> asyncio.run(main())
+    """
+
+    def __init__(
+            self, host: str = "127.0.0.1", port: int = 0,
+            coalesce_window: float = 0.005, max_batch_size: int = 4096
+            ) -> None:
+        self.host = host
+        self.port = port
+        self._coalescer = _RSUCoalescer(coalesce_window, max_batch_size)
+        self._server: asyncio.Server | None = None
+
+    @property
+    def num_of_batches(self) -> int:
+        """The number of batches calculated for single-ring requests."""
+        return self._coalescer.num_of_batches
+
+    async def start(self) -> None:
+        """Start accepting connections.
+
+        ``port`` is updated to the bound port.
+        """
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "RSUServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _handle_connection(
+            self, reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter) -> None:
+        """Answer a request and close the connection."""
+        try:
+            status, body = await self._handle_request(reader)
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            status, body = 400, {"error": str(e)}
+        except Exception as e:
+            status, body = 500, {"error": repr(e)}
+        payload = json.dumps(body).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode() + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _handle_request(
+            self, reader: asyncio.StreamReader
+            ) -> tuple[int, dict[str, Any]]:
+        """Read a request and return the status and the body of the
+        response."""
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ValueError("Invalid request line.")
+        method, path, _ = request_line
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        raw_body = await reader.readexactly(length) if length else b""
+
+        if path == "/health":
+            return 200, {"status": "ok"}
+        handlers = {
+            "/rsu": self._handle_rsu,
+            "/ranking": self._handle_ranking,
+            "/min-rsu": self._handle_min_rsu}
+        if path not in handlers:
+            return 404, {"error": f"Unknown path: {path}"}
+        if method != "POST":
+            return 405, {"error": f"Use POST for {path}"}
+        query = json.loads(raw_body or b"{}")
+        if not isinstance(query, dict):
+            raise ValueError("The request body should be a JSON object.")
+        return 200, await handlers[path](query)
+
+    async def _handle_rsu(self, query: dict[str, Any]) -> dict[str, Any]:
+        ring_id = str(query["ring_id"])
+        theta = float(query["theta"])
+        delta_ = float(query.get("delta", 87))
+        rsu = await self._coalescer.calc(ring_id, theta, delta_)
+        return {
+            "ring_id": ring_id, "theta": theta, "delta": delta_, "rsu": rsu}
+
+    async def _handle_ranking(
+            self, query: dict[str, Any]) -> dict[str, Any]:
+        theta = float(query["theta"])
+        delta_ = float(query.get("delta", 87))
+        top_num = int(query.get("top_num", 10))
+        loop = asyncio.get_running_loop()
+        ring_ids = await loop.run_in_executor(
+            None, _ring_ids_of_query, query, theta)
+        ranking = await loop.run_in_executor(
+            None, _rank, ring_ids, theta, delta_, top_num)
+        return {"ranking": ranking}
+
+    async def _handle_min_rsu(
+            self, query: dict[str, Any]) -> dict[str, Any]:
+        thetas = tuple(float(theta) for theta in query["thetas"])
+        delta_ = float(query.get("delta", 87))
+        loop = asyncio.get_running_loop()
+        ring_ids = await loop.run_in_executor(
+            None, _ring_ids_of_query, query, None)
+        min_rsus = await loop.run_in_executor(
+            None, _calc_min_rsus, ring_ids, thetas, delta_)
+        return {"min_rsus": min_rsus}
+
+
+class _RSUCoalescer:
+    """Collect the single-ring requests arriving within a short time
+    window and calculate them in batches.
+
+    Args:
+        window (float): The time to wait for other requests in seconds.
+        max_batch_size (int):
+            The number of pending requests which starts a batch without
+            waiting.
+    """
+
+    def __init__(self, window: float, max_batch_size: int) -> None:
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.num_of_batches = 0
+        self._pending: list[tuple[str, float, float, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        # References to the running batches not to be garbage-collected.
+        self._tasks: set[asyncio.Task] = set()
+
+    async def calc(self, ring_id: str, theta: float, delta_: float) -> float:
+        """Calculate the RSU of the ring in the next batch."""
+        # Invalid IDs are rejected here not to fail the whole batch.
+        if len(ring_id) % 4 != 0 or len(ring_id) == 0:
+            raise ValueError(f"Invalid conformation ID: {ring_id}")
+        _encode_ids([ring_id])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((ring_id, theta, delta_, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Start calculating the pending requests."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        self.num_of_batches += 1
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+            self, batch: list[tuple[str, float, float, asyncio.Future]]
+            ) -> None:
+        """Calculate a batch of requests grouped by theta and delta."""
+        groups: dict[tuple[float, float], list] = {}
+        for ring_id, theta, delta_, future in batch:
+            groups.setdefault((theta, delta_), []).append((ring_id, future))
+        loop = asyncio.get_running_loop()
+        for (theta, delta_), requests in groups.items():
+            ring_ids = [ring_id for ring_id, _ in requests]
+            try:
+                rsus = await loop.run_in_executor(
+                    None, calc_rsu_batch, ring_ids, theta, delta_)
+            except Exception as e:
+                for _, future in requests:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), rsu in zip(requests, rsus):
+                if not future.done():
+                    future.set_result(float(rsu))
+
+
+def _ring_ids_of_query(
+        query: dict[str, Any], theta: float | None) -> tuple[str, ...]:
+    """Return the ring IDs given by "ring_ids" or "num_of_ligs"."""
+    if "ring_ids" in query:
+        return tuple(str(ring_id) for ring_id in query["ring_ids"])
+    return _enum_sorted_ring_ids(
+        int(query["num_of_ligs"]), _theta_class(theta))
+
+
+@lru_cache(maxsize=None)
+def _enum_sorted_ring_ids(
+        num_of_ligs: int, theta_class: str) -> tuple[str, ...]:
+    """Enumerate the ring IDs once for each number of ligands."""
+    theta = {"theta0": 0, "theta90": 90, "general": None}[theta_class]
+    return tuple(sorted(enum_ring_ids_incrementally(num_of_ligs, theta)))
+
+
+@lru_cache(maxsize=64)
+def _rank(
+        ring_ids: tuple[str, ...], theta: float, delta_: float,
+        top_num: int) -> list[dict[str, Any]]:
+    """Rank the rings in ascending order of RSU.
+
+    As in :func:`merge_shards
+    <rsuanalyzer.analyze_rsu.sharded_sweep.merge_shards>`, rings with the
+    same RSU are ranked in the descending order of the ring IDs.
+    """
+    ring_ids = tuple(sorted(ring_ids))
+    rsus = calc_rsu_batch(ring_ids, theta, delta_)
+    idxs, top_rsus = _select_top(np.arange(len(ring_ids)), rsus, top_num)
+    return [
+        {"rank": rank, "ring_id": ring_ids[i], "rsu": float(rsu)}
+        for rank, (i, rsu) in enumerate(zip(idxs, top_rsus), start=1)]
+
+
+@lru_cache(maxsize=64)
+def _calc_min_rsus(
+        ring_ids: tuple[str, ...], thetas: tuple[float, ...],
+        delta_: float) -> list[dict[str, Any]]:
+    """Calculate the minimum RSU in the rings for each theta.
+
+    As in :func:`create_min_rsu_vs_theta_df
+    <rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta.create_min_rsu_vs_theta_df>`,
+    the ring with the largest ID is taken among the ones with the same
+    minimum.
+    """
+    ring_ids = tuple(sorted(ring_ids, reverse=True))
+    rsus = calc_rsu_batch(ring_ids, thetas, delta_)
+    min_idxs = np.argmin(rsus, axis=1)
+    return [
+        {"theta": theta, "ring_id": ring_ids[i], "rsu": float(rsus[j, i])}
+        for j, (theta, i) in enumerate(zip(thetas, min_idxs))]
+
+
+def serve_rsu(
+        host: str = "127.0.0.1", port: int = 8765,
+        coalesce_window: float = 0.005) -> None:
+    """Run the RSU query service until interrupted.
+
+    See :mod:`rsuanalyzer.analyze_rsu.rsu_server` for the endpoints.
+
+    Args:
+        host (str, optional): The host to bind. Default is "127.0.0.1".
+        port (int, optional): The port to bind. Default is 8765.
+        coalesce_window (float, optional):
+            The time in seconds to wait for other single-ring requests
+            to be calculated in the same batch. Default is 0.005.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.serve_rsu(port=8765)  # doctest: +SKIP
+    """
+    async def serve() -> None:
+        async with RSUServer(host, port, coalesce_window) as server:
+            print(
+                f"Serving RSU queries on http://{server.host}:{server.port}")
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--coalesce-window", type=float, default=0.005,
+        help="Seconds to wait for single-ring requests to batch.")
+    args = parser.parse_args(argv)
+    serve_rsu(args.host, args.port, args.coalesce_window)
+
+
+if __name__ == "__main__":
+    main()
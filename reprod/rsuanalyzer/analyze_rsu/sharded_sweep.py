@@ -0,0 +1,376 @@
+"""Sweep of RSU over many rings, thetas and deltas split into shards.
+
+A sweep consists of three steps which communicate only through files in
+a directory, so that the shards can be run on different machines
+sharing the directory:
+
+1. :func:`plan_sweep` writes the manifest, which lists the shards, i.e.
+   the ranges of the indices of the unique rings (see :func:`ring_rank
+   <rsuanalyzer.enum_ring_ids.rank_ring_ids.ring_rank>`) times the
+   blocks of thetas and deltas.
+2. :func:`run_shard` computes a shard and writes its result file.
+   Shards can be run in any order, in parallel, and again after a
+   failure.
+3. :func:`merge_shards` checks that all the shards are done and builds
+   the tables of the minimum RSUs and the rankings.
+
+The steps are also available from the command line::
+
+    python -m rsuanalyzer.analyze_rsu.sharded_sweep plan sweep --num-of-ligs 5 6
+    python -m rsuanalyzer.analyze_rsu.sharded_sweep run-shard sweep/manifest.json --worker 0/4
+    python -m rsuanalyzer.analyze_rsu.sharded_sweep merge sweep/manifest.json
+"""
+import argparse
+import io
+import json
+import os
+import uuid
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from ..core.calc_rsu_batch import (_DTYPES, _calc_smallest_rsus_of_codes,
+                                   _select_top)
+from ..enum_ring_ids._canonical import _codes_to_ids, _split_codes
+from ..enum_ring_ids.incremental import _cache_path, _enum_canonical_codes
+
+_MANIFEST_NAME = "manifest.json"
+_CODES_DIR = "ring_codes"
+_SHARDS_DIR = "shards"
+
+
+def plan_sweep(
+        out_dir: str, num_of_ligs: int | Iterable[int],
+        thetas: Iterable[float] = range(0, 91, 1),
+        deltas: Iterable[float] = (87,),
+        rings_per_shard: int = 100_000,
+        thetas_per_shard: int | None = None,
+        deltas_per_shard: int | None = None,
+        top_num: int = 10,
+        precision: str = "float64"
+        ) -> str:
+    """Plan a sweep and write its manifest.
+
+    The unique rings of each number of ligands are enumerated and saved
+    in ``out_dir``, so that the shards only load them.
+
+    Args:
+        out_dir (str):
+            The directory of the sweep. It should be shared by all the
+            machines running the shards.
+        num_of_ligs (int | Iterable[int]):
+            The numbers of ligands of the rings, e.g. ``[5, 6]``.
+        thetas (Iterable[float], optional):
+            The tilt angles of C-C bonds. (unit: degree)
+            Default is ``range(0, 91, 1)``.
+        deltas (Iterable[float], optional):
+            The N-Pd-N angles. (unit: degree) Default is ``(87,)``.
+        rings_per_shard (int, optional):
+            The number of rings in a shard. Default is 100000.
+        thetas_per_shard (int, optional):
+            The number of thetas in a shard. Default is None, which
+            means all the thetas.
+        deltas_per_shard (int, optional):
+            The number of deltas in a shard. Default is None, which
+            means all the deltas.
+        top_num (int, optional):
+            The number of top-ranked rings kept for each number of
+            ligands, theta and delta. Default is 10.
+        precision (str, optional):
+            "float64" or "float32" for screening the rings in the
+            shards. The results are the same for both. See
+            :func:`calc_smallest_rsus
+            <rsuanalyzer.core.calc_rsu_batch.calc_smallest_rsus>`.
+            Default is "float64".
+
+    Returns:
+        str: The path of the manifest.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.plan_sweep("sweep", [5, 6], deltas=[87, 90])
+        'sweep/manifest.json'
+    """
+    if isinstance(num_of_ligs, int):
+        num_of_ligs = [num_of_ligs]
+    num_of_ligs = sorted(set(num_of_ligs))
+    thetas = [float(theta) for theta in thetas]
+    deltas = [float(delta_) for delta_ in deltas]
+    thetas_per_shard = thetas_per_shard or len(thetas)
+    deltas_per_shard = deltas_per_shard or len(deltas)
+    if min(rings_per_shard, thetas_per_shard, deltas_per_shard, top_num) < 1:
+        raise ValueError("The sizes of the shards should be positive.")
+    if precision not in _DTYPES:
+        raise ValueError(f"Invalid precision: {precision}")
+
+    shards = []
+    for n in num_of_ligs:
+        n_rings = len(_enum_canonical_codes(
+            n, None, os.path.join(out_dir, _CODES_DIR)))
+        for start in range(0, n_rings, rings_per_shard):
+            for theta_start in range(0, len(thetas), thetas_per_shard):
+                for delta_start in range(0, len(deltas), deltas_per_shard):
+                    shards.append({
+                        "id": len(shards),
+                        "num_of_ligs": n,
+                        "start": start,
+                        "stop": min(start + rings_per_shard, n_rings),
+                        "theta_start": theta_start,
+                        "theta_stop": min(
+                            theta_start + thetas_per_shard, len(thetas)),
+                        "delta_start": delta_start,
+                        "delta_stop": min(
+                            delta_start + deltas_per_shard, len(deltas)),
+                    })
+
+    manifest = {
+        "sweep_id": uuid.uuid4().hex,
+        "num_of_ligs": num_of_ligs,
+        "thetas": thetas,
+        "deltas": deltas,
+        "top_num": top_num,
+        "precision": precision,
+        "shards": shards,
+    }
+    manifest_path = os.path.join(out_dir, _MANIFEST_NAME)
+    _write_atomically(
+        manifest_path, json.dumps(manifest, indent=1).encode())
+    return manifest_path
+
+
+def run_shard(
+        manifest_path: str, shard_id: int, overwrite: bool = False
+        ) -> str:
+    """Compute a shard of a sweep and write its result file.
+
+    The result file is written atomically, so that a shard interrupted
+    in the middle leaves no result and is simply run again. An existing
+    result of another sweep planned in the same directory is computed
+    again.
+
+    Args:
+        manifest_path (str): The path of the manifest.
+        shard_id (int): The ID of the shard.
+        overwrite (bool, optional):
+            Whether to compute the shard again if its result of the
+            sweep exists. Default is False.
+
+    Returns:
+        str: The path of the result file.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.run_shard("sweep/manifest.json", 0)
+        'sweep/shards/shard_000000.npz'
+    """
+    manifest = _load_manifest(manifest_path)
+    shard = manifest["shards"][shard_id]
+    out_path = _shard_path(manifest_path, shard_id)
+    if os.path.exists(out_path) and not overwrite \
+            and _belongs_to(out_path, manifest, shard):
+        return out_path
+
+    n = shard["num_of_ligs"]
+    codes = _load_codes(manifest_path, n)[shard["start"]:shard["stop"]]
+    thetas = np.array(
+        manifest["thetas"][shard["theta_start"]:shard["theta_stop"]])
+    deltas = np.array(
+        manifest["deltas"][shard["delta_start"]:shard["delta_stop"]])
+
+    # Shape: (n_thetas, n_deltas, top_num)
+    top_idxs, top_rsus = _calc_smallest_rsus_of_codes(
+        *_split_codes(codes, n), thetas, deltas,
+        np.arange(shard["start"], shard["stop"]), manifest["top_num"],
+        manifest.get("precision", "float64"))
+
+    buffer = io.BytesIO()
+    np.savez(
+        buffer, sweep_id=manifest["sweep_id"],
+        shard=json.dumps(shard), top_idxs=top_idxs, top_rsus=top_rsus)
+    _write_atomically(out_path, buffer.getvalue())
+    return out_path
+
+
+def merge_shards(
+        manifest_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Merge the results of the shards of a sweep.
+
+    All the result files are checked to be present and to belong to the
+    manifest. The tables are also written to ``min_rsu.csv`` and
+    ``ranking.csv`` next to the manifest.
+
+    Args:
+        manifest_path (str): The path of the manifest.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]:
+            The table of the minimum RSUs with the columns
+            "num_of_ligs", "delta", "theta", "Ring ID" and "RSU", and the
+            table of the rankings with the columns "num_of_ligs",
+            "delta", "theta", "Rank", "Ring ID" and "RSU". Rings with the
+            same RSU are ranked in the descending order of the ring IDs.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> min_rsu_df, ranking_df = ra.merge_shards("sweep/manifest.json")
+    """
+    manifest = _load_manifest(manifest_path)
+    shards = manifest["shards"]
+    missing = [
+        shard["id"] for shard in shards
+        if not os.path.exists(_shard_path(manifest_path, shard["id"]))]
+    if missing:
+        raise FileNotFoundError(
+            f"{len(missing)} of {len(shards)} shards are not done: "
+            f"{missing[:10]}{' ...' if len(missing) > 10 else ''}")
+
+    n_thetas, n_deltas = len(manifest["thetas"]), len(manifest["deltas"])
+    # The best rings so far for each number of ligands, theta and delta.
+    best: dict[int, list[list[tuple[np.ndarray, np.ndarray]]]] = {
+        n: [[(np.empty(0, dtype=np.int64), np.empty(0))] * n_deltas
+            for _ in range(n_thetas)]
+        for n in manifest["num_of_ligs"]}
+    # The number of rings covered for each number of ligands, theta and
+    # delta, to check the completeness.
+    n_covered = {
+        n: np.zeros((n_thetas, n_deltas), dtype=np.int64)
+        for n in manifest["num_of_ligs"]}
+
+    for shard in shards:
+        result_path = _shard_path(manifest_path, shard["id"])
+        if not _belongs_to(result_path, manifest, shard):
+            raise ValueError(
+                f"The result of the shard {shard['id']} does not belong "
+                "to the manifest. Run the shard again.")
+        with np.load(result_path) as result:
+            top_idxs, top_rsus = result["top_idxs"], result["top_rsus"]
+
+        n = shard["num_of_ligs"]
+        for i, j in np.ndindex(top_idxs.shape[:2]):
+            theta_idx = shard["theta_start"] + i
+            delta_idx = shard["delta_start"] + j
+            best_idxs, best_rsus = best[n][theta_idx][delta_idx]
+            best[n][theta_idx][delta_idx] = _select_top(
+                np.concatenate([best_idxs, top_idxs[i, j]]),
+                np.concatenate([best_rsus, top_rsus[i, j]]),
+                manifest["top_num"])
+            n_covered[n][theta_idx, delta_idx] += \
+                shard["stop"] - shard["start"]
+
+    rows = []
+    for n in manifest["num_of_ligs"]:
+        codes = _load_codes(manifest_path, n)
+        if np.any(n_covered[n] != len(codes)):
+            raise ValueError(
+                f"The shards do not cover all the rings with {n} ligands.")
+        for j, delta_ in enumerate(manifest["deltas"]):
+            for i, theta in enumerate(manifest["thetas"]):
+                idxs, rsus = best[n][i][j]
+                ring_ids = _codes_to_ids(codes[idxs], n)
+                rows.extend(
+                    (n, delta_, theta, rank, ring_id, rsu)
+                    for rank, (ring_id, rsu)
+                    in enumerate(zip(ring_ids, rsus.tolist()), start=1))
+
+    ranking_df = pd.DataFrame(rows, columns=[
+        "num_of_ligs", "delta", "theta", "Rank", "Ring ID", "RSU"])
+    min_rsu_df = ranking_df[ranking_df["Rank"] == 1].drop(
+        columns="Rank").reset_index(drop=True)
+
+    out_dir = os.path.dirname(manifest_path)
+    min_rsu_df.to_csv(os.path.join(out_dir, "min_rsu.csv"), index=False)
+    ranking_df.to_csv(os.path.join(out_dir, "ranking.csv"), index=False)
+    return min_rsu_df, ranking_df
+
+
+def _load_manifest(manifest_path: str) -> dict:
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _load_codes(manifest_path: str, num_of_ligs: int) -> np.ndarray:
+    """Load the sorted codes of the unique rings saved by the plan."""
+    return np.load(_cache_path(
+        os.path.join(os.path.dirname(manifest_path), _CODES_DIR),
+        num_of_ligs, None), mmap_mode="r")
+
+
+def _shard_path(manifest_path: str, shard_id: int) -> str:
+    return os.path.join(
+        os.path.dirname(manifest_path), _SHARDS_DIR,
+        f"shard_{shard_id:06d}.npz")
+
+
+def _belongs_to(result_path: str, manifest: dict, shard: dict) -> bool:
+    """Check that the result file is of the shard of the sweep."""
+    with np.load(result_path) as result:
+        return str(result["sweep_id"]) == manifest["sweep_id"] \
+            and json.loads(str(result["shard"])) == shard
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+    """Write the data to a temporary file and rename it, so that the
+    file is either complete or absent, even on a shared filesystem."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run a step of a sweep from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m rsuanalyzer.analyze_rsu.sharded_sweep",
+        description="Sweep of RSU split into shards.")
+    subparsers = parser.add_subparsers(dest="step", required=True)
+
+    plan = subparsers.add_parser("plan", help="write the manifest")
+    plan.add_argument("out_dir")
+    plan.add_argument("--num-of-ligs", type=int, nargs="+", required=True)
+    plan.add_argument(
+        "--thetas", type=float, nargs="+", default=list(range(0, 91)))
+    plan.add_argument("--deltas", type=float, nargs="+", default=[87])
+    plan.add_argument("--rings-per-shard", type=int, default=100_000)
+    plan.add_argument("--thetas-per-shard", type=int)
+    plan.add_argument("--deltas-per-shard", type=int)
+    plan.add_argument("--top-num", type=int, default=10)
+    plan.add_argument(
+        "--precision", choices=["float64", "float32"], default="float64")
+
+    run = subparsers.add_parser("run-shard", help="compute shards")
+    run.add_argument("manifest")
+    run.add_argument(
+        "shard_ids", type=int, nargs="*",
+        help="the shards to compute; all the shards if omitted")
+    run.add_argument(
+        "--worker", default="0/1",
+        help="I/N: compute only the shards whose IDs are I modulo N")
+    run.add_argument("--overwrite", action="store_true")
+
+    merge = subparsers.add_parser("merge", help="merge the results")
+    merge.add_argument("manifest")
+
+    args = parser.parse_args(argv)
+    if args.step == "plan":
+        print(plan_sweep(
+            args.out_dir, args.num_of_ligs, args.thetas, args.deltas,
+            args.rings_per_shard, args.thetas_per_shard,
+            args.deltas_per_shard, args.top_num, args.precision))
+    elif args.step == "run-shard":
+        worker, n_workers = map(int, args.worker.split("/"))
+        shard_ids = args.shard_ids or range(
+            len(_load_manifest(args.manifest)["shards"]))
+        for shard_id in shard_ids:
+            if shard_id % n_workers == worker:
+                print(run_shard(args.manifest, shard_id, args.overwrite))
+    else:
+        min_rsu_df, _ = merge_shards(args.manifest)
+        print(min_rsu_df)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,23 @@ from typing import Iterable
 import pandas as pd
 
 from ..core.calc_rsu import calc_rsu
+from ._checkpoint import _Checkpoint
 
 
 def create_small_rsu_ranking(
         ring_ids: Iterable[str], 
         theta: float, delta_: float = 87,
-        top_num: int = 10) -> pd.DataFrame:
+        top_num: int = 10, checkpoint_path: str | None = None,
+        checkpoint_interval: float = 60) -> pd.DataFrame:
     """Make a rank table of RSU in ascending order.
 
+    For a long calculation, ``checkpoint_path`` can be given. Then, the
+    progress is saved there periodically, and the calculation resumes
+    from the saved progress when the function is called again with the
+    same arguments, e.g. after the previous call was killed. The result
+    is bit-identical to that of an uninterrupted calculation. The
+    checkpoint file is removed when the calculation is completed.
+
     Args:
         ring_ids (Iterable[str]): 
             The Iterable of conformation IDs of rings, e.g. "RRFFLLBB".
@@ -22,6 +31,12 @@ def create_small_rsu_ranking(
             Default is 87.
         top_num (int, optional): 
             The number of top-ranked rings. Default is 10.
+        checkpoint_path (str, optional):
+            The path of the checkpoint file. Default is None, which
+            means no checkpoint.
+        checkpoint_interval (float, optional):
+            The minimum interval between saves of the checkpoint in
+            seconds. Default is 60.
 
     Returns:
         pd.DataFrame: 
@@ -56,8 +71,25 @@ def create_small_rsu_ranking(
     """
     ring_ids = list(ring_ids)
 
-    rsu_list = [
-        calc_rsu(ring_id, theta, delta_) for ring_id in ring_ids]
+    if checkpoint_path is None:
+        rsu_list = [
+            calc_rsu(ring_id, theta, delta_) for ring_id in ring_ids]
+    else:
+        # The IDs are sorted, so that the job and the order of the saved
+        # RSUs do not depend on the order of the given iterable, e.g. of
+        # a set, which changes between processes.
+        job_ids = sorted(set(ring_ids))
+        checkpoint = _Checkpoint(
+            checkpoint_path,
+            ["create_small_rsu_ranking", job_ids, theta, delta_],
+            checkpoint_interval)
+        job_rsus = checkpoint.load() or []
+        for ring_id in job_ids[len(job_rsus):]:
+            job_rsus.append(calc_rsu(ring_id, theta, delta_))
+            checkpoint.save_if_due(job_rsus)
+        checkpoint.remove()
+        rsus = dict(zip(job_ids, job_rsus))
+        rsu_list = [rsus[ring_id] for ring_id in ring_ids]
 
     rank_table = pd.DataFrame({
         "Ring ID": ring_ids,
@@ -1,3 +1,5 @@
+from typing import Sequence
+
 import numpy as np
 from scipy.spatial.transform import Rotation as R
 
@@ -6,7 +8,7 @@ from ._local_vecs_rots import _rot_ac, _rot_ca, _x_ac_coord_a
 
 
 def _calc_chain_end(
-        chain_id: str, theta: float, delta_: float
+        chain_id: str, theta: float, delta_: float | Sequence[float]
         ) -> tuple[np.ndarray, R]:
     """Calculate the position and the rotation of the end of the chain
     measured from the global coordinate system.
@@ -15,7 +17,9 @@ def _calc_chain_end(
         chain_id (str): Conformation ID of the chain, e.g., "RRFFRL".
         theta (float): Tilting angle of the two C-C bonds in the ligand
             in degrees. 0 <= theta <= 90.
-        delta_ (float): Angle in degrees. 0 < delta\_ <= 180.
+        delta_ (float | Sequence[float]):
+            Angle in degrees. 0 < delta\_ <= 180. A sequence gives the
+            angle of each connection in the chain.
 
     Returns:
         tuple[np.ndarray, R]:
@@ -30,7 +34,7 @@ def _calc_chain_end(
 
 
 def _calc_global_lig_ends_in_chain(
-        conf_id: str, theta: float, delta_: float
+        conf_id: str, theta: float, delta_: float | Sequence[float]
         ) -> list[tuple[np.ndarray, R]]:
     """Calculate the positions and rotations of the ends of the ligands
     in the chain measured from the global coordinate system.
@@ -39,7 +43,9 @@ def _calc_global_lig_ends_in_chain(
         conf_id (str): Conformation ID of the chain, e.g., "RRFFRL".
         theta (float): Tilting angle of the two C-C bonds in the ligand
             in degrees. 0 <= theta <= 90.
-        delta_ (float): Angle in degrees. 0 < delta\_ <= 180.
+        delta_ (float | Sequence[float]):
+            Angle in degrees. 0 < delta\_ <= 180. A sequence gives the
+            angle of each connection in the chain.
 
     Returns:
         list[tuple[np.ndarray, R]]: 
@@ -52,6 +58,14 @@ def _calc_global_lig_ends_in_chain(
     lig_ends = []
     lig_types = _id_to_lig_types(conf_id)
     con_types = _id_to_con_types(conf_id)
+    if np.ndim(delta_) == 0:
+        con_deltas = [delta_] * len(con_types)
+    else:
+        con_deltas = [float(d) for d in delta_]
+        if len(con_deltas) < len(con_types):
+            raise ValueError(
+                "The number of the deltas should be at least the number "
+                "of the connections.")
 
     # Position vector of the end of the most recent ligand measured 
     # from the global coordinate system.
@@ -72,8 +86,9 @@ def _calc_global_lig_ends_in_chain(
     x_of_prev_lig_end = local_d_x_of_first_lig
     rot_of_prev_lig_end = local_d_rot_of_first_lig
 
-    for lig_type, con_type in zip(lig_types[1:], con_types):
-        con_rot = _rot_ca(con_type, delta_)
+    for lig_type, con_type, con_delta in zip(
+            lig_types[1:], con_types, con_deltas):
+        con_rot = _rot_ca(con_type, con_delta)
         local_d_x = _x_ac_coord_a(lig_type, theta)
         local_d_rot = _rot_ac(lig_type, theta)
 
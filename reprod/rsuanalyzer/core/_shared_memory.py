@@ -0,0 +1,80 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# The name of the shared memory block, the shape and the dtype of an
+# array, which is enough to attach the array in another process.
+_ArraySpec = tuple[str, tuple[int, ...], str]
+
+
+class _SharedArrays:
+    """Numpy arrays placed in shared memory.
+
+    The arrays are copied into shared memory blocks when entering the
+    context, and the blocks are released when exiting it. The specs of
+    the arrays are passed to worker processes, which attach the arrays
+    with ``_attach_arrays`` without copying them.
+
+    Args:
+        arrays (dict[str, np.ndarray]): The arrays to share.
+
+    Example:
+        >>> with _SharedArrays({"a": np.arange(3)}) as shared:
+        ...     shared.arrays["a"]  # view of the shared memory
+        ...     shared.specs        # to be passed to the workers
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray]) -> None:
+        self._sources = arrays
+        self._blocks: list[shared_memory.SharedMemory] = []
+        self.arrays: dict[str, np.ndarray] = {}
+        self.specs: dict[str, _ArraySpec] = {}
+
+    def __enter__(self) -> "_SharedArrays":
+        try:
+            for key, source in self._sources.items():
+                source = np.asarray(source)
+                # Blocks of size 0 are not allowed.
+                block = shared_memory.SharedMemory(
+                    create=True, size=max(source.nbytes, 1))
+                self._blocks.append(block)
+                array = np.ndarray(
+                    source.shape, dtype=source.dtype, buffer=block.buf)
+                array[...] = source
+                self.arrays[key] = array
+                self.specs[key] = (
+                    block.name, source.shape, source.dtype.str)
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        # The views have to be released before closing the blocks.
+        self.arrays.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+
+def _attach_arrays(
+        specs: dict[str, _ArraySpec]
+        ) -> tuple[dict[str, np.ndarray], list[shared_memory.SharedMemory]]:
+    """Attach the arrays shared by ``_SharedArrays``.
+
+    Args:
+        specs (dict[str, _ArraySpec]): ``_SharedArrays.specs``.
+
+    Returns:
+        tuple[dict[str, np.ndarray], list[shared_memory.SharedMemory]]:
+            The arrays, and the blocks, which must be kept alive while
+            the arrays are used.
+    """
+    arrays = {}
+    blocks = []
+    for key, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return arrays, blocks
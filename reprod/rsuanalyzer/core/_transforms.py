@@ -0,0 +1,346 @@
+from typing import Iterable
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from .ligand_geometry import LigandGeometry
+
+# The order of the ligand types and connection types defines their
+# integer codes, e.g. "RL" -> 1 and "BF" -> 2.
+LIG_TYPES = ("RR", "RL", "LR", "LL")
+CON_TYPES = ("FF", "FB", "BF", "BB")
+
+
+def _encode_ids(
+        conf_ids: Iterable[str], length: int | None = None
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Encode conformation IDs of the same length into integer codes.
+
+    Args:
+        conf_ids (Iterable[str]):
+            Conformation IDs of chains or rings, e.g.
+            ``["RRFFLLBB", "RLFFRLFF"]``. All of them should have the
+            same length.
+        length (int, optional):
+            The length of the conformation IDs, which is needed to
+            encode no IDs. Default is None, which means the length of
+            the given IDs.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The codes of the ligand types and the connection types,
+            whose shapes are (n_ids, n_ligs) and (n_ids, n_cons),
+            respectively. The codes are the indices in ``LIG_TYPES``
+            and ``CON_TYPES``.
+
+    Examples:
+        >>> _encode_ids(["RRFFLLBB", "RLBFLRFB"])
+        (array([[0, 3], [1, 2]]), array([[0, 3], [2, 1]]))
+    """
+    conf_ids = list(conf_ids)
+    lengths = {len(conf_id) for conf_id in conf_ids}
+    if len(lengths) > 1:
+        raise ValueError(
+            "All the conformation IDs should have the same length.")
+    if lengths:
+        if length is not None and lengths != {length}:
+            raise ValueError(
+                f"The conformation IDs should have the length {length}.")
+        length = lengths.pop()
+    elif length is None:
+        raise ValueError(
+            "The length should be given to encode no conformation IDs.")
+    if length % 4 not in (0, 2):
+        raise ValueError(f"Invalid length of conformation IDs: {length}")
+
+    letters = np.frombuffer(
+        "".join(conf_ids).encode("ascii"), dtype=np.uint8
+        ).reshape(len(conf_ids), length)
+    is_lig_pos = np.arange(length) % 4 < 2
+    lig_letters = letters[:, is_lig_pos]
+    con_letters = letters[:, ~is_lig_pos]
+    if not (np.isin(lig_letters, (ord("R"), ord("L"))).all()
+            and np.isin(con_letters, (ord("F"), ord("B"))).all()):
+        raise ValueError("Invalid letters in the conformation IDs.")
+
+    # "R" and "F" are 0, and "L" and "B" are 1 in each bit.
+    lig_bits = (lig_letters == ord("L")).reshape(
+        len(conf_ids), lig_letters.shape[1] // 2, 2)
+    con_bits = (con_letters == ord("B")).reshape(
+        len(conf_ids), con_letters.shape[1] // 2, 2)
+    lig_codes = 2 * lig_bits[..., 0] + lig_bits[..., 1]
+    con_codes = 2 * con_bits[..., 0] + con_bits[..., 1]
+
+    return lig_codes.astype(np.intp), con_codes.astype(np.intp)
+
+
+def _lig_mats(
+        thetas: float | Iterable[float],
+        geometry: LigandGeometry | None = None
+        ) -> np.ndarray:
+    """Calculate the transforms from the coordinate system A to C of all
+    the ligand types.
+
+    The transforms are 4x4 homogeneous matrices consisting of the
+    rotation ``_rot_ac`` and the translation ``_x_ac_coord_a``.
+
+    Args:
+        thetas (float | Iterable[float]):
+            Tilting angles of the ligand in degrees. 0 <= theta <= 90.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        np.ndarray:
+            The transforms. Shape: np.shape(thetas) + (4, 4, 4), where
+            the first 4 is for the ligand types in ``LIG_TYPES``.
+    """
+    geometry = geometry or LigandGeometry()
+    thetas = np.asarray(thetas, dtype=float)
+    flat_thetas = thetas.reshape(-1)
+    zeros = np.zeros_like(flat_thetas)
+    bend = geometry.bend_angle
+
+    # Signs of the three angles of the rotation "XZX", and the offset
+    # of the last angle. See _rot_ac.
+    euler_params = {
+        "RR": (1, 1, 1, 180), "RL": (1, 1, -1, 0),
+        "LR": (-1, -1, 1, 0), "LL": (-1, -1, -1, 180)}
+
+    mats = np.zeros((len(flat_thetas), len(LIG_TYPES), 4, 4))
+    for i, lig_type in enumerate(LIG_TYPES):
+        s1, s2, s3, offset = euler_params[lig_type]
+        rot_ac = R.from_euler("XZX", np.stack([
+            s1 * flat_thetas, zeros + s2 * bend, s3 * flat_thetas + offset],
+            axis=1), degrees=True)
+        x_bc = R.from_euler("XZ", np.stack([
+            s1 * flat_thetas, zeros + s2 * bend], axis=1),
+            degrees=True).apply([geometry.arm_length_bc, 0, 0])
+        mats[:, i, :3, :3] = rot_ac.as_matrix()
+        mats[:, i, :3, 3] = np.array([geometry.arm_length_ab, 0, 0]) + x_bc
+        mats[:, i, 3, 3] = 1
+
+    return mats.reshape(thetas.shape + (len(LIG_TYPES), 4, 4))
+
+
+def _con_mats(deltas: float | Iterable[float]) -> np.ndarray:
+    """Calculate the rotations for connection on metal of all the
+    connection types as 4x4 homogeneous matrices.
+
+    See ``_rot_ca`` for the definition of the rotations.
+
+    Args:
+        deltas (float | Iterable[float]):
+            N-M-N angles in degrees. 0 < delta\_ <= 180.
+
+    Returns:
+        np.ndarray:
+            The rotations. Shape: np.shape(deltas) + (4, 4, 4), where
+            the first 4 is for the connection types in ``CON_TYPES``.
+    """
+    deltas = np.asarray(deltas, dtype=float)
+    flat_deltas = deltas.reshape(-1)
+    if not np.all((0 < flat_deltas) & (flat_deltas <= 180)):
+        raise ValueError(f"Invalid delta_: {deltas}")
+    zeros = np.zeros_like(flat_deltas)
+
+    rots = {
+        "FF": R.from_euler(
+            "Y", flat_deltas[:, np.newaxis] + 180, degrees=True),
+        "FB": R.from_euler(
+            "YZ", np.stack([flat_deltas, zeros + 180], axis=1),
+            degrees=True),
+        "BF": R.from_euler(
+            "YZ", np.stack([-flat_deltas, zeros + 180], axis=1),
+            degrees=True),
+        "BB": R.from_euler(
+            "Y", -flat_deltas[:, np.newaxis] + 180, degrees=True),
+    }
+
+    mats = np.zeros((len(flat_deltas), len(CON_TYPES), 4, 4))
+    for i, con_type in enumerate(CON_TYPES):
+        mats[:, i, :3, :3] = rots[con_type].as_matrix()
+        mats[:, i, 3, 3] = 1
+
+    return mats.reshape(deltas.shape + (len(CON_TYPES), 4, 4))
+
+
+def _elementwise_matmul(
+        a: list[np.ndarray], b: list[np.ndarray]) -> list[np.ndarray]:
+    """Multiply 3x3 matrices given as the lists of their elements."""
+    return [
+        a[3*i] * b[k] + a[3*i+1] * b[3+k] + a[3*i+2] * b[6+k]
+        for i in range(3) for k in range(3)]
+
+
+def _lig_elements(
+        thetas: np.ndarray, geometry: LigandGeometry | None = None
+        ) -> tuple[list[list[np.ndarray]], list[list[np.ndarray]]]:
+    """Calculate the elements of the transforms of the ligands for
+    arrays of thetas.
+
+    This gives the same transforms as ``_lig_mats`` with elementwise
+    operations, which is much faster than building ``Rotation`` objects
+    when each theta is used only once, e.g. for random samples.
+
+    Args:
+        thetas (np.ndarray): Tilting angles of the ligands in degrees.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        tuple[list[list[np.ndarray]], list[list[np.ndarray]]]:
+            For each ligand type in ``LIG_TYPES``, the 9 elements of the
+            rotation and the 3 elements of the translation. Each has the
+            shape of ``thetas``.
+    """
+    geometry = geometry or LigandGeometry()
+    bend = np.radians(geometry.bend_angle)
+    length_ab, length_bc = geometry.arm_length_ab, geometry.arm_length_bc
+    radians = np.radians(thetas)
+    cos, sin = np.cos(radians), np.sin(radians)
+    zero = np.zeros_like(cos)
+
+    # The same signs and offsets as in _lig_mats.
+    euler_params = {
+        "RR": (1, 1, 1, 180), "RL": (1, 1, -1, 0),
+        "LR": (-1, -1, 1, 0), "LL": (-1, -1, -1, 180)}
+
+    rots, trans = [], []
+    for lig_type in LIG_TYPES:
+        s1, s2, s3, offset = euler_params[lig_type]
+        # The rotation "XZX" by the angles a, b and c is
+        # [[cb, -sb cc, sb sc],
+        #  [ca sb, ca cb cc - sa sc, -ca cb sc - sa cc],
+        #  [sa sb, sa cb cc + ca sc, -sa cb sc + ca cc]],
+        # where cx and sx are cos(x) and sin(x), respectively.
+        ca, sa = cos, s1 * sin
+        cb, sb = np.cos(bend), s2 * np.sin(bend)
+        sign_c = -1 if offset == 180 else 1
+        cc, sc = sign_c * cos, sign_c * s3 * sin
+        rots.append([
+            zero + cb, -sb * cc, sb * sc,
+            ca * sb, cb * ca * cc - sa * sc, -cb * ca * sc - sa * cc,
+            sa * sb, cb * sa * cc + ca * sc, -cb * sa * sc + ca * cc])
+
+        # AB + BC, where BC is [length_bc, 0, 0] rotated around z by
+        # the bend angle and then around x by theta.
+        trans.append([
+            zero + (length_ab + cb * length_bc),
+            length_bc * sb * ca, length_bc * sb * sa])
+    return rots, trans
+
+
+def _con_elements(deltas: np.ndarray) -> list[list[np.ndarray]]:
+    """Calculate the elements of the rotations for connection on metal
+    for arrays of deltas.
+
+    This gives the same rotations as ``_con_mats`` with elementwise
+    operations.
+
+    Args:
+        deltas (np.ndarray): N-M-N angles in degrees. 0 < delta\_ <= 180.
+
+    Returns:
+        list[list[np.ndarray]]:
+            For each connection type in ``CON_TYPES``, the 9 elements of
+            the rotation. Each has the shape of ``deltas``.
+    """
+    if not np.all((0 < deltas) & (deltas <= 180)):
+        raise ValueError("Invalid delta_ in the given deltas.")
+    radians = np.radians(deltas)
+    cos, sin = np.cos(radians), np.sin(radians)
+    zero, one = np.zeros_like(cos), np.ones_like(cos)
+
+    # Rotations around the y-axis by delta + 180 ("FF") and -delta + 180
+    # ("BB"), and those by delta ("FB") and -delta ("BF") followed by
+    # the rotation around the z-axis by 180.
+    return [
+        [-cos, zero, -sin, zero, one, zero, sin, zero, -cos],
+        [-cos, zero, sin, zero, -one, zero, sin, zero, cos],
+        [-cos, zero, -sin, zero, -one, zero, -sin, zero, cos],
+        [-cos, zero, sin, zero, one, zero, -sin, zero, -cos]]
+
+
+def _compose_lig_ends(
+        lig_mats: np.ndarray, con_mats: np.ndarray) -> np.ndarray:
+    """Compose the transforms of the ligands and the connections of
+    chains into the transforms of the ends of the ligands.
+
+    This is the vectorized version of ``_calc_global_lig_ends_in_chain``.
+    The chains are processed at once along the leading axes, and the
+    loop runs only over the ligands.
+
+    Args:
+        lig_mats (np.ndarray):
+            Transforms of the ligands. Shape: (..., n_ligs, 4, 4).
+        con_mats (np.ndarray):
+            Transforms of the connections. Shape: (..., n_cons, 4, 4),
+            where n_cons >= n_ligs - 1. Extra connections are ignored.
+
+    Returns:
+        np.ndarray:
+            Transforms from the global coordinate system to the
+            coordinate systems C of the ligands. The translations are
+            the positions of the ends of the ligands.
+            Shape: (..., n_ligs, 4, 4).
+    """
+    lig_ends = np.empty(
+        np.broadcast_shapes(lig_mats.shape, con_mats.shape[:-3] + (1, 4, 4)))
+    lig_ends[..., 0, :, :] = lig_mats[..., 0, :, :]
+    for i in range(1, lig_mats.shape[-3]):
+        lig_ends[..., i, :, :] = lig_ends[..., i - 1, :, :] \
+            @ con_mats[..., i - 1, :, :] @ lig_mats[..., i, :, :]
+    return lig_ends
+
+
+def _unit_tables(
+        thetas: float | Iterable[float], deltas: float | Iterable[float],
+        geometry: LigandGeometry | None = None
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Calculate the transforms of all the units, i.e. the combinations
+    of a ligand and the following connection.
+
+    The transform of a unit is ``L @ C``, where L is the transform of
+    the ligand (see ``_lig_mats``) and C is the rotation of the
+    connection (see ``_con_mats``). Since C has no translation, the
+    translation of the unit is that of the ligand.
+
+    Args:
+        thetas (float | Iterable[float]):
+            Tilting angles of the ligand in degrees.
+        deltas (float | Iterable[float]):
+            N-M-N angles in degrees.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The rotations and the translations of the units, whose
+            shapes are np.shape(thetas) + np.shape(deltas) + (16, 3, 3)
+            and np.shape(thetas) + np.shape(deltas) + (16, 3),
+            respectively. The index of the unit is
+            ``4 * lig_code + con_code``.
+    """
+    lig_mats = _lig_mats(thetas, geometry)
+    con_mats = _con_mats(deltas)
+    theta_shape = lig_mats.shape[:-3]
+    delta_shape = con_mats.shape[:-3]
+
+    # Shape: theta_shape + delta_shape + (4, 4, 3, 3)
+    lig_rots = lig_mats[..., :3, :3].reshape(
+        theta_shape + (1,) * len(delta_shape) + (4, 1, 3, 3))
+    con_rots = con_mats[..., :3, :3].reshape(delta_shape + (1, 4, 3, 3))
+    rots = lig_rots @ con_rots
+
+    trans = np.broadcast_to(
+        lig_mats[..., :3, 3].reshape(
+            theta_shape + (1,) * len(delta_shape) + (4, 1, 3)),
+        rots.shape[:-1])
+
+    return (
+        rots.reshape(rots.shape[:-4] + (16, 3, 3)),
+        np.ascontiguousarray(trans).reshape(rots.shape[:-4] + (16, 3)))
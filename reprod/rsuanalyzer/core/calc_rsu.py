@@ -1,3 +1,5 @@
+from typing import Sequence
+
 import numpy as np
 
 from ._conf_id import _list_chains_derived_from_the_ring
@@ -5,7 +7,8 @@ from ._global_vecs_rots import _calc_chain_end
 
 
 def calc_rsu(
-        conf_id_of_ring: str, theta: float, delta_: float = 87
+        conf_id_of_ring: str, theta: float,
+        delta_: float | Sequence[float] = 87
         ) -> float:
     """Calculate the "Ring Strain per Unit" (RSU) for a ring.
 
@@ -28,9 +31,11 @@ def calc_rsu(
         theta (float): 
             Tilting angle of the two C-C bonds in the ligand
             in degrees. 0 <= theta <= 90.
-        delta_ (float, optional):
+        delta_ (float | Sequence[float], optional):
             N-Pd-N angle. (unit: degree) 0 < delta\_ <= 180. 
-            Default is 87.
+            Default is 87. For rings with different metals, a sequence
+            of the angles can be given, whose i-th element is the angle
+            of the metal connecting the i-th ligand and the next one.
 
     Returns:
         float: The RSU for the ring.
@@ -43,6 +48,10 @@ def calc_rsu(
         >>> import rsuanalyzer as ra
         >>> ra.calc_rsu("RRFFLRFBRRFFLLBB", 26, 103)
         0.23441964774920904
+
+        >>> import rsuanalyzer as ra
+        >>> ra.calc_rsu("RLFFRLFF", 30, [87, 120])
+        0.9004836509978896
     """
     # Validate the input.
     if len(conf_id_of_ring) % 4 != 0:
@@ -51,6 +60,10 @@ def calc_rsu(
             "be a multiple of 4.")
 
     chain_length = len(conf_id_of_ring) // 4
+    if np.ndim(delta_) != 0:
+        return _calc_rsu_with_site_deltas(
+            conf_id_of_ring, theta, [float(d) for d in delta_])
+
     conf_ids = _list_chains_derived_from_the_ring(conf_id_of_ring)
 
     ave_chain_end_dist = sum(
@@ -60,8 +73,40 @@ def calc_rsu(
     return ave_chain_end_dist / chain_length
 
 
+def _calc_rsu_with_site_deltas(
+        conf_id_of_ring: str, theta: float, deltas: list[float]
+        ) -> float:
+    """Calculate the RSU for a ring with the angle of each metal.
+
+    Args:
+        conf_id_of_ring (str): Conformation ID of the ring.
+        theta (float): Tilting angle of the two C-C bonds in the ligand
+            in degrees. 0 <= theta <= 90.
+        deltas (list[float]):
+            The angles of the metals in degrees. The i-th element is of
+            the metal connecting the i-th ligand and the next one.
+
+    Returns:
+        float: The RSU for the ring.
+    """
+    chain_length = len(conf_id_of_ring) // 4
+    if len(deltas) != chain_length:
+        raise ValueError(
+            "The number of the deltas should be the number of ligands.")
+
+    # The chain cut before the i-th ligand starts with the i-th ligand,
+    # and its connections are the i-th one and the followings.
+    sum_of_dists = sum(
+        _calc_chain_end_dist(
+            (conf_id_of_ring[4*i:] + conf_id_of_ring[:4*i])[:-2], theta,
+            deltas[i:] + deltas[:i])
+        for i in range(chain_length))
+
+    return sum_of_dists / chain_length / chain_length
+
+
 def _calc_chain_end_dist(
-        conf_id: str, theta: float, delta_: float
+        conf_id: str, theta: float, delta_: float | Sequence[float]
         ) -> float:
     """Calculate the distance between the two ends of the chain.
 
@@ -69,7 +114,9 @@ def _calc_chain_end_dist(
         conf_id (str): Conformation ID of the chain, e.g., "RRFFRL".
         theta (float): Tilting angle of the two C-C bonds in the ligand
             in degrees. 0 <= theta <= 90.
-        delta_ (float): Angle in degrees. 0 < delta\_ <= 180.
+        delta_ (float | Sequence[float]):
+            Angle in degrees. 0 < delta\_ <= 180. A sequence gives the
+            angle of each connection in the chain.
 
     Returns:
         float: The distance between the two ends of the chain.
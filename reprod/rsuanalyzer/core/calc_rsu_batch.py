@@ -0,0 +1,635 @@
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+
+from ._transforms import (_con_elements, _elementwise_matmul, _encode_ids,
+                          _lig_elements, _unit_tables)
+from .ligand_geometry import LigandGeometry
+
+# The maximum number of (theta, delta, ring) combinations whose
+# transforms are held in memory at once.
+_MAX_BLOCK_SIZE = 1 << 14
+
+_DTYPES = {"float64": np.float64, "float32": np.float32}
+
+
+def _float32_error_bound(num_of_ligs: int) -> float:
+    """Return the bound of the absolute error of the RSUs of rings
+    calculated in float32.
+
+    The error grows with the length of the product of the transforms.
+    The bound is about 50 times the largest error observed for the rings
+    with up to 6 ligands over all the thetas.
+    """
+    return 8 * num_of_ligs**2 * float(np.finfo(np.float32).eps)
+
+
+def calc_rsu_batch(
+        ring_ids: Iterable[str], thetas: float | Iterable[float],
+        delta_: float | Iterable[float] = 87,
+        precision: str = "float64",
+        geometry: LigandGeometry | Iterable[LigandGeometry] | None = None
+        ) -> np.ndarray:
+    """Calculate the RSUs of many rings for many thetas and deltas.
+
+    This is the vectorized version of :func:`calc_rsu
+    <rsuanalyzer.core.calc_rsu.calc_rsu>`. Instead of building each
+    chain derived from a ring from scratch, the transform of the whole
+    ring and its partial products are computed once, and the end
+    distances of all the chains are derived from them. Consider the
+    transform of the ring cut before the first ligand, M = (R, t), and
+    the partial product of the first j units, whose translation is p_j.
+    Then, the end distance of the chain cut before the (j+1)-th ligand
+    is ||(R - I) p_j + t||.
+
+    With ``precision="float32"``, the products are computed in single
+    precision, which halves the memory traffic and doubles the number of
+    values per SIMD instruction. The absolute error of the RSUs is then
+    below about 1e-6 for rings with up to 6 ligands, which is enough to
+    screen rings, but not to rank rings with close RSUs. Use
+    :func:`calc_smallest_rsus
+    <rsuanalyzer.core.calc_rsu_batch.calc_smallest_rsus>` for rankings,
+    which re-checks the rings near the boundary in double precision.
+
+    A sequence of ligand geometries adds another axis to the sweep, e.g.
+    of the bend angles. All the geometries are calculated in the same
+    pass as the thetas and deltas.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+            They can have different numbers of ligands.
+        thetas (float | Iterable[float]):
+            Tilting angles of the two C-C bonds in the ligand in
+            degrees. 0 <= theta <= 90.
+        delta_ (float | Iterable[float], optional):
+            N-Pd-N angles in degrees. 0 < delta\_ <= 180.
+            Default is 87.
+        precision (str, optional):
+            "float64" or "float32". Default is "float64".
+        geometry (LigandGeometry | Iterable[LigandGeometry], optional):
+            The geometry of the ligand, or a sequence of them. Default
+            is None, which means ``LigandGeometry()``.
+
+    Returns:
+        np.ndarray:
+            The RSUs of the given precision.
+            Shape: (n_geometries,) + np.shape(thetas) + np.shape(delta\_)
+            + (n_rings,), where (n_geometries,) is omitted unless a
+            sequence of geometries is given.
+
+    Examples:
+        >>> import rsuanalyzer as ra
+        >>> ra.calc_rsu_batch(["RLFFRLFFRLFF", "RRFFLRFBRRFFLLBB"], 34)
+        array([0.22008367, 0.29421719])
+        >>> ra.calc_rsu_batch(
+        ...     ra.enum_ring_ids(3), range(0, 91), [87, 90]).shape
+        (91, 2, 376)
+    """
+    if precision not in _DTYPES:
+        raise ValueError(f"Invalid precision: {precision}")
+    ring_ids = list(ring_ids)
+    thetas = np.asarray(thetas, dtype=float)
+    deltas = np.asarray(delta_, dtype=float)
+    if geometry is None or isinstance(geometry, LigandGeometry):
+        geometries, shape = [geometry], thetas.shape + deltas.shape
+    else:
+        geometries = list(geometry)
+        shape = (len(geometries),) + thetas.shape + deltas.shape
+
+    # The geometries and the thetas are merged into one axis of the
+    # tables, which is flattened with the deltas in the calculation.
+    flat_thetas = thetas.reshape(-1)
+    flat_deltas = deltas.reshape(-1)
+    tables = [
+        _unit_tables(flat_thetas, flat_deltas, geometry)
+        for geometry in geometries]
+    unit_tables = (
+        np.concatenate([rots for rots, _ in tables]),
+        np.concatenate([trans for _, trans in tables]))
+    tiled_thetas = np.tile(flat_thetas, len(geometries))
+
+    rsus = np.empty(shape + (len(ring_ids),), dtype=_DTYPES[precision])
+    for idxs in _group_by_length(ring_ids).values():
+        lig_codes, con_codes = _encode_ids(ring_ids[i] for i in idxs)
+        rsus[..., idxs] = _calc_rsu_of_codes(
+            lig_codes, con_codes, tiled_thetas, flat_deltas, unit_tables,
+            dtype=_DTYPES[precision]).reshape(shape + (len(idxs),))
+    return rsus
+
+
+def calc_rsu_batch_per_site(
+        ring_ids: Iterable[str], thetas: float | Iterable[float],
+        site_deltas: Iterable[float] | Iterable[Iterable[float]],
+        precision: str = "float64",
+        geometry: LigandGeometry | None = None
+        ) -> np.ndarray:
+    """Calculate the RSUs of rings with different N-M-N angles at
+    different metals.
+
+    The i-th element of a vector of the deltas is the N-M-N angle of
+    the metal connecting the i-th ligand and the next one, i.e. of the
+    i-th connection in the conformation ID. Many vectors, e.g. all the
+    combinations of the angles of two metals, are calculated at once
+    together with all the rings and the thetas.
+
+    See also:
+        :func:`calc_rsu <rsuanalyzer.core.calc_rsu.calc_rsu>`, which
+        also accepts a vector of the deltas for a single ring.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings with the same number of ligands,
+            e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+        thetas (float | Iterable[float]):
+            Tilting angles of the two C-C bonds in the ligand in
+            degrees. 0 <= theta <= 90.
+        site_deltas (Iterable[float] | Iterable[Iterable[float]]):
+            Vectors of the N-M-N angles in degrees. 0 < delta\_ <= 180.
+            Shape: (..., n_ligs).
+        precision (str, optional):
+            "float64" or "float32". Default is "float64".
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        np.ndarray:
+            The RSUs. Shape: np.shape(thetas) + np.shape(site_deltas)[:-1]
+            + (n_rings,).
+
+    Example:
+        >>> import itertools
+        >>> import rsuanalyzer as ra
+        >>> site_deltas = list(itertools.product([87, 90, 120], repeat=2))
+        >>> ra.calc_rsu_batch_per_site(
+        ...     ra.enum_ring_ids(2), range(0, 91), site_deltas).shape
+        (91, 9, 44)
+    """
+    if precision not in _DTYPES:
+        raise ValueError(f"Invalid precision: {precision}")
+    dtype = _DTYPES[precision]
+    ring_ids = list(ring_ids)
+    thetas = np.asarray(thetas, dtype=float)
+    site_deltas = np.asarray(site_deltas, dtype=float)
+    if site_deltas.ndim == 0:
+        raise ValueError("site_deltas should be vectors of the deltas.")
+    n_ligs = site_deltas.shape[-1]
+    if any(len(ring_id) != 4 * n_ligs for ring_id in ring_ids):
+        raise ValueError(
+            "The length of the conformation ID of the ring should be "
+            "4 times the length of the vectors of the deltas.")
+
+    # The units of all the distinct deltas are in the same table, and
+    # the index of the unit at the j-th position of a ring is
+    # 16 * (index of the delta) + (index of the unit).
+    combos = site_deltas.reshape(-1, n_ligs)
+    delta_values, delta_idxs = np.unique(combos, return_inverse=True)
+    delta_idxs = delta_idxs.reshape(combos.shape)
+    flat_thetas = thetas.reshape(-1)
+    unit_rots, unit_trans = _unit_tables(flat_thetas, delta_values, geometry)
+    n_thetas, n_units = len(flat_thetas), 16 * len(delta_values)
+    unit_rots = np.ascontiguousarray(
+        unit_rots.reshape(n_thetas, n_units, 9).transpose(2, 0, 1),
+        dtype=dtype)
+    unit_trans = np.ascontiguousarray(
+        unit_trans.reshape(n_thetas, n_units, 3).transpose(2, 0, 1),
+        dtype=dtype)
+    lig_codes, con_codes = _encode_ids(ring_ids, 4 * n_ligs)
+    unit_idxs = 4 * lig_codes + con_codes
+
+    rsus = np.empty((n_thetas, len(combos), len(ring_ids)), dtype=dtype)
+    chunk_size = max(1, _MAX_BLOCK_SIZE // (n_thetas * len(combos)))
+    for start in range(0, len(ring_ids), chunk_size):
+        chunk = unit_idxs[start:start+chunk_size]
+
+        def units(j: int) -> tuple[np.ndarray, np.ndarray]:
+            # Shape of the indices: (n_combos, n_rings_in_chunk)
+            idxs = 16 * delta_idxs[:, j, np.newaxis] + chunk[:, j]
+            return unit_rots[:, :, idxs], unit_trans[:, :, idxs]
+
+        rsus[..., start:start+chunk_size] = _sum_of_end_dists(
+            units, n_ligs) / n_ligs**2
+
+    return rsus.reshape(
+        thetas.shape + site_deltas.shape[:-1] + (len(ring_ids),))
+
+
+def calc_smallest_rsus(
+        ring_ids: Iterable[str], thetas: float | Iterable[float],
+        delta_: float | Iterable[float] = 87, top_num: int = 1,
+        precision: str = "float64"
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Find the rings with the smallest RSUs for each theta and delta.
+
+    Rings with the same RSU are taken in the descending order of their
+    indices in ``ring_ids``.
+
+    With ``precision="float32"``, all the RSUs are first calculated in
+    single precision. Then, the rings whose RSUs are within the error
+    bound of the ``top_num``-th smallest one are calculated again in
+    double precision, and only those values are compared. Therefore,
+    the result is exactly the same as that with ``precision="float64"``,
+    and most of the work is done in single precision.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+            They can have different numbers of ligands.
+        thetas (float | Iterable[float]):
+            Tilting angles of the two C-C bonds in the ligand in
+            degrees. 0 <= theta <= 90.
+        delta_ (float | Iterable[float], optional):
+            N-Pd-N angles in degrees. 0 < delta\_ <= 180.
+            Default is 87.
+        top_num (int, optional):
+            The number of rings to find. Default is 1.
+        precision (str, optional):
+            "float64" or "float32" for the screening of the rings.
+            Default is "float64".
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The indices of the rings in ``ring_ids`` and their RSUs in
+            double precision, in the ascending order of the RSUs.
+            Shapes: np.shape(thetas) + np.shape(delta\_) + (k,), where
+            k = min(top_num, n_rings).
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ring_ids = sorted(ra.enum_ring_ids(3))
+        >>> idxs, rsus = ra.calc_smallest_rsus(
+        ...     ring_ids, [0, 40], top_num=3, precision="float32")
+        >>> [ring_ids[i] for i in idxs[1]]
+        ['RLFFRLFBLRBF', 'RLFFRLFFRLFF', 'RLFFRLFFLRFF']
+    """
+    if precision not in _DTYPES:
+        raise ValueError(f"Invalid precision: {precision}")
+    if top_num < 1:
+        raise ValueError(f"Invalid top_num: {top_num}")
+    ring_ids = list(ring_ids)
+    thetas = np.asarray(thetas, dtype=float)
+    deltas = np.asarray(delta_, dtype=float)
+    flat_thetas = thetas.reshape(-1)
+    flat_deltas = deltas.reshape(-1)
+    unit_tables = _unit_tables(flat_thetas, flat_deltas)
+
+    # The candidates of each group of the rings of the same length are
+    # selected first, and then they are merged.
+    top_num = min(top_num, len(ring_ids))
+    n_angles = len(flat_thetas) * len(flat_deltas)
+    cand_idxs: list[np.ndarray] = [np.empty(0, dtype=np.int64)] * n_angles
+    cand_rsus: list[np.ndarray] = [np.empty(0)] * n_angles
+    for idxs in _group_by_length(ring_ids).values():
+        lig_codes, con_codes = _encode_ids(ring_ids[i] for i in idxs)
+        top_idxs, top_rsus = _calc_smallest_rsus_of_codes(
+            lig_codes, con_codes, flat_thetas, flat_deltas,
+            np.array(idxs), top_num, precision, unit_tables)
+        for k in range(n_angles):
+            cand_idxs[k] = np.concatenate(
+                [cand_idxs[k], top_idxs.reshape(n_angles, -1)[k]])
+            cand_rsus[k] = np.concatenate(
+                [cand_rsus[k], top_rsus.reshape(n_angles, -1)[k]])
+
+    top_idxs = np.empty((n_angles, top_num), dtype=np.int64)
+    top_rsus = np.empty((n_angles, top_num))
+    for k in range(n_angles):
+        top_idxs[k], top_rsus[k] = _select_top(
+            cand_idxs[k], cand_rsus[k], top_num)
+    shape = thetas.shape + deltas.shape + (top_num,)
+    return top_idxs.reshape(shape), top_rsus.reshape(shape)
+
+
+def _calc_smallest_rsus_of_codes(
+        lig_codes: np.ndarray, con_codes: np.ndarray,
+        thetas: np.ndarray, deltas: np.ndarray, ring_idxs: np.ndarray,
+        top_num: int, precision: str = "float64",
+        unit_tables: tuple[np.ndarray, np.ndarray] | None = None
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Find the encoded rings with the smallest RSUs.
+
+    Args:
+        lig_codes (np.ndarray):
+            The codes of the ligand types. Shape: (n_rings, n_ligs).
+        con_codes (np.ndarray):
+            The codes of the connection types. Shape: (n_rings, n_ligs).
+        thetas (np.ndarray): Tilting angles. Shape: (n_thetas,).
+        deltas (np.ndarray): N-Pd-N angles. Shape: (n_deltas,).
+        ring_idxs (np.ndarray):
+            The indices of the rings, by which the rings with the same
+            RSU are ordered. Shape: (n_rings,).
+        top_num (int): The number of rings to find.
+        precision (str, optional):
+            The precision of the screening. Default is "float64".
+        unit_tables (tuple[np.ndarray, np.ndarray], optional):
+            The result of ``_unit_tables(thetas, deltas)``, if already
+            computed. Default is None.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The indices and the RSUs of the rings in double precision.
+            Shapes: (n_thetas, n_deltas, min(top_num, n_rings)).
+    """
+    if unit_tables is None:
+        unit_tables = _unit_tables(thetas, deltas)
+    n_rings, n_ligs = lig_codes.shape
+    top_num = min(top_num, n_rings)
+    rsus = _calc_rsu_of_codes(
+        lig_codes, con_codes, thetas, deltas, unit_tables,
+        dtype=_DTYPES[precision])
+
+    if precision != "float64" and top_num > 0:
+        # A ring can be in the top only if its RSU can be smaller than
+        # the top_num-th smallest one, considering the errors of both.
+        rsus = rsus.astype(np.float64)
+        kth_rsus = np.partition(rsus, top_num - 1, axis=-1)[
+            ..., top_num - 1:top_num]
+        is_cand = rsus <= kth_rsus + 2 * _float32_error_bound(n_ligs)
+        cands = np.flatnonzero(is_cand.any(axis=(0, 1)))
+        cand_rsus = _calc_rsu_of_codes(
+            lig_codes[cands], con_codes[cands], thetas, deltas,
+            unit_tables)
+        rsus = np.where(is_cand[..., cands], cand_rsus, np.inf)
+        ring_idxs = ring_idxs[cands]
+
+    top_idxs = np.empty(rsus.shape[:2] + (top_num,), dtype=np.int64)
+    top_rsus = np.empty(rsus.shape[:2] + (top_num,))
+    for i, j in np.ndindex(rsus.shape[:2]):
+        top_idxs[i, j], top_rsus[i, j] = _select_top(
+            ring_idxs, rsus[i, j], top_num)
+    return top_idxs, top_rsus
+
+
+def _select_top(
+        idxs: np.ndarray, rsus: np.ndarray, top_num: int
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Select the rings with the smallest RSUs.
+
+    Rings with the same RSU are selected in the descending order of the
+    indices, i.e. of the ring IDs, so that the result does not depend on
+    how the rings are split into shards.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The indices and the RSUs of the selected rings in the
+            ascending order of the RSUs.
+    """
+    if len(rsus) > top_num:
+        # All the rings tied with the top_num-th one are candidates.
+        kth_rsu = np.partition(rsus, top_num - 1)[top_num - 1]
+        candidates = np.flatnonzero(rsus <= kth_rsu)
+        idxs, rsus = idxs[candidates], rsus[candidates]
+    order = np.lexsort((-idxs, rsus))[:top_num]
+    return idxs[order], rsus[order]
+
+
+def _group_by_length(ring_ids: list[str]) -> dict[int, list[int]]:
+    """Group the indices of the rings by the lengths of their IDs."""
+    idxs_by_len: dict[int, list[int]] = {}
+    for i, ring_id in enumerate(ring_ids):
+        if len(ring_id) % 4 != 0 or len(ring_id) == 0:
+            raise ValueError(
+                "The length of the conformation ID of the ring should "
+                "be a positive multiple of 4.")
+        idxs_by_len.setdefault(len(ring_id), []).append(i)
+    return idxs_by_len
+
+
+def _soa_unit_tables(
+        unit_tables: tuple[np.ndarray, np.ndarray],
+        dtype: type = np.float64
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Lay out the unit tables for :func:`_calc_rsu_of_codes`.
+
+    The elements of the rotations and the translations are stored
+    separately, so that the products of the tiny matrices are computed
+    with elementwise operations over all the angles and rings at once.
+
+    Args:
+        unit_tables (tuple[np.ndarray, np.ndarray]):
+            The result of ``_unit_tables(thetas, deltas)``.
+        dtype (type, optional):
+            The floating point type of the tables.
+            Default is np.float64.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The rotations and the translations. Shapes:
+            (9, n_angles, 16) and (3, n_angles, 16).
+    """
+    unit_rots, unit_trans = unit_tables
+    unit_rots = np.ascontiguousarray(
+        unit_rots.reshape(-1, 16, 9).transpose(2, 0, 1), dtype=dtype)
+    unit_trans = np.ascontiguousarray(
+        unit_trans.reshape(-1, 16, 3).transpose(2, 0, 1), dtype=dtype)
+    return unit_rots, unit_trans
+
+
+def _calc_rsu_of_codes(
+        lig_codes: np.ndarray, con_codes: np.ndarray,
+        thetas: np.ndarray, deltas: np.ndarray,
+        unit_tables: tuple[np.ndarray, np.ndarray] | None = None,
+        dtype: type = np.float64,
+        soa_tables: tuple[np.ndarray, np.ndarray] | None = None
+        ) -> np.ndarray:
+    """Calculate the RSUs of the encoded rings.
+
+    Args:
+        lig_codes (np.ndarray):
+            The codes of the ligand types. Shape: (n_rings, n_ligs).
+        con_codes (np.ndarray):
+            The codes of the connection types. Shape: (n_rings, n_ligs).
+        thetas (np.ndarray): Tilting angles. Shape: (n_thetas,).
+        deltas (np.ndarray): N-Pd-N angles. Shape: (n_deltas,).
+        unit_tables (tuple[np.ndarray, np.ndarray], optional):
+            The result of ``_unit_tables(thetas, deltas)``, if already
+            computed. Default is None.
+        dtype (type, optional):
+            The floating point type of the calculation.
+            Default is np.float64.
+        soa_tables (tuple[np.ndarray, np.ndarray], optional):
+            The result of ``_soa_unit_tables`` of the unit tables in
+            ``dtype``, which is used without copying instead of
+            ``unit_tables``. Default is None.
+
+    Returns:
+        np.ndarray: The RSUs. Shape: (n_thetas, n_deltas, n_rings).
+    """
+    if soa_tables is None:
+        soa_tables = _soa_unit_tables(
+            unit_tables if unit_tables is not None
+            else _unit_tables(thetas, deltas), dtype)
+    unit_rots, unit_trans = soa_tables
+    n_rings, n_ligs = lig_codes.shape
+    n_angles = len(thetas) * len(deltas)
+    unit_idxs = 4 * lig_codes + con_codes
+
+    rsus = np.empty((n_angles, n_rings), dtype=dtype)
+    chunk_size = max(1, _MAX_BLOCK_SIZE // n_angles)
+    for start in range(0, n_rings, chunk_size):
+        chunk = unit_idxs[start:start+chunk_size]
+        rsus[:, start:start+chunk_size] = _sum_of_end_dists(
+            lambda j: (unit_rots[:, :, chunk[:, j]],
+                       unit_trans[:, :, chunk[:, j]]),
+            n_ligs) / n_ligs**2
+
+    return rsus.reshape(len(thetas), len(deltas), n_rings)
+
+
+def _calc_rsu_of_sampled_angles(
+        lig_codes: np.ndarray, con_codes: np.ndarray,
+        thetas: np.ndarray, deltas: np.ndarray,
+        geometry: LigandGeometry | None = None
+        ) -> np.ndarray:
+    """Calculate the RSUs of the encoded rings whose ligands and metals
+    have their own angles.
+
+    Args:
+        lig_codes (np.ndarray):
+            The codes of the ligand types. Shape: (n_rings, n_ligs).
+        con_codes (np.ndarray):
+            The codes of the connection types. Shape: (n_rings, n_ligs).
+        thetas (np.ndarray):
+            Tilting angles of the ligands at each position.
+            Shape: (n_samples, n_ligs).
+        deltas (np.ndarray):
+            N-M-N angles of the metals at each position, i.e. of the
+            connections following the ligands.
+            Shape: (n_samples, n_ligs).
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        np.ndarray: The RSUs. Shape: (n_rings, n_samples).
+    """
+    n_rings, n_ligs = lig_codes.shape
+    n_samples = len(thetas)
+    unit_idxs = 4 * lig_codes + con_codes
+
+    # The units are computed for each chunk of the samples when they
+    # first appear in the rings, and shared by the following rings.
+    chunk_size = max(1, (_MAX_BLOCK_SIZE << 2) // n_ligs)
+    rsus = np.empty((n_rings, n_samples))
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        # Shapes of the elements: (n_ligs, n_samples_in_chunk)
+        lig_rots, lig_trans = _lig_elements(
+            np.ascontiguousarray(thetas[start:stop].T), geometry)
+        con_rots = _con_elements(np.ascontiguousarray(deltas[start:stop].T))
+        units: dict[tuple[int, int], tuple[np.ndarray, np.ndarray]] = {}
+
+        def unit(j: int, unit_idx: int) -> tuple[np.ndarray, np.ndarray]:
+            if (j, unit_idx) not in units:
+                lig_code, con_code = divmod(unit_idx, 4)
+                units[j, unit_idx] = (
+                    np.stack(_elementwise_matmul(
+                        [e[j] for e in lig_rots[lig_code]],
+                        [e[j] for e in con_rots[con_code]])),
+                    np.stack([e[j] for e in lig_trans[lig_code]]))
+            return units[j, unit_idx]
+
+        for i in range(n_rings):
+            rsus[i, start:stop] = _sum_of_end_dists(
+                lambda j: unit(j, unit_idxs[i, j]), n_ligs) / n_ligs**2
+
+    return rsus
+
+
+def _sum_of_end_dists(
+        units: Callable[[int], tuple[np.ndarray, np.ndarray]],
+        n_ligs: int) -> np.ndarray:
+    """Sum the end distances of all the chains derived from the rings.
+
+    Args:
+        units (Callable[[int], tuple[np.ndarray, np.ndarray]]):
+            The function returning the elements of the rotations and
+            the translations of the j-th units of the rings, whose
+            shapes are (9, ...) and (3, ...), respectively.
+        n_ligs (int): The number of ligands in a ring.
+
+    Returns:
+        np.ndarray: The sums of the end distances. Shape: (...).
+    """
+    return _sum_of_dists(_end_vecs(*_ring_transform(units, n_ligs)))
+
+
+def _sum_of_dists(end_vecs: Iterable[list[np.ndarray]]) -> np.ndarray:
+    """Sum the lengths of the vectors given by their elements."""
+    sum_of_dists = None
+    for end in end_vecs:
+        dists = np.sqrt(end[0] * end[0] + end[1] * end[1] + end[2] * end[2])
+        if sum_of_dists is None:
+            sum_of_dists = dists
+        else:
+            sum_of_dists += dists
+    return sum_of_dists
+
+
+def _ring_transform(
+        units: Callable[[int], tuple[np.ndarray, np.ndarray]],
+        n_ligs: int
+        ) -> tuple[list[np.ndarray], list[np.ndarray],
+                   list[list[np.ndarray]]]:
+    """Compose the units of the rings.
+
+    Args:
+        units (Callable[[int], tuple[np.ndarray, np.ndarray]]):
+            The function returning the elements of the rotations and
+            the translations of the j-th units of the rings, whose
+            shapes are (9, ...) and (3, ...), respectively.
+        n_ligs (int): The number of ligands in a ring.
+
+    Returns:
+        tuple[list[np.ndarray], list[np.ndarray], list[list[np.ndarray]]]:
+            The elements of the rotation R and the translation t of the
+            rings cut before the first ligand, and the translations p_j
+            of the partial products of the first j units for
+            1 <= j < n_ligs. rot[3*i+k] is the (i, k) element of R.
+    """
+    first_rot, first_trans = units(0)
+    rot = list(first_rot)
+    trans = list(first_trans)
+    prefix_trans = []
+    for j in range(1, n_ligs):
+        prefix_trans.append(trans)
+        rot, trans = _compose(rot, trans, *units(j))
+    return rot, trans, prefix_trans
+
+
+def _compose(
+        rot: list[np.ndarray], trans: list[np.ndarray],
+        next_rot: np.ndarray, next_trans: np.ndarray
+        ) -> tuple[list[np.ndarray], list[np.ndarray]]:
+    """Append a unit to the chains, i.e. compute the elements of the
+    product of the transforms (rot, trans) and (next_rot, next_trans).
+    """
+    trans = [
+        trans[i] + rot[3*i] * next_trans[0]
+        + rot[3*i+1] * next_trans[1] + rot[3*i+2] * next_trans[2]
+        for i in range(3)]
+    rot = [
+        rot[3*i] * next_rot[k] + rot[3*i+1] * next_rot[3+k]
+        + rot[3*i+2] * next_rot[6+k]
+        for i in range(3) for k in range(3)]
+    return rot, trans
+
+
+def _end_vecs(
+        rot: list[np.ndarray], trans: list[np.ndarray],
+        prefix_trans: list[list[np.ndarray]]
+        ) -> Iterator[list[np.ndarray]]:
+    """Yield the end vectors (R - I) p_j + t of the chains cut before
+    each ligand, starting from the first one, whose end is t.
+
+    The arguments are the result of ``_ring_transform``.
+    """
+    yield trans
+    rot_minus_i = list(rot)
+    for i in (0, 4, 8):
+        rot_minus_i[i] = rot[i] - 1
+    for prefix in prefix_trans:
+        yield [
+            rot_minus_i[3*i] * prefix[0] + rot_minus_i[3*i+1] * prefix[1]
+            + rot_minus_i[3*i+2] * prefix[2] + trans[i]
+            for i in range(3)]
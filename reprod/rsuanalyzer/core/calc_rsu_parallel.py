@@ -0,0 +1,124 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+import numpy as np
+
+from ._shared_memory import _attach_arrays, _SharedArrays
+from ._transforms import _encode_ids, _unit_tables
+from .calc_rsu_batch import (_calc_rsu_of_codes, _group_by_length,
+                             _soa_unit_tables)
+
+# The arrays attached by the worker process, and their memory blocks.
+_worker_arrays: dict[str, np.ndarray] = {}
+_worker_blocks: list = []
+
+
+def calc_rsu_parallel(
+        ring_ids: Iterable[str], thetas: float | Iterable[float],
+        delta_: float | Iterable[float] = 87,
+        num_workers: int | None = None
+        ) -> np.ndarray:
+    """Calculate the RSUs of many rings with a pool of worker processes.
+
+    The result is the same as that of :func:`calc_rsu_batch
+    <rsuanalyzer.core.calc_rsu_batch.calc_rsu_batch>`. The transforms of
+    the 16 combinations of the ligand and connection types for all the
+    thetas and deltas, laid out for the calculation, and the encoded
+    rings are computed once and placed in shared memory, together with
+    the array of the results.
+    The workers attach them without copying, and write the RSUs of
+    their rings directly into the results. Thus, the memory and the
+    warm-up time of each worker do not depend on the number of workers
+    or rings.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+            They can have different numbers of ligands.
+        thetas (float | Iterable[float]):
+            Tilting angles of the two C-C bonds in the ligand in
+            degrees. 0 <= theta <= 90.
+        delta_ (float | Iterable[float], optional):
+            N-Pd-N angles in degrees. 0 < delta\_ <= 180.
+            Default is 87.
+        num_workers (int, optional):
+            The number of worker processes. Default is None, which
+            means the number of CPUs.
+
+    Returns:
+        np.ndarray:
+            The RSUs. Shape: np.shape(thetas) + np.shape(delta\_)
+            + (n_rings,).
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.calc_rsu_parallel(
+        ...     ra.enum_ring_ids(3), range(0, 91), [87, 90],
+        ...     num_workers=4).shape
+        (91, 2, 376)
+    """
+    ring_ids = list(ring_ids)
+    thetas = np.asarray(thetas, dtype=float)
+    deltas = np.asarray(delta_, dtype=float)
+    num_workers = num_workers or os.cpu_count() or 1
+
+    idxs_by_len = _group_by_length(ring_ids)
+
+    flat_thetas = thetas.reshape(-1)
+    flat_deltas = deltas.reshape(-1)
+    # Laid out once here, so that the workers use them without copying.
+    unit_rots, unit_trans = _soa_unit_tables(
+        _unit_tables(flat_thetas, flat_deltas))
+    arrays = {
+        "thetas": flat_thetas, "deltas": flat_deltas,
+        "unit_rots": unit_rots, "unit_trans": unit_trans}
+    for length, idxs in idxs_by_len.items():
+        lig_codes, con_codes = _encode_ids(ring_ids[i] for i in idxs)
+        arrays[f"lig_codes_{length}"] = lig_codes
+        arrays[f"con_codes_{length}"] = con_codes
+        arrays[f"rsus_{length}"] = np.empty(
+            (len(flat_thetas), len(flat_deltas), len(idxs)))
+
+    # Each worker takes several tasks, so that the load is balanced.
+    tasks = []
+    for length, idxs in idxs_by_len.items():
+        task_size = -(-len(idxs) // (4 * num_workers))
+        for start in range(0, len(idxs), task_size):
+            tasks.append((length, start, min(start + task_size, len(idxs))))
+
+    rsus = np.empty(thetas.shape + deltas.shape + (len(ring_ids),))
+    with _SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(
+                max_workers=num_workers, initializer=_init_worker,
+                initargs=(shared.specs,)) as executor:
+            for _ in executor.map(_run_task, tasks):
+                pass
+        for length, idxs in idxs_by_len.items():
+            rsus[..., idxs] = shared.arrays[f"rsus_{length}"].reshape(
+                thetas.shape + deltas.shape + (len(idxs),))
+    return rsus
+
+
+def _init_worker(specs: dict) -> None:
+    """Attach the shared arrays in the worker process."""
+    arrays, blocks = _attach_arrays(specs)
+    _worker_arrays.update(arrays)
+    _worker_blocks.extend(blocks)
+
+
+def _run_task(task: tuple[int, int, int]) -> None:
+    """Calculate the RSUs of a range of the rings of the same length.
+
+    Args:
+        task (tuple[int, int, int]):
+            The length of the conformation IDs, and the start and the
+            stop of the range.
+    """
+    length, start, stop = task
+    arrays = _worker_arrays
+    arrays[f"rsus_{length}"][..., start:stop] = _calc_rsu_of_codes(
+        arrays[f"lig_codes_{length}"][start:stop],
+        arrays[f"con_codes_{length}"][start:stop],
+        arrays["thetas"], arrays["deltas"],
+        soa_tables=(arrays["unit_rots"], arrays["unit_trans"]))
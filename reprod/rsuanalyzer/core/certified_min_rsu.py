@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from ._transforms import (_con_elements, _elementwise_matmul, _encode_ids,
+                          _lig_elements)
+from .calc_rsu_batch import _sum_of_end_dists, calc_rsu_batch
+from .ligand_geometry import LigandGeometry
+
+
+@dataclass(frozen=True)
+class CertifiedMinRSU:
+    """The minimum RSU found by :func:`calc_certified_min_rsu`.
+
+    Attributes:
+        ring_id (str): The conformation ID of the minimizing ring.
+        theta (float): The minimizing theta in degrees.
+        rsu (float): The RSU of the ring at the theta.
+        lower_bound (float):
+            A lower bound of the RSUs of all the rings over the whole
+            interval. rsu - lower_bound <= tol.
+        num_of_evaluations (int): The number of the evaluated RSUs.
+    """
+    ring_id: str
+    theta: float
+    rsu: float
+    lower_bound: float
+    num_of_evaluations: int
+
+
+def calc_certified_min_rsu(
+        ring_ids: Iterable[str],
+        theta_range: tuple[float, float] = (0, 90),
+        delta_: float = 87, tol: float = 1e-9,
+        geometry: LigandGeometry | None = None
+        ) -> CertifiedMinRSU:
+    """Find the minimum RSU of the rings over an interval of theta with
+    a certified error bound.
+
+    A grid of theta can miss a narrow dip of RSU between the points.
+    Instead, the RSUs are bounded from below over subintervals with the
+    Lipschitz constant of RSU in theta, and only the subintervals whose
+    bounds are below the smallest RSU found so far are split further.
+    Thus, the minimum is certified to be within ``tol``, with far fewer
+    evaluations than a grid fine enough to give the same guarantee.
+
+    The Lipschitz constant comes from the transforms of the units. The
+    rotation of a ligand, whose first and last Euler angles are +-theta,
+    turns at most twice as fast as theta, its translation moves at
+    BC sin(bend_angle), and the connections do not depend on theta.
+    So, for the chains of n ligands, whose translations have the length
+    |AC|, the end distance changes at most at n BC sin(bend_angle) +
+    n (n - 1) |AC| per radian of theta, and the RSU, the sum of the n
+    end distances divided by n**2, changes at most at BC sin(bend_angle)
+    + (n - 1) |AC|.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+            They can have different numbers of ligands.
+        theta_range (tuple[float, float], optional):
+            The interval of theta in degrees. Default is (0, 90).
+        delta_ (float, optional):
+            N-Pd-N angle in degrees. 0 < delta\_ <= 180. Default is 87.
+        tol (float, optional):
+            The largest difference between the returned RSU and the
+            true minimum. Default is 1e-9.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        CertifiedMinRSU:
+            The minimizing ring and theta, the RSU, and the lower bound.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> result = ra.calc_certified_min_rsu(
+        ...     ra.enum_ring_ids(3), (30, 40))
+        >>> result.rsu - result.lower_bound <= 1e-9
+        True
+    """
+    ring_ids = list(ring_ids)
+    lo, hi = float(theta_range[0]), float(theta_range[1])
+    if not ring_ids:
+        raise ValueError("No ring is given.")
+    if not 0 <= lo <= hi <= 90:
+        raise ValueError(f"Invalid theta_range: {theta_range}")
+    if tol <= 0:
+        raise ValueError(f"tol should be positive: {tol}")
+    lipschitz_consts = _lipschitz_consts(
+        np.array([len(ring_id) // 4 for ring_id in ring_ids]),
+        geometry or LigandGeometry())
+
+    # The grid of about 1 degree is evaluated for all the rings at once.
+    grid = np.linspace(lo, hi, max(2, int(np.ceil(hi - lo)) + 1))
+    rsus = calc_rsu_batch(ring_ids, grid, delta_, geometry=geometry)
+    num_of_evaluations = rsus.size
+    best_theta_idx, best_ring = np.unravel_index(np.argmin(rsus), rsus.shape)
+    best = (rsus[best_theta_idx, best_ring], best_ring, grid[best_theta_idx])
+
+    # The subintervals, each of which is of a ring between two thetas.
+    rings = np.tile(np.arange(len(ring_ids)), len(grid) - 1)
+    starts = np.repeat(grid[:-1], len(ring_ids))
+    stops = np.repeat(grid[1:], len(ring_ids))
+    start_rsus = rsus[:-1].reshape(-1)
+    stop_rsus = rsus[1:].reshape(-1)
+    lower_bound = best[0]
+    while True:
+        lower_bounds = (start_rsus + stop_rsus) / 2 \
+            - lipschitz_consts[rings] * (stops - starts) / 2
+        to_split = lower_bounds < best[0] - tol
+        lower_bound = min(
+            lower_bound, lower_bounds[~to_split].min(initial=np.inf))
+        if not to_split.any():
+            break
+        rings, starts, stops = rings[to_split], starts[to_split], \
+            stops[to_split]
+        start_rsus, stop_rsus = start_rsus[to_split], stop_rsus[to_split]
+
+        mids = (starts + stops) / 2
+        mid_rsus = _calc_rsu_of_pairs(
+            ring_ids, rings, mids, delta_, geometry)
+        num_of_evaluations += len(mids)
+        i = np.argmin(mid_rsus)
+        if mid_rsus[i] < best[0]:
+            best = (mid_rsus[i], rings[i], mids[i])
+
+        rings = np.concatenate([rings, rings])
+        starts, stops = np.concatenate([starts, mids]), \
+            np.concatenate([mids, stops])
+        start_rsus, stop_rsus = np.concatenate([start_rsus, mid_rsus]), \
+            np.concatenate([mid_rsus, stop_rsus])
+
+    rsu, ring, theta = best
+    return CertifiedMinRSU(
+        ring_ids[ring], float(theta), float(rsu), float(lower_bound),
+        num_of_evaluations)
+
+
+def _lipschitz_consts(
+        n_ligs: np.ndarray, geometry: LigandGeometry) -> np.ndarray:
+    """Calculate the Lipschitz constants of the RSUs of the rings with
+    the numbers of ligands in theta in degrees."""
+    bend = np.radians(geometry.bend_angle)
+    length_ab, length_bc = geometry.arm_length_ab, geometry.arm_length_bc
+    length_ac = np.hypot(
+        length_ab + length_bc * np.cos(bend), length_bc * np.sin(bend))
+    # Each of the n end distances changes at most at
+    # n BC sin(bend) + n (n - 1) |AC|, and their sum is divided by n**2.
+    per_radian = length_bc * np.sin(bend) + (n_ligs - 1) * length_ac
+    return np.radians(per_radian)
+
+
+def _calc_rsu_of_pairs(
+        ring_ids: list[str], rings: np.ndarray, thetas: np.ndarray,
+        delta_: float, geometry: LigandGeometry | None
+        ) -> np.ndarray:
+    """Calculate the RSU of each pair of a ring and a theta.
+
+    Args:
+        ring_ids (list[str]): Conformation IDs of rings.
+        rings (np.ndarray): The indices of the rings of the pairs.
+        thetas (np.ndarray): The thetas of the pairs.
+        delta_ (float): N-Pd-N angle in degrees.
+        geometry (LigandGeometry, optional): The geometry of the ligand.
+
+    Returns:
+        np.ndarray: The RSUs. Shape: (n_pairs,).
+    """
+    lengths = np.array([len(ring_ids[ring]) for ring in rings])
+    con_rots = np.array(_con_elements(np.array(float(delta_))))
+    rsus = np.empty(len(rings))
+    for length in np.unique(lengths):
+        pairs = np.flatnonzero(lengths == length)
+        lig_codes, con_codes = _encode_ids(
+            ring_ids[ring] for ring in rings[pairs])
+        # Shapes: (4, 9, n_pairs) and (4, 3, n_pairs)
+        lig_rots, lig_trans = (
+            np.array(elements)
+            for elements in _lig_elements(thetas[pairs], geometry))
+        idxs = np.arange(len(pairs))
+
+        def units(j: int) -> tuple[np.ndarray, np.ndarray]:
+            lig_codes_j = lig_codes[:, j]
+            return (
+                np.stack(_elementwise_matmul(
+                    list(lig_rots[lig_codes_j, :, idxs].T),
+                    list(con_rots[con_codes[:, j]].T))),
+                lig_trans[lig_codes_j, :, idxs].T)
+
+        n_ligs = length // 4
+        rsus[pairs] = _sum_of_end_dists(units, n_ligs) / n_ligs**2
+    return rsus
@@ -0,0 +1,74 @@
+from typing import Iterable
+
+import numpy as np
+
+from .ligand_geometry import LigandGeometry
+from .strain_metrics import calc_strain_metrics
+
+
+def calc_closure_metrics(
+        ring_ids: Iterable[str], thetas: float | Iterable[float],
+        delta_: float | Iterable[float] = 87, angle_weight: float = 1,
+        geometry: LigandGeometry | None = None
+        ) -> dict[str, np.ndarray]:
+    """Calculate how far the rings are from closing, both in position
+    and in orientation.
+
+    RSU measures only the distances between the ends of the chains
+    derived from a ring. The rotation of the transform of the ring,
+    which is computed anyway, also tells how much the bond closing the
+    ring is misaligned. If the transform of the ring cut at some point
+    is M = (R, t), the transform cut at any other point is conjugate to
+    M, so that the angle of the rotation R, i.e. the misalignment, is
+    the same for all the cuts. All the metrics are computed in the same
+    pass over the rings with :func:`calc_strain_metrics
+    <rsuanalyzer.core.strain_metrics.calc_strain_metrics>`.
+
+    The score combines the two metrics per unit as
+    sqrt(gap**2 + (angle_weight * misalignment_in_radians / n)**2),
+    where n is the number of ligands.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+            They can have different numbers of ligands.
+        thetas (float | Iterable[float]):
+            Tilting angles of the two C-C bonds in the ligand in
+            degrees. 0 <= theta <= 90.
+        delta_ (float | Iterable[float], optional):
+            N-Pd-N angles in degrees. 0 < delta\_ <= 180.
+            Default is 87.
+        angle_weight (float, optional):
+            The distance equivalent to the misalignment of 1 radian in
+            the score. Default is 1, i.e. the length of an arm of the
+            ligand in the paper.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        dict[str, np.ndarray]:
+            The metrics of the shape np.shape(thetas) + np.shape(delta\_)
+            + (n_rings,) with the keys
+
+            - "gap": The positional gap, i.e. the RSU.
+            - "misalignment": The angle of the rotation of the ring
+              transform in degrees, 0 <= misalignment <= 180.
+            - "score": The combined closure score.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> metrics = ra.calc_closure_metrics(
+        ...     ["RLFFRLFFRLFF", "RRFFLRFBRRFFLLBB"], 34)
+        >>> metrics["gap"]
+        array([0.22008367, 0.29421719])
+    """
+    ring_ids = list(ring_ids)
+    metrics = calc_strain_metrics(
+        ring_ids, thetas, delta_, ["rsu", "misalignment"], geometry)
+    n_ligs = np.array([len(ring_id) // 4 for ring_id in ring_ids])
+    return {
+        "gap": metrics["rsu"], "misalignment": metrics["misalignment"],
+        "score": np.hypot(
+            metrics["rsu"],
+            angle_weight * np.radians(metrics["misalignment"]) / n_ligs)}
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LigandGeometry:
+    """Geometry of the bent ligand.
+
+    The ligand consists of the two arms AB and BC. For the definitions
+    of the points and the coordinate systems, see the associated paper.
+    The default values are those of the ligand in the paper.
+
+    Instances are immutable and hashable, so that they can be used as
+    keys of caches.
+
+    Attributes:
+        bend_angle (float):
+            The angle between the arms AB and BC projected on the plane
+            of the ligand when theta is 0, in degrees.
+            0 <= bend_angle <= 180. Default is 60.
+        arm_length_ab (float):
+            The length of the arm AB. Default is 1.
+        arm_length_bc (float):
+            The length of the arm BC. Default is 1.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> geometries = [
+        ...     ra.LigandGeometry(bend_angle=angle)
+        ...     for angle in (50, 60, 70)]
+        >>> ra.calc_rsu_batch(
+        ...     ["RLFFRLFFRLFF"], range(0, 91), geometry=geometries).shape
+        (3, 91, 1)
+    """
+    bend_angle: float = 60
+    arm_length_ab: float = 1
+    arm_length_bc: float = 1
+
+    def __post_init__(self) -> None:
+        if not 0 <= self.bend_angle <= 180:
+            raise ValueError(f"Invalid bend_angle: {self.bend_angle}")
+        if self.arm_length_ab <= 0 or self.arm_length_bc <= 0:
+            raise ValueError(
+                "The lengths of the arms should be positive: "
+                f"{self.arm_length_ab}, {self.arm_length_bc}")
@@ -0,0 +1,342 @@
+import json
+from typing import Iterable
+
+import numpy as np
+from numpy.polynomial import chebyshev
+
+from .calc_rsu_batch import calc_rsu_batch
+from .ligand_geometry import LigandGeometry
+
+
+class RSUSurrogate:
+    """Chebyshev expansions of the RSUs of rings as functions of theta,
+    and optionally of delta.
+
+    The expansion of each ring is fitted once to the RSUs at the
+    Chebyshev points, and evaluated at any angles with a few
+    multiply-adds per coefficient instead of composing the transforms
+    of the rings. Queries outside the fitted domain, and the rings whose
+    estimated error exceeds the tolerance, e.g. those closing exactly at
+    some theta, where RSU is not smooth, are evaluated exactly with
+    :func:`calc_rsu_batch <rsuanalyzer.core.calc_rsu_batch.calc_rsu_batch>`.
+
+    Use :meth:`fit` to create a surrogate, and :meth:`save` and
+    :meth:`load` to store it.
+
+    Attributes:
+        ring_ids (list[str]): The conformation IDs of the rings.
+        theta_range (tuple[float, float]): The fitted range of theta.
+        delta_range (tuple[float, float]):
+            The fitted range of delta. Both ends are the same if the
+            surrogate is fitted at a fixed delta.
+        coefs (np.ndarray):
+            The Chebyshev coefficients of the rings, padded with zeros
+            to the largest degrees.
+            Shape: (theta_degree + 1, delta_degree + 1, n_rings).
+        error_bounds (np.ndarray):
+            The estimated bounds of the absolute errors of the rings in
+            the fitted domain. Shape: (n_rings,).
+        tol (float): The target absolute error.
+        geometry (LigandGeometry | None): The geometry of the ligand.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> surrogate = ra.RSUSurrogate.fit(ra.enum_ring_ids(3))
+        >>> surrogate([33.3, 44.4]).shape
+        (2, 376)
+    """
+
+    def __init__(
+            self, ring_ids: list[str], theta_range: tuple[float, float],
+            delta_range: tuple[float, float], coefs: np.ndarray,
+            error_bounds: np.ndarray, tol: float,
+            geometry: LigandGeometry | None = None) -> None:
+        self.ring_ids = ring_ids
+        self.theta_range = theta_range
+        self.delta_range = delta_range
+        self.coefs = coefs
+        self.error_bounds = error_bounds
+        self.tol = tol
+        self.geometry = geometry
+
+    @property
+    def converged(self) -> np.ndarray:
+        """Whether the estimated error of each ring is within the
+        tolerance. The other rings are evaluated exactly."""
+        return self.error_bounds <= self.tol
+
+    @classmethod
+    def fit(
+            cls, ring_ids: Iterable[str],
+            theta_range: tuple[float, float] = (0, 90),
+            delta_: float | tuple[float, float] = 87,
+            tol: float = 1e-8, max_degree: int = 256,
+            geometry: LigandGeometry | None = None
+            ) -> "RSUSurrogate":
+        """Fit the Chebyshev expansions of the RSUs of the rings.
+
+        The degrees are doubled until the coefficients in the last
+        quarter are negligible for all the rings, or ``max_degree`` is
+        reached. Then, the expansion of each ring is truncated to the
+        degrees keeping the error within ``tol``. The error bound of a
+        ring is the larger of the sum of the absolute values of the
+        truncated coefficients and the error measured at the points
+        between the fitting points.
+
+        Args:
+            ring_ids (Iterable[str]):
+                Conformation IDs of rings, e.g. ``["RRFFLLBB"]``. They
+                can have different numbers of ligands.
+            theta_range (tuple[float, float], optional):
+                The range of theta in degrees. Default is (0, 90).
+            delta_ (float | tuple[float, float], optional):
+                The N-Pd-N angle, or the range of it in degrees to fit
+                in delta too. Default is 87.
+            tol (float, optional):
+                The target absolute error. Default is 1e-8.
+            max_degree (int, optional):
+                The largest degree along each axis. Default is 256.
+            geometry (LigandGeometry, optional):
+                The geometry of the ligand. Default is None, which means
+                ``LigandGeometry()``.
+
+        Returns:
+            RSUSurrogate: The fitted surrogate.
+        """
+        ring_ids = list(ring_ids)
+        theta_range = (float(theta_range[0]), float(theta_range[1]))
+        if not 0 <= theta_range[0] < theta_range[1] <= 90:
+            raise ValueError(f"Invalid theta_range: {theta_range}")
+        if np.ndim(delta_) == 0:
+            delta_range = (float(delta_), float(delta_))
+        else:
+            delta_range = (float(delta_[0]), float(delta_[1]))
+            if not delta_range[0] < delta_range[1]:
+                raise ValueError(f"Invalid delta range: {delta_range}")
+
+        # The numbers of the points along theta and delta.
+        num_of_points = [17, 1 if delta_range[0] == delta_range[1] else 9]
+        # The rings to refine along each axis. The coefficients of
+        # smooth RSUs decay geometrically, so that doubling the degree
+        # reduces the tail by much more than that of RSUs with kinks,
+        # which are left to the exact evaluation.
+        active = np.ones((2, len(ring_ids)), dtype=bool)
+        prev_tails = np.full((2, len(ring_ids)), np.inf)
+        while True:
+            coefs = _fit_coefs(
+                ring_ids, theta_range, delta_range, num_of_points, geometry)
+            doubled = False
+            for axis in (0, 1):
+                size = coefs.shape[axis]
+                if size == 1:
+                    continue
+                tails = np.abs(
+                    np.take(coefs, range(size - size // 4, size), axis)
+                    ).sum(axis=(0, 1))
+                active[axis] &= (tails > tol / 8) & (
+                    (size < 65) | (tails < prev_tails[axis] / 16))
+                prev_tails[axis] = tails
+                if active[axis].any() and 2 * size - 1 <= max_degree + 1:
+                    num_of_points[axis] = 2 * size - 1
+                    doubled = True
+            if not doubled:
+                break
+
+        coefs, truncation_errors = _truncate(coefs, tol / 2)
+        surrogate = cls(
+            ring_ids, theta_range, delta_range, coefs,
+            truncation_errors, tol, geometry)
+        # The points halfway between the fitting points.
+        check_thetas, check_deltas = (
+            _unmap(_midpoints(n), domain)
+            for n, domain in zip(num_of_points, (theta_range, delta_range)))
+        exact = calc_rsu_batch(
+            ring_ids, check_thetas, check_deltas, geometry=geometry)
+        measured_errors = np.abs(
+            surrogate._evaluate(check_thetas, check_deltas) - exact
+            ).max(axis=(0, 1), initial=0)
+        surrogate.error_bounds = np.maximum(
+            2 * truncation_errors, measured_errors)
+
+        # The coefficients of the rings evaluated exactly are not used,
+        # and should not raise the degrees of the others.
+        coefs[..., ~surrogate.converged] = 0
+        surrogate.coefs, _ = _truncate(coefs, 0)
+        return surrogate
+
+    def __call__(
+            self, thetas: float | Iterable[float],
+            delta_: float | Iterable[float] | None = None
+            ) -> np.ndarray:
+        """Calculate the RSUs of the rings.
+
+        Args:
+            thetas (float | Iterable[float]): Tilting angles in degrees.
+            delta_ (float | Iterable[float], optional):
+                N-Pd-N angles in degrees. Default is None, which means
+                the delta of a surrogate fitted at a fixed delta.
+
+        Returns:
+            np.ndarray:
+                The RSUs. Shape: np.shape(thetas) + np.shape(delta\_)
+                + (n_rings,), where np.shape(delta\_) is omitted if
+                delta\_ is None.
+        """
+        thetas = np.asarray(thetas, dtype=float)
+        if delta_ is None:
+            if self.delta_range[0] != self.delta_range[1]:
+                raise ValueError(
+                    "delta_ should be given for the surrogate fitted in "
+                    "a range of delta.")
+            deltas = np.asarray(self.delta_range[0])
+        else:
+            deltas = np.asarray(delta_, dtype=float)
+        flat_thetas = thetas.reshape(-1)
+        flat_deltas = deltas.reshape(-1)
+
+        rsus = self._evaluate(flat_thetas, flat_deltas)
+        outside_thetas = (flat_thetas < self.theta_range[0]) \
+            | (flat_thetas > self.theta_range[1])
+        outside_deltas = (flat_deltas < self.delta_range[0]) \
+            | (flat_deltas > self.delta_range[1])
+        if outside_thetas.any():
+            rsus[outside_thetas] = calc_rsu_batch(
+                self.ring_ids, flat_thetas[outside_thetas], flat_deltas,
+                geometry=self.geometry)
+        if outside_deltas.any():
+            rsus[:, outside_deltas] = calc_rsu_batch(
+                self.ring_ids, flat_thetas, flat_deltas[outside_deltas],
+                geometry=self.geometry)
+        not_converged = np.flatnonzero(~self.converged)
+        if len(not_converged):
+            rsus[..., not_converged] = calc_rsu_batch(
+                [self.ring_ids[i] for i in not_converged],
+                flat_thetas, flat_deltas, geometry=self.geometry)
+
+        shape = thetas.shape if delta_ is None \
+            else thetas.shape + deltas.shape
+        return rsus.reshape(shape + (len(self.ring_ids),))
+
+    def save(self, path: str) -> None:
+        """Save the surrogate to a ``.npz`` file."""
+        geometry = None if self.geometry is None else vars(self.geometry)
+        np.savez_compressed(
+            path, coefs=self.coefs, error_bounds=self.error_bounds,
+            meta=json.dumps({
+                "ring_ids": self.ring_ids, "theta_range": self.theta_range,
+                "delta_range": self.delta_range, "tol": self.tol,
+                "geometry": geometry}))
+
+    @classmethod
+    def load(cls, path: str) -> "RSUSurrogate":
+        """Load the surrogate saved by :meth:`save`."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            geometry = None if meta["geometry"] is None \
+                else LigandGeometry(**meta["geometry"])
+            return cls(
+                meta["ring_ids"], tuple(meta["theta_range"]),
+                tuple(meta["delta_range"]), data["coefs"],
+                data["error_bounds"], meta["tol"], geometry)
+
+    def _evaluate(
+            self, thetas: np.ndarray, deltas: np.ndarray) -> np.ndarray:
+        """Evaluate the expansions at the thetas and the deltas clipped
+        to the fitted domain.
+
+        Returns:
+            np.ndarray: The RSUs. Shape: (n_thetas, n_deltas, n_rings).
+        """
+        xs = np.clip(_map(thetas, self.theta_range), -1, 1)
+        ys = np.clip(_map(deltas, self.delta_range), -1, 1)
+        theta_polys = chebyshev.chebvander(xs, self.coefs.shape[0] - 1)
+        delta_polys = chebyshev.chebvander(ys, self.coefs.shape[1] - 1)
+        # Shape: (n_thetas, n_delta_coefs, n_rings)
+        values = np.tensordot(theta_polys, self.coefs, axes=(1, 0))
+        # Shape: (n_deltas, n_thetas, n_rings)
+        values = np.tensordot(delta_polys, values, axes=(1, 1))
+        return np.moveaxis(values, 0, 1)
+
+
+def _map(
+        angles: np.ndarray, domain: tuple[float, float]) -> np.ndarray:
+    """Map the angles in the domain to [-1, 1]."""
+    lo, hi = domain
+    if lo == hi:
+        return np.zeros_like(angles)
+    return (2 * angles - lo - hi) / (hi - lo)
+
+
+def _unmap(xs: np.ndarray, domain: tuple[float, float]) -> np.ndarray:
+    """Map the points in [-1, 1] to the domain."""
+    lo, hi = domain
+    return (lo + hi) / 2 + (hi - lo) / 2 * xs
+
+
+def _chebyshev_points(n: int) -> np.ndarray:
+    """Return the n Chebyshev points of the first kind."""
+    return np.cos(np.pi * (np.arange(n) + 0.5) / n)
+
+
+def _midpoints(n: int) -> np.ndarray:
+    """Return the points halfway, in angle, between the Chebyshev
+    points of the first kind, including the ends of [-1, 1]."""
+    return np.cos(np.pi * np.arange(n + 1) / n)
+
+
+def _fit_coefs(
+        ring_ids: list[str], theta_range: tuple[float, float],
+        delta_range: tuple[float, float], num_of_points: list[int],
+        geometry: LigandGeometry | None
+        ) -> np.ndarray:
+    """Interpolate the RSUs at the Chebyshev points.
+
+    Returns:
+        np.ndarray:
+            The Chebyshev coefficients.
+            Shape: (num_of_points[0], num_of_points[1], n_rings).
+    """
+    xs, ys = (_chebyshev_points(n) for n in num_of_points)
+    rsus = calc_rsu_batch(
+        ring_ids, _unmap(xs, theta_range), _unmap(ys, delta_range),
+        geometry=geometry)
+    # The discrete orthogonality of the polynomials at the points.
+    transforms = []
+    for points in (xs, ys):
+        transform = chebyshev.chebvander(points, len(points) - 1).T \
+            * (2 / len(points))
+        transform[0] /= 2
+        transforms.append(transform)
+    # Shape: (n_theta_coefs, n_delta_points, n_rings)
+    coefs = np.tensordot(transforms[0], rsus, axes=(1, 0))
+    return np.moveaxis(
+        np.tensordot(transforms[1], coefs, axes=(1, 1)), 0, 1)
+
+
+def _truncate(
+        coefs: np.ndarray, tol: float) -> tuple[np.ndarray, np.ndarray]:
+    """Drop the highest coefficients of each ring whose sum of the
+    absolute values is within the tolerance, and then the degrees that
+    are not used by any ring.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The truncated coefficients, and the sums of the absolute
+            values of the dropped coefficients of each ring.
+    """
+    abs_coefs = np.abs(coefs)
+    degrees = []
+    for axis, other_axis in ((0, 1), (1, 0)):
+        # tails[k, r]: The sum of the coefficients of degree >= k.
+        tails = np.cumsum(
+            abs_coefs.sum(axis=other_axis)[::-1], axis=0)[::-1]
+        degrees.append((tails > tol / 2).sum(axis=0))
+    truncated = coefs.copy()
+    for r, (theta_degree, delta_degree) in enumerate(zip(*degrees)):
+        truncated[theta_degree:, :, r] = 0
+        truncated[:, delta_degree:, r] = 0
+    errors = np.abs(coefs - truncated).sum(axis=(0, 1))
+    used = [
+        max(1, int(degrees_of_axis.max(initial=1)))
+        for degrees_of_axis in degrees]
+    return np.ascontiguousarray(truncated[:used[0], :used[1]]), errors
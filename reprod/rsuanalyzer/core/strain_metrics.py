@@ -0,0 +1,251 @@
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from ._transforms import _encode_ids, _unit_tables
+from .calc_rsu_batch import (_MAX_BLOCK_SIZE, _end_vecs, _group_by_length,
+                             _ring_transform)
+from .ligand_geometry import LigandGeometry
+
+
+@dataclass(frozen=True)
+class CutChainEnds:
+    """The ends of all the chains derived from rings by cutting them
+    before each ligand, which are passed to the strain metric kernels.
+
+    The last axes of the arrays run over the angles and the rings of a
+    block, so that a kernel reducing the first axes is vectorized over
+    all of them.
+
+    Attributes:
+        end_vecs (np.ndarray):
+            The vectors from the starts to the ends of the chains. The
+            j-th one is of the chain cut before the j-th ligand.
+            Shape: (n_ligs, 3, ...).
+        end_dists (np.ndarray):
+            The lengths of ``end_vecs``. Shape: (n_ligs, ...).
+        rotation_angles (np.ndarray):
+            The angles of the rotations of the ring transforms in
+            radians, which are the same for all the cuts. Shape: (...).
+    """
+    end_vecs: np.ndarray
+    end_dists: np.ndarray
+    rotation_angles: np.ndarray
+
+    @property
+    def n_ligs(self) -> int:
+        """The number of ligands in a ring."""
+        return len(self.end_dists)
+
+
+StrainMetricKernel = Callable[[CutChainEnds], np.ndarray]
+
+_STRAIN_METRICS: dict[str, StrainMetricKernel] = {}
+
+
+def register_strain_metric(
+        name: str, kernel: StrainMetricKernel | None = None,
+        overwrite: bool = False) -> Callable:
+    """Register a strain metric kernel for :func:`calc_strain_metrics`.
+
+    A kernel takes the ends of the cut chains of a block of rings,
+    :class:`CutChainEnds`, and returns the metric of each ring of the
+    shape ``CutChainEnds.rotation_angles.shape``. It can also be used
+    as a decorator.
+
+    Args:
+        name (str): The name of the metric.
+        kernel (Callable[[CutChainEnds], np.ndarray], optional):
+            The kernel. If None, a decorator registering the decorated
+            function is returned. Default is None.
+        overwrite (bool, optional):
+            Whether to replace a kernel registered with the same name.
+            Default is False.
+
+    Returns:
+        The kernel, or the decorator if ``kernel`` is None.
+
+    Example:
+        >>> import numpy as np
+        >>> import rsuanalyzer as ra
+        >>> @ra.register_strain_metric("median_rsu")
+        ... def median_rsu(ends):
+        ...     return np.median(ends.end_dists, axis=0) / ends.n_ligs
+    """
+    if kernel is None:
+        return lambda kernel: register_strain_metric(name, kernel, overwrite)
+    if name in _STRAIN_METRICS and not overwrite:
+        raise ValueError(f"The strain metric is already registered: {name}")
+    _STRAIN_METRICS[name] = kernel
+    return kernel
+
+
+def strain_metric_names() -> list[str]:
+    """Return the names of the registered strain metrics."""
+    return list(_STRAIN_METRICS)
+
+
+def calc_strain_metrics(
+        ring_ids: Iterable[str], thetas: float | Iterable[float],
+        delta_: float | Iterable[float] = 87,
+        metrics: Iterable[str] | None = None,
+        geometry: LigandGeometry | None = None
+        ) -> dict[str, np.ndarray]:
+    """Calculate several strain metrics of many rings in one pass.
+
+    The ends of all the chains derived from the rings are computed once
+    in the same way as :func:`calc_rsu_batch
+    <rsuanalyzer.core.calc_rsu_batch.calc_rsu_batch>`, and all the
+    requested kernels are applied to them. Thus, several metrics cost
+    about the same as one.
+
+    The built-in metrics are
+
+    - "rsu": The mean end distance divided by n, i.e. RSU.
+    - "rms_rsu": The root mean square of the end distances divided by n.
+    - "max_rsu": The largest end distance divided by n.
+    - "misalignment": The angle of the rotation of the ring transform in
+      degrees, i.e. the misalignment of the bond closing the ring.
+    - "closure_score": sqrt(rsu**2 + (misalignment_in_radians / n)**2).
+
+    where n is the number of ligands. More metrics can be added with
+    :func:`register_strain_metric`.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+            They can have different numbers of ligands.
+        thetas (float | Iterable[float]):
+            Tilting angles of the two C-C bonds in the ligand in
+            degrees. 0 <= theta <= 90.
+        delta_ (float | Iterable[float], optional):
+            N-Pd-N angles in degrees. 0 < delta\_ <= 180.
+            Default is 87.
+        metrics (Iterable[str], optional):
+            The names of the metrics. Default is None, which means all
+            the registered metrics.
+        geometry (LigandGeometry, optional):
+            The geometry of the ligand. Default is None, which means
+            ``LigandGeometry()``.
+
+    Returns:
+        dict[str, np.ndarray]:
+            The metrics. Shape: np.shape(thetas) + np.shape(delta\_)
+            + (n_rings,).
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> metrics = ra.calc_strain_metrics(
+        ...     ra.enum_ring_ids(3), range(0, 91), metrics=["rsu", "max_rsu"])
+        >>> metrics["max_rsu"].shape
+        (91, 376)
+    """
+    names = strain_metric_names() if metrics is None else list(metrics)
+    unknown = [name for name in names if name not in _STRAIN_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown strain metrics: {unknown}")
+    kernels = {name: _STRAIN_METRICS[name] for name in names}
+
+    ring_ids = list(ring_ids)
+    thetas = np.asarray(thetas, dtype=float)
+    deltas = np.asarray(delta_, dtype=float)
+    shape = thetas.shape + deltas.shape
+    n_angles = thetas.size * deltas.size
+    unit_rots, unit_trans = _unit_tables(
+        thetas.reshape(-1), deltas.reshape(-1), geometry)
+    # Shapes: (9, n_angles, 16) and (3, n_angles, 16)
+    unit_rots = np.ascontiguousarray(
+        unit_rots.reshape(n_angles, 16, 9).transpose(2, 0, 1))
+    unit_trans = np.ascontiguousarray(
+        unit_trans.reshape(n_angles, 16, 3).transpose(2, 0, 1))
+
+    results = {
+        name: np.empty((n_angles, len(ring_ids))) for name in kernels}
+    for idxs in _group_by_length(ring_ids).values():
+        lig_codes, con_codes = _encode_ids(ring_ids[i] for i in idxs)
+        unit_idxs = 4 * lig_codes + con_codes
+        chunk_size = max(1, _MAX_BLOCK_SIZE // n_angles)
+        for start in range(0, len(idxs), chunk_size):
+            chunk = unit_idxs[start:start+chunk_size]
+            ends = _calc_cut_chain_ends(
+                lambda j: (unit_rots[:, :, chunk[:, j]],
+                           unit_trans[:, :, chunk[:, j]]),
+                unit_idxs.shape[1])
+            chunk_idxs = idxs[start:start+chunk_size]
+            for name, kernel in kernels.items():
+                results[name][:, chunk_idxs] = kernel(ends)
+
+    return {
+        name: values.reshape(shape + (len(ring_ids),))
+        for name, values in results.items()}
+
+
+def _calc_cut_chain_ends(
+        units: Callable[[int], tuple[np.ndarray, np.ndarray]],
+        n_ligs: int) -> CutChainEnds:
+    """Calculate the ends of the chains derived from the rings.
+
+    Args:
+        units (Callable[[int], tuple[np.ndarray, np.ndarray]]):
+            The function returning the elements of the rotations and
+            the translations of the j-th units of the rings, whose
+            shapes are (9, ...) and (3, ...), respectively.
+        n_ligs (int): The number of ligands in a ring.
+    """
+    rot, trans, prefix_trans = _ring_transform(units, n_ligs)
+    end_vecs = np.array(list(_end_vecs(rot, trans, prefix_trans)))
+    end_dists = np.sqrt(
+        end_vecs[:, 0] * end_vecs[:, 0] + end_vecs[:, 1] * end_vecs[:, 1]
+        + end_vecs[:, 2] * end_vecs[:, 2])
+    return CutChainEnds(end_vecs, end_dists, _rotation_angles(rot))
+
+
+def _rotation_angles(rot: list[np.ndarray]) -> np.ndarray:
+    """Calculate the angles of the rotations in radians.
+
+    The angles are calculated from both the trace and the antisymmetric
+    part of the rotation matrices, which is accurate also for the
+    angles close to 0 and 180 degrees, unlike the arccos of the trace.
+
+    Args:
+        rot (list[np.ndarray]):
+            The elements of the rotations. rot[3*i+k] is the (i, k)
+            element.
+    """
+    cos = (rot[0] + rot[4] + rot[8] - 1) / 2
+    sin = np.sqrt(
+        (rot[7] - rot[5])**2 + (rot[2] - rot[6])**2
+        + (rot[3] - rot[1])**2) / 2
+    return np.arctan2(sin, cos)
+
+
+def _rsu(ends: CutChainEnds) -> np.ndarray:
+    # The end distances are added in the same order as calc_rsu_batch.
+    sum_of_dists = ends.end_dists[0].copy()
+    for dists in ends.end_dists[1:]:
+        sum_of_dists += dists
+    return sum_of_dists / ends.n_ligs**2
+
+
+def _rms_rsu(ends: CutChainEnds) -> np.ndarray:
+    return np.sqrt(np.mean(ends.end_dists**2, axis=0)) / ends.n_ligs
+
+
+def _max_rsu(ends: CutChainEnds) -> np.ndarray:
+    return ends.end_dists.max(axis=0) / ends.n_ligs
+
+
+def _misalignment(ends: CutChainEnds) -> np.ndarray:
+    return np.degrees(ends.rotation_angles)
+
+
+def _closure_score(ends: CutChainEnds) -> np.ndarray:
+    return np.hypot(_rsu(ends), ends.rotation_angles / ends.n_ligs)
+
+
+register_strain_metric("rsu", _rsu)
+register_strain_metric("rms_rsu", _rms_rsu)
+register_strain_metric("max_rsu", _max_rsu)
+register_strain_metric("misalignment", _misalignment)
+register_strain_metric("closure_score", _closure_score)
@@ -0,0 +1,274 @@
+from typing import Iterable
+
+import numpy as np
+
+# The maximum number of ligands of rings whose codes fit in 64 bits.
+MAX_NUM_OF_LIGS = 16
+
+# Bit-reversed values of all the bytes.
+_BYTE_REVS = np.array(
+    [int(f"{i:08b}"[::-1], 2) for i in range(256)], dtype=np.uint8)
+
+# The letters for the bits 0 and 1 at each position of the codes.
+_LETTERS = np.array([
+    [ord("L") if pos % 4 < 2 else ord("B") for pos in range(64)],
+    [ord("R") if pos % 4 < 2 else ord("F") for pos in range(64)]],
+    dtype=np.uint8)
+
+
+# Conformation IDs of rings are packed into unsigned 64-bit integers,
+# one bit for each letter: "R" and "F" are 1, and "L" and "B" are 0.
+# The first letter is the most significant bit, so that the order of
+# the codes is the same as the lexicographic order of the IDs.
+# e.g. "RRFFLLBB" -> 0b11110000, "RLFB" -> 0b1010
+
+def _ids_to_codes(ring_ids: Iterable[str]) -> np.ndarray:
+    """Pack conformation IDs of rings of the same length into integers.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "RLFFRLFF"]``.
+
+    Returns:
+        np.ndarray: The codes of the IDs. dtype: uint64.
+
+    Example:
+        >>> _ids_to_codes(["RRFFLLBB", "RLFBRLFB"])
+        array([240, 170], dtype=uint64)
+    """
+    ring_ids = list(ring_ids)
+    lengths = {len(ring_id) for ring_id in ring_ids}
+    if len(lengths) > 1:
+        raise ValueError(
+            "All the conformation IDs should have the same length.")
+    n_bits = lengths.pop() if lengths else 4
+    if n_bits % 4 != 0 or n_bits == 0:
+        raise ValueError("Conformation IDs of rings are expected.")
+    if n_bits > 4 * MAX_NUM_OF_LIGS:
+        raise ValueError(f"Too many ligands: {n_bits // 4}")
+
+    return _letters_to_codes("".join(ring_ids), n_bits)
+
+
+def _letters_to_codes(letters: str, n_bits: int) -> np.ndarray:
+    """Pack the concatenated conformation IDs of rings of ``n_bits``
+    letters into integers without checking their lengths."""
+    letters = np.frombuffer(
+        letters.encode("ascii"), dtype=np.uint8).reshape(-1, n_bits)
+    bits = letters == _LETTERS[1, :n_bits]
+    if not (bits | (letters == _LETTERS[0, :n_bits])).all():
+        raise ValueError("Invalid letters in the conformation IDs.")
+
+    # The bits are packed into big-endian bytes, which are read as
+    # 64-bit integers and shifted to the least significant bits.
+    packed = np.zeros((len(letters), 8), dtype=np.uint8)
+    packed[:, :(n_bits + 7) // 8] = np.packbits(bits, axis=1)
+    return packed.view(">u8").reshape(-1).astype(np.uint64) \
+        >> np.uint64(64 - n_bits)
+
+
+def _codes_to_ids(codes: np.ndarray, num_of_ligs: int) -> list[str]:
+    """Unpack codes into conformation IDs of rings.
+
+    Args:
+        codes (np.ndarray): The codes of the IDs.
+        num_of_ligs (int): The number of ligands in the rings.
+
+    Returns:
+        list[str]: The conformation IDs in the order of the codes.
+
+    Example:
+        >>> _codes_to_ids(np.array([240, 170], dtype=np.uint64), 2)
+        ['RRFFLLBB', 'RLFBRLFB']
+    """
+    n_bits = 4 * num_of_ligs
+    codes = np.asarray(codes, dtype=np.uint64).reshape(-1)
+    shifts = np.arange(n_bits - 1, -1, -1, dtype=np.uint64)
+    bits = ((codes[:, np.newaxis] >> shifts) & np.uint64(1)).astype(np.intp)
+    chars = _LETTERS[bits, np.arange(n_bits)].tobytes().decode("ascii")
+    return [chars[i:i+n_bits] for i in range(0, len(chars), n_bits)]
+
+
+def _split_codes(
+        codes: np.ndarray, num_of_ligs: int
+        ) -> tuple[np.ndarray, np.ndarray]:
+    """Split codes into the codes of the ligand types and the connection
+    types, which are the same as the ones of ``_encode_ids``.
+
+    Args:
+        codes (np.ndarray): The codes of the rings.
+        num_of_ligs (int): The number of ligands in the rings.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            The codes of the ligand types and the connection types.
+            Shape: (n_rings, num_of_ligs) for both.
+    """
+    codes = np.asarray(codes, dtype=np.uint64).reshape(-1)
+    shifts = 4 * np.arange(num_of_ligs - 1, -1, -1, dtype=np.uint64)
+    unit_codes = ((codes[:, np.newaxis] >> shifts) & np.uint64(15)).astype(
+        np.intp)
+    return 3 - unit_codes // 4, 3 - unit_codes % 4
+
+
+def _theta_class(theta: float | None) -> str:
+    """Return the class of theta in which the duplicates are the same.
+
+    Returns:
+        str: "theta0" for theta = 0, "theta90" for theta = 90, and
+        "general" for the others, including None.
+    """
+    if theta == 0:
+        return "theta0"
+    if theta == 90:
+        return "theta90"
+    return "general"
+
+
+def _canonicalize(
+        codes: np.ndarray, num_of_ligs: int, theta: float | None = None
+        ) -> np.ndarray:
+    """Return the codes of the representatives of the rings.
+
+    This is the vectorized version of
+    ``max(_enum_duplicate_ids(ring_id, theta))``. Instead of listing all
+    the duplicates, the maximum is taken over the images of the codes
+    under the different cut points, the reverse order and the
+    enantiomer. The lig-con set reverses (theta = 0) and the R-L
+    reversals (theta = 90) are applied to each image by choosing the
+    maximum directly.
+
+    Args:
+        codes (np.ndarray): The codes of the rings.
+        num_of_ligs (int): The number of ligands in the rings.
+        theta (float, optional):
+            Tilting angle of the ligand in degree. Results are same
+            for any 0 < theta < 90, and different for theta = 0 and
+            theta = 90.
+
+    Returns:
+        np.ndarray: The codes of the representatives. dtype: uint64.
+    """
+    n_bits = 4 * num_of_ligs
+    codes = _normalize(np.asarray(codes, dtype=np.uint64), n_bits, theta)
+    canon = codes.copy()
+    for oriented in (codes, _rev_order(codes, n_bits)):
+        for shift, flip in _rotations_and_flips(n_bits, theta):
+            np.maximum(canon, _normalize(
+                _rotl(oriented, shift, n_bits) ^ flip, n_bits, theta),
+                out=canon)
+    return canon
+
+
+def _is_canonical(
+        codes: np.ndarray, num_of_ligs: int, theta: float | None = None
+        ) -> np.ndarray:
+    """Return whether the codes are the codes of the representatives.
+
+    This is faster than comparing the codes with ``_canonicalize``
+    because the codes are dropped as soon as one of their duplicates is
+    found to be larger.
+
+    Args:
+        codes (np.ndarray): The codes of the rings.
+        num_of_ligs (int): The number of ligands in the rings.
+        theta (float, optional): Tilting angle of the ligand in degree.
+
+    Returns:
+        np.ndarray: The boolean mask of the representatives.
+    """
+    n_bits = 4 * num_of_ligs
+    codes = np.asarray(codes, dtype=np.uint64)
+    idxs = np.flatnonzero(codes == _normalize(codes, n_bits, theta))
+    remaining = codes[idxs]
+
+    for reverse in (False, True):
+        oriented = _rev_order(remaining, n_bits) if reverse else remaining
+        for shift, flip in _rotations_and_flips(n_bits, theta):
+            image = _normalize(
+                _rotl(oriented, shift, n_bits) ^ flip, n_bits, theta)
+            not_larger = image <= remaining
+            idxs = idxs[not_larger]
+            remaining = remaining[not_larger]
+            oriented = oriented[not_larger]
+
+    is_canonical = np.zeros(codes.shape, dtype=bool)
+    is_canonical[idxs] = True
+    return is_canonical
+
+
+def _rotations_and_flips(
+        n_bits: int, theta: float | None) -> list[tuple[int, np.uint64]]:
+    """Return the shifts of the different cut points and the masks of
+    the enantiomer, with which the duplicates are gained from the codes
+    or the reversed ones."""
+    # The enantiomers are the same for theta = 90 after normalization.
+    flips = [np.uint64(0)]
+    if _theta_class(theta) != "theta90":
+        flips.append(_lig_mask(n_bits))
+    return [
+        (shift, flip) for shift in range(0, n_bits, 4) for flip in flips]
+
+
+def _normalize(
+        codes: np.ndarray, n_bits: int, theta: float | None) -> np.ndarray:
+    """Return the maximum duplicates gained by the lig-con set reverses
+    (theta = 0) and the R-L reversals (theta = 90). The codes are
+    returned as they are for the other thetas."""
+    theta_class = _theta_class(theta)
+    if theta_class == "theta0":
+        return _max_lig_con_set_rev(codes, n_bits)
+    if theta_class == "theta90":
+        # All the ligand types are replaceable with "RR", the maximum.
+        return codes | _lig_mask(n_bits)
+    return codes
+
+
+def _lig_mask(n_bits: int) -> np.uint64:
+    """Return the mask of the bits of the ligand types."""
+    return np.uint64(sum(
+        1 << (n_bits - 1 - pos) for pos in range(n_bits) if pos % 4 < 2))
+
+
+def _rotl(codes: np.ndarray, shift: int, n_bits: int) -> np.ndarray:
+    """Rotate the letters of the codes to the left by ``shift``,
+    e.g. "RRFFLLBB" -> "LLBBRRFF" for shift = 4."""
+    if shift % n_bits == 0:
+        return codes
+    mask = np.uint64((1 << n_bits) - 1)
+    return ((codes << np.uint64(shift)) & mask) \
+        | (codes >> np.uint64(n_bits - shift))
+
+
+def _rev_order(codes: np.ndarray, n_bits: int) -> np.ndarray:
+    """Vectorized version of ``_id_duplicates._rev_order``.
+
+    The letters are reversed and then rotated by two letters so that
+    the IDs start with ligand types, e.g. "RRFFLLBB" -> "BBLLFFRR" ->
+    "LLFFRRBB".
+    """
+    big_endian = np.ascontiguousarray(codes, dtype=">u8")
+    bytes_ = big_endian.view(np.uint8).reshape(-1, 8)
+    reversed_ = np.ascontiguousarray(_BYTE_REVS[bytes_[:, ::-1]])
+    reversed_codes = reversed_.view(">u8").reshape(codes.shape).astype(
+        np.uint64) >> np.uint64(64 - n_bits)
+    return _rotl(reversed_codes, 2, n_bits)
+
+
+def _max_lig_con_set_rev(codes: np.ndarray, n_bits: int) -> np.ndarray:
+    """Return the maximum of ``_id_duplicates._lig_con_set_revs``.
+
+    The pairs of letters reversed together are at the positions
+    (1, 2), (3, 4), ..., (n_bits - 1, 0). Since the pairs are disjoint,
+    the maximum is obtained by reversing the pairs whose more significant
+    letter is "L" or "B".
+    """
+    first_pos = np.uint64(1 << (n_bits - 1))
+    # The more significant letters of the pairs except (n_bits - 1, 0).
+    odd_pos = np.uint64(sum(
+        1 << (n_bits - 1 - pos) for pos in range(1, n_bits - 1, 2)))
+
+    missing = ~codes & (first_pos | odd_pos)
+    flips = missing | ((missing & odd_pos) >> np.uint64(1)) \
+        | ((missing & first_pos) >> np.uint64(n_bits - 1))
+    return codes ^ flips
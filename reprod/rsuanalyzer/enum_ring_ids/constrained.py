@@ -0,0 +1,166 @@
+import re
+
+import numpy as np
+
+from ._canonical import MAX_NUM_OF_LIGS, _codes_to_ids, _is_canonical
+
+_LIG_TYPES = ("RR", "RL", "LR", "LL")
+_CON_TYPES = ("FF", "FB", "BF", "BB")
+
+# The characters allowed at each position of a unit: the ligand type
+# and the connection type.
+_UNIT_CHARS = ("RL", "RL", "FB", "FB")
+
+# A token of a pattern: a letter, "." or a class of letters, e.g. "[FB]".
+_TOKEN = re.compile(r"[RLFB.]|\[[RLFB]+\]")
+
+
+def enum_constrained_ring_ids(
+        num_of_ligs: int, pattern: str | None = None,
+        lig_types: set[str] | None = None,
+        con_types: set[str] | None = None,
+        max_counts: dict[str, int] | None = None,
+        min_counts: dict[str, int] | None = None,
+        theta: float | None = None, unique: bool = True
+        ) -> set[str]:
+    """Enumerate the conformation IDs of rings satisfying constraints.
+
+    The result is the same as filtering the result of
+    :func:`enum_ring_ids
+    <rsuanalyzer.enum_ring_ids.enum_ring_ids.enum_ring_ids>` with the
+    constraints, but the IDs are generated one unit at a time, and the
+    partial IDs that cannot satisfy the constraints are dropped as soon
+    as possible. Thus, the cost is proportional to the number of the
+    IDs satisfying the constraints, including the duplicates, not to
+    16**num_of_ligs.
+
+    Note that the constraints are on the conformation IDs, not on the
+    rings. A ring has several IDs, e.g. "RRFFLLBB" and "LLBBRRFF", and
+    only the representative returned by ``enum_ring_ids`` is checked.
+
+    Args:
+        num_of_ligs (int):
+            The number of ligands in a ring. 1 <= num_of_ligs <= 16.
+        pattern (str, optional):
+            The pattern of the ID, consisting of a letter, "." for any
+            letter, or a class of letters, e.g. "[FB]", for each letter
+            of the ID. e.g. ``"LL" + "." * 14`` for the rings of four
+            ligands whose first ligand is "LL". Default is None.
+        lig_types (set[str], optional):
+            The allowed ligand types, e.g. ``{"RR", "LL"}``. Default is
+            None, which means all.
+        con_types (set[str], optional):
+            The allowed connection types, e.g. ``{"FF", "BB"}``. Default
+            is None, which means all.
+        max_counts (dict[str, int], optional):
+            The largest numbers of the units with ligand or connection
+            types, e.g. ``{"LL": 1}``. Default is None.
+        min_counts (dict[str, int], optional):
+            The smallest numbers of the units with ligand or connection
+            types, e.g. ``{"FB": 1}``. Default is None.
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+        unique (bool, optional):
+            Whether to return only the representatives of the rings, as
+            ``enum_ring_ids``. If False, all the IDs satisfying the
+            constraints are returned, including the duplicates.
+            Default is True.
+
+    Returns:
+        set[str]: The conformation IDs satisfying the constraints.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> rings = ra.enum_constrained_ring_ids(
+        ...     6, con_types={"FF", "BB"}, max_counts={"LL": 1})
+        >>> rings == {
+        ...     ring_id for ring_id in ra.enum_ring_ids(6)
+        ...     if all(ring_id[i+2:i+4] in ("FF", "BB")
+        ...            for i in range(0, 24, 4))
+        ...     and sum(ring_id[i:i+2] == "LL"
+        ...             for i in range(0, 24, 4)) <= 1}
+        True
+    """
+    if not 1 <= num_of_ligs <= MAX_NUM_OF_LIGS:
+        raise ValueError(f"Invalid num_of_ligs: {num_of_ligs}")
+    allowed_units = _allowed_units(
+        num_of_ligs, pattern, lig_types, con_types)
+
+    # The types whose numbers are constrained, and the bounds.
+    max_counts, min_counts = max_counts or {}, min_counts or {}
+    types = sorted(set(max_counts) | set(min_counts))
+    unknown = set(types) - set(_LIG_TYPES) - set(_CON_TYPES)
+    if unknown:
+        raise ValueError(f"Unknown types: {sorted(unknown)}")
+    upper = np.array([max_counts.get(t, num_of_ligs) for t in types])
+    lower = np.array([min_counts.get(t, 0) for t in types])
+    # has_type[u, k]: Whether the unit u has the k-th type.
+    has_type = np.array([
+        [_unit_type(u, t) == t for t in types] for u in range(16)],
+        dtype=np.intp).reshape(16, len(types))
+
+    codes = np.zeros(1, dtype=np.uint64)
+    counts = np.zeros((1, len(types)), dtype=np.intp)
+    for j, units in enumerate(allowed_units):
+        codes = (
+            codes[:, np.newaxis] << np.uint64(4) | units.astype(np.uint64)
+            ).reshape(-1)
+        counts = (counts[:, np.newaxis] + has_type[units]).reshape(
+            len(codes), len(types))
+        remaining = num_of_ligs - j - 1
+        feasible = ((counts <= upper) & (counts + remaining >= lower)).all(
+            axis=1)
+        codes, counts = codes[feasible], counts[feasible]
+
+    if unique:
+        codes = codes[_is_canonical(codes, num_of_ligs, theta)]
+    return set(_codes_to_ids(codes, num_of_ligs))
+
+
+def _allowed_units(
+        num_of_ligs: int, pattern: str | None,
+        lig_types: set[str] | None, con_types: set[str] | None
+        ) -> list[np.ndarray]:
+    """Return the codes of the units allowed at each position."""
+    for types, valid in ((lig_types, _LIG_TYPES), (con_types, _CON_TYPES)):
+        if types is not None and not set(types) <= set(valid):
+            raise ValueError(f"Unknown types: {sorted(set(types))}")
+
+    n_chars = 4 * num_of_ligs
+    if pattern is None:
+        char_sets = [set(_UNIT_CHARS[i % 4]) for i in range(n_chars)]
+    else:
+        tokens = _TOKEN.findall(pattern)
+        if "".join(tokens) != pattern or len(tokens) != n_chars:
+            raise ValueError(
+                f"Invalid pattern for {num_of_ligs} ligands: {pattern}")
+        char_sets = [
+            set(_UNIT_CHARS[i % 4]) if token == "."
+            else set(token.strip("[]"))
+            for i, token in enumerate(tokens)]
+
+    allowed_units = []
+    for j in range(num_of_ligs):
+        allowed_units.append(np.array([
+            u for u in range(16)
+            if (lig_types is None or _unit_type(u, "RR") in lig_types)
+            and (con_types is None or _unit_type(u, "FF") in con_types)
+            and all(
+                _unit_chars(u)[k] in char_sets[4 * j + k] for k in range(4))
+            ], dtype=np.intp))
+    return allowed_units
+
+
+def _unit_chars(unit: int) -> str:
+    """Return the letters of the unit code, e.g. 15 -> "RRFF"."""
+    return "".join(
+        chars[0] if unit >> (3 - k) & 1 else chars[1]
+        for k, chars in enumerate(_UNIT_CHARS))
+
+
+def _unit_type(unit: int, type_: str) -> str:
+    """Return the ligand type of the unit if ``type_`` is a ligand type,
+    or the connection type otherwise."""
+    chars = _unit_chars(unit)
+    return chars[:2] if type_ in _LIG_TYPES else chars[2:]
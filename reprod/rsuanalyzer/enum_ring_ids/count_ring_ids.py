@@ -0,0 +1,131 @@
+from ._canonical import _theta_class
+
+
+def count_ring_ids(num_of_ligs: int, theta: float | None = None) -> int:
+    """Count the conformation IDs of rings without enumerating them.
+
+    The result is the same as ``len(enum_ring_ids(num_of_ligs, theta))``
+    and is computed by Burnside's lemma: the number of unique rings is
+    the average number of IDs left unchanged by the operations making
+    duplicates, i.e. the different cut points, the reverse order and the
+    enantiomer. The lig-con set reverses (theta = 0) and the R-L
+    reversals (theta = 90) are taken into account by counting the
+    classes of IDs that they leave unchanged instead of the IDs.
+
+    See also:
+        :func:`enum_ring_ids
+        <rsuanalyzer.enum_ring_ids.enum_ring_ids.enum_ring_ids>`
+
+    Args:
+        num_of_ligs (int):
+            The number of ligands in a ring.
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+
+    Returns:
+        int: The number of unique conformation IDs of rings.
+
+    Examples:
+        >>> import rsuanalyzer as ra
+        >>> ra.count_ring_ids(3)
+        376
+        >>> ra.count_ring_ids(6, 0)
+        210
+        >>> ra.count_ring_ids(20)
+        15111572745760108344144
+    """
+    if num_of_ligs < 1:
+        raise ValueError(f"Invalid num_of_ligs: {num_of_ligs}")
+    perms, inverted = _operations(num_of_ligs, theta)
+    no_inversion = [False] * len(inverted)
+    total = sum(
+        _count_fixed(perm, flips)
+        for perm in perms for flips in (no_inversion, inverted))
+    return total // (2 * len(perms))
+
+
+def _operations(
+        num_of_ligs: int, theta: float | None = None
+        ) -> tuple[list[list[int]], list[bool]]:
+    """Return the operations making duplicates of the conformation IDs.
+
+    The operations act on binary strings, which are the IDs for
+    0 < theta < 90, and the classes of IDs left by the lig-con set
+    reverses (theta = 0) or the R-L reversals (theta = 90) otherwise.
+    The rotations by each number of ligands and the reverse orders
+    following them alternate in the list.
+
+    Args:
+        num_of_ligs (int): The number of ligands in a ring.
+        theta (float): Tilting angle of the ligand in degree.
+
+    Returns:
+        tuple[list[list[int]], list[bool]]:
+            The positions where the letters move to by each operation,
+            and whether the enantiomer inverts each letter.
+    """
+    n_bits = 4 * num_of_ligs
+    theta_class = _theta_class(theta)
+
+    # Each operation is a permutation of the letters, optionally
+    # followed by the enantiomer, which inverts the ligand types.
+    # perm[i] is the position where the i-th letter moves to.
+    perms = []
+    for i in range(num_of_ligs):
+        perms.append([(pos + 4 * i) % n_bits for pos in range(n_bits)])
+        perms.append(
+            [(n_bits - 3 - pos + 4 * i) % n_bits for pos in range(n_bits)])
+    inverted = [pos % 4 < 2 for pos in range(n_bits)]
+
+    if theta_class == "theta0":
+        # The lig-con set reverses invert the pairs of the letters at
+        # (1, 2), (3, 4), ..., (n_bits - 1, 0). The classes are given by
+        # whether the two letters of each pair are the "same", e.g. "R"
+        # and "F", or not. The enantiomer inverts all of them.
+        perms = [
+            [(perm[pos] - 1) % n_bits // 2 for pos in range(1, n_bits, 2)]
+            for perm in perms]
+        inverted = [True] * (n_bits // 2)
+    elif theta_class == "theta90":
+        # The R-L reversals leave only the connection types.
+        # The enantiomer then changes nothing.
+        con_positions = [pos for pos in range(n_bits) if pos % 4 >= 2]
+        con_idxs = {pos: i for i, pos in enumerate(con_positions)}
+        perms = [
+            [con_idxs[perm[pos]] for pos in con_positions]
+            for perm in perms]
+        inverted = [False] * len(con_positions)
+
+    return perms, inverted
+
+
+def _count_fixed(perm: list[int], inverted: list[bool]) -> int:
+    """Count the binary strings left unchanged by the operation.
+
+    Args:
+        perm (list[int]):
+            The positions where the letters move to.
+        inverted (list[bool]):
+            Whether the letters are inverted after moving.
+
+    Returns:
+        int:
+            2 ** (number of cycles of the permutation) if every cycle
+            has an even number of inverted letters, otherwise 0.
+    """
+    visited = [False] * len(perm)
+    n_cycles = 0
+    for start in range(len(perm)):
+        if visited[start]:
+            continue
+        n_cycles += 1
+        n_inverted = 0
+        pos = start
+        while not visited[pos]:
+            visited[pos] = True
+            n_inverted += inverted[pos]
+            pos = perm[pos]
+        if n_inverted % 2:
+            return 0
+    return 2 ** n_cycles
@@ -0,0 +1,78 @@
+from typing import Iterable
+
+import numpy as np
+
+from ._canonical import (MAX_NUM_OF_LIGS, _canonicalize, _codes_to_ids,
+                         _letters_to_codes)
+
+# The number of IDs packed and canonicalized at once.
+_CHUNK_SIZE = 1_000_000
+
+
+def dedupe_ring_ids(
+        ring_ids: Iterable[str], theta: float | None = None
+        ) -> tuple[list[str], np.ndarray]:
+    """Remove the duplicates from conformation IDs of rings.
+
+    Each ID is replaced with the representative of its ring, which is
+    the one returned by :func:`enum_ring_ids
+    <rsuanalyzer.enum_ring_ids.enum_ring_ids.enum_ring_ids>`. The
+    representatives are computed on the packed codes of the IDs without
+    listing the duplicates, so that millions of IDs are processed in
+    seconds.
+
+    Args:
+        ring_ids (Iterable[str]):
+            Conformation IDs of rings, e.g. ``["RRFFLLBB", "LLBBRRFF"]``.
+            They can have different numbers of ligands, up to 16.
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+
+    Returns:
+        tuple[list[str], np.ndarray]:
+            The unique representatives, sorted by the number of ligands
+            and then lexicographically, and the index of the
+            representative of each given ID in them.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> unique_ids, inverse = ra.dedupe_ring_ids(
+        ...     ["RRFFLLBB", "RLFFRLFF", "LLBBRRFF", "LRFFLRFF"])
+        >>> unique_ids
+        ['RLFFRLFF', 'RRFFLLBB']
+        >>> inverse
+        array([1, 0, 1, 0])
+    """
+    ring_ids = list(ring_ids)
+    lengths = np.fromiter(
+        map(len, ring_ids), dtype=np.intp, count=len(ring_ids))
+    if np.any((lengths % 4 != 0) | (lengths == 0)):
+        raise ValueError(
+            "The length of the conformation ID of the ring should be a "
+            "positive multiple of 4.")
+    if len(ring_ids) and lengths.max() > 4 * MAX_NUM_OF_LIGS:
+        raise ValueError(f"Too many ligands: {lengths.max() // 4}")
+
+    unique_ids: list[str] = []
+    inverse = np.empty(len(ring_ids), dtype=np.intp)
+    distinct_lengths = np.unique(lengths)
+    for length in distinct_lengths:
+        num_of_ligs = int(length) // 4
+        if len(distinct_lengths) == 1:
+            idxs = np.arange(len(ring_ids))
+            group = ring_ids
+        else:
+            idxs = np.flatnonzero(lengths == length)
+            group = [ring_ids[i] for i in idxs]
+
+        codes = np.empty(len(group), dtype=np.uint64)
+        for start in range(0, len(group), _CHUNK_SIZE):
+            codes[start:start+_CHUNK_SIZE] = _canonicalize(
+                _letters_to_codes(
+                    "".join(group[start:start+_CHUNK_SIZE]), int(length)),
+                num_of_ligs, theta)
+        unique_codes, group_inverse = np.unique(codes, return_inverse=True)
+        inverse[idxs] = len(unique_ids) + group_inverse
+        unique_ids.extend(_codes_to_ids(unique_codes, num_of_ligs))
+    return unique_ids, inverse
@@ -0,0 +1,188 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from ._canonical import (MAX_NUM_OF_LIGS, _canonicalize, _codes_to_ids,
+                         _is_canonical, _normalize, _rev_order, _rotl,
+                         _rotations_and_flips, _theta_class)
+
+# The number of parent rings processed at once.
+_CHUNK_SIZE = 1 << 14
+
+
+def enum_ring_ids_incrementally(
+        num_of_ligs: int, theta: float | None = None,
+        cache_dir: str | None = None
+        ) -> set[str]:
+    """Enumerate all possible conformation IDs of rings, growing the
+    rings one ligand at a time.
+
+    The result is the same as :func:`enum_ring_ids
+    <rsuanalyzer.enum_ring_ids.enum_ring_ids.enum_ring_ids>`, but the
+    rings are not deduplicated at the end. Instead, the unique rings with
+    n ligands are generated from the unique rings with n - 1 ligands by
+    canonical augmentation: each ring is generated only from its
+    "parent", the representative of the ring without its last ligand
+    and connection. Therefore, no duplicates need to be removed, and the
+    cost of the enumeration is dominated by the largest number of
+    ligands.
+
+    If ``cache_dir`` is given, the unique rings of each number of
+    ligands are saved there, and the enumeration resumes from the
+    largest saved number of ligands up to ``num_of_ligs``.
+
+    Args:
+        num_of_ligs (int):
+            The number of ligands in a ring. 1 <= num_of_ligs <= 16.
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+        cache_dir (str, optional):
+            The directory to save and load the unique rings of each
+            number of ligands. Default is None, which means no cache.
+
+    Returns:
+        set[str]:
+            The set of possible conformation IDs of rings with the
+            given number of ligands.
+
+    Examples:
+        >>> import rsuanalyzer as ra
+        >>> len(ra.enum_ring_ids_incrementally(3))
+        376
+        >>> for n in range(2, 8):
+        ...     rings = ra.enum_ring_ids_incrementally(
+        ...         n, 30, cache_dir="ring_cache")  # resumes from n - 1
+    """
+    codes = _enum_canonical_codes(num_of_ligs, theta, cache_dir)
+    return set(_codes_to_ids(codes, num_of_ligs))
+
+
+def _enum_canonical_codes(
+        num_of_ligs: int, theta: float | None = None,
+        cache_dir: str | None = None, mmap_mode: str | None = None
+        ) -> np.ndarray:
+    """Enumerate the codes of the representatives of the rings.
+
+    Args:
+        num_of_ligs (int): The number of ligands in a ring.
+        theta (float): Tilting angle of the ligand in degree.
+        cache_dir (str, optional):
+            The directory to save and load the codes.
+        mmap_mode (str, optional):
+            The mode of ``np.load`` used when the codes of
+            ``num_of_ligs`` are cached, e.g. "r" to share them between
+            processes without copying. Default is None.
+
+    Returns:
+        np.ndarray: The sorted codes. dtype: uint64.
+    """
+    if not 1 <= num_of_ligs <= MAX_NUM_OF_LIGS:
+        raise ValueError(f"Invalid num_of_ligs: {num_of_ligs}")
+
+    # Resume from the largest cached number of ligands.
+    cur_num, codes = 0, None
+    if cache_dir is not None:
+        for n in range(num_of_ligs, 0, -1):
+            path = _cache_path(cache_dir, n, theta)
+            if os.path.exists(path):
+                cur_num = n
+                codes = np.load(
+                    path, mmap_mode=mmap_mode if n == num_of_ligs else None)
+                break
+
+    while cur_num < num_of_ligs:
+        if cur_num == 0:
+            codes = np.unique(_canonicalize(
+                np.arange(16, dtype=np.uint64), 1, theta))
+        else:
+            codes = _extend_canonical_codes(codes, cur_num, theta)
+        cur_num += 1
+        if cache_dir is not None:
+            _save_codes(_cache_path(cache_dir, cur_num, theta), codes)
+
+    return codes
+
+
+
+@lru_cache(maxsize=None)
+def _sorted_codes(
+        num_of_ligs: int, theta_class: str, cache_dir: str | None
+        ) -> np.ndarray:
+    """Return the sorted codes of the representatives of the rings,
+    enumerated once for each number of ligands and class of theta."""
+    theta = {"theta0": 0, "theta90": 90, "general": None}[theta_class]
+    return _enum_canonical_codes(
+        num_of_ligs, theta, cache_dir, mmap_mode="r")
+
+def _extend_canonical_codes(
+        parents: np.ndarray, num_of_ligs: int, theta: float | None = None
+        ) -> np.ndarray:
+    """Generate the representatives of the rings with one more ligand.
+
+    The first n ligands and connections of a representative with
+    n + 1 ligands are a duplicate of its parent. The candidates are
+    therefore the duplicates of the parents followed by a ligand and a
+    connection, and the representatives among them are kept. For
+    theta = 0, the lig-con set reverses may also change the first n
+    ligands and connections, so a representative is kept only if its
+    parent is in the same chunk; each representative is then kept
+    exactly once.
+
+    Args:
+        parents (np.ndarray):
+            The sorted codes of the representatives of the rings with
+            ``num_of_ligs`` ligands.
+        num_of_ligs (int): The number of ligands of the parents.
+        theta (float): Tilting angle of the ligand in degree.
+
+    Returns:
+        np.ndarray:
+            The sorted codes of the representatives of the rings with
+            ``num_of_ligs + 1`` ligands. dtype: uint64.
+    """
+    n_bits = 4 * num_of_ligs
+    # Codes of the appended ligands and connections. For theta = 90,
+    # the ligand types of the representatives are always "RR".
+    units = np.arange(16, dtype=np.uint64)
+    if _theta_class(theta) == "theta90":
+        units = units[units >= 12]
+
+    children = []
+    for start in range(0, len(parents), _CHUNK_SIZE):
+        chunk = parents[start:start+_CHUNK_SIZE]
+        dups = np.stack([
+            _rotl(oriented, shift, n_bits) ^ flip
+            for oriented in (chunk, _rev_order(chunk, n_bits))
+            for shift, flip in _rotations_and_flips(n_bits, theta)])
+        candidates = _normalize(
+            (dups[..., np.newaxis] << np.uint64(4) | units).ravel(),
+            n_bits + 4, theta)
+        canon = np.unique(candidates[
+            _is_canonical(candidates, num_of_ligs + 1, theta)])
+
+        parents_of_canon = _canonicalize(
+            canon >> np.uint64(4), num_of_ligs, theta)
+        idxs = np.searchsorted(chunk, parents_of_canon)
+        idxs[idxs == len(chunk)] = 0
+        children.append(canon[chunk[idxs] == parents_of_canon])
+
+    return np.sort(np.concatenate(children))
+
+
+def _cache_path(
+        cache_dir: str, num_of_ligs: int, theta: float | None) -> str:
+    """Return the path of the cached codes."""
+    return os.path.join(
+        cache_dir, f"ring_codes_{num_of_ligs}_{_theta_class(theta)}.npy")
+
+
+def _save_codes(path: str, codes: np.ndarray) -> None:
+    """Save the codes atomically so that an interrupted run never
+    leaves a broken cache."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, codes)
+    os.replace(tmp_path, path)
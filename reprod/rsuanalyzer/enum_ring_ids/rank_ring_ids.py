@@ -0,0 +1,503 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from scipy import sparse
+
+from ._canonical import (_canonicalize, _codes_to_ids, _ids_to_codes,
+                         _is_canonical, _theta_class)
+from .count_ring_ids import _operations, count_ring_ids
+
+# The largest number of the candidates checked at once when the rings
+# following the first one are listed.
+_MAX_CHUNK_SIZE = 1 << 20
+
+
+def ring_rank(ring_id: str, theta: float | None = None) -> int:
+    """Return the index of the ring in the sorted unique ring IDs.
+
+    The index is the position of the representative of the ring in
+    ``sorted(enum_ring_ids(num_of_ligs, theta))``, so that it is stable
+    and can be used to shard the rings or to address rows of arrays.
+    Any duplicate of the representative has the same index. The number
+    of ligands is that of ``ring_id``.
+
+    The index is computed without enumerating the rings: it is the
+    number of unique rings whose representatives are smaller than that
+    of the ring, which is counted by Burnside's lemma as in
+    :func:`count_ring_ids
+    <rsuanalyzer.enum_ring_ids.count_ring_ids.count_ring_ids>`. For each
+    operation making duplicates, the IDs left unchanged by it whose
+    duplicates are all smaller than the representative are counted with
+    an automaton reading the duplicates bit by bit. The cost is
+    polynomial in the number of ligands, e.g. about 20 ms for 10
+    ligands, and no table of the rings is needed.
+
+    See also:
+        :func:`ring_unrank
+        <rsuanalyzer.enum_ring_ids.rank_ring_ids.ring_unrank>`
+
+    Args:
+        ring_id (str):
+            Conformation ID of the ring, e.g. "RRFFLLBB".
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+
+    Returns:
+        int: The index. 0 <= index < count_ring_ids(num_of_ligs, theta).
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.ring_rank("RLFFRLFF")
+        13
+        >>> ra.ring_rank("LRFFLRFF")  # enantiomer
+        13
+    """
+    num_of_ligs = len(ring_id) // 4
+    code = _canonicalize(_ids_to_codes([ring_id]), num_of_ligs, theta)[0]
+    return _count_smaller(
+        _code_to_key(int(code), num_of_ligs, theta), num_of_ligs, theta)
+
+
+def ring_unrank(
+        index: int, num_of_ligs: int, theta: float | None = None
+        ) -> str:
+    """Return the ring ID of the index in the sorted unique ring IDs.
+
+    This is the inverse of :func:`ring_rank
+    <rsuanalyzer.enum_ring_ids.rank_ring_ids.ring_rank>`. The
+    representative is found bit by bit from the most significant one,
+    counting the unique rings smaller than each candidate, so that the
+    cost is that of ``ring_rank`` times the number of the bits.
+
+    Args:
+        index (int):
+            The index. 0 <= index < count_ring_ids(num_of_ligs, theta).
+        num_of_ligs (int):
+            The number of ligands in a ring.
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+
+    Returns:
+        str: The conformation ID of the representative of the ring.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.ring_unrank(13, 2)
+        'RLFFRLFF'
+    """
+    if not 0 <= index < count_ring_ids(num_of_ligs, theta):
+        raise IndexError(f"Index out of range: {index}")
+    key = 0
+    for bit in reversed(range(len(_key_positions(num_of_ligs, theta)))):
+        if _count_smaller(key | 1 << bit, num_of_ligs, theta) <= index:
+            key |= 1 << bit
+    code = _key_to_code(np.array([key], dtype=np.uint64), num_of_ligs, theta)
+    return _codes_to_ids(code, num_of_ligs)[0]
+
+
+def ring_unrank_range(
+        start: int, stop: int, num_of_ligs: int,
+        theta: float | None = None
+        ) -> list[str]:
+    """Return the ring IDs of the indices from ``start`` to ``stop - 1``
+    in the sorted unique ring IDs.
+
+    This is useful to split the rings into shards, e.g. each worker
+    takes the rings of its own range of the indices. Only the first
+    ring is unranked. The following ones are found by checking the
+    larger IDs in order, so that the cost is proportional to
+    ``stop - start``, and the other rings are never enumerated.
+
+    Args:
+        start (int): The first index.
+        stop (int): The index after the last one.
+        num_of_ligs (int): The number of ligands in a ring.
+        theta (float):
+            Tilting angle of the ligand in degree. Note that results
+            are same for 0 < theta < 90.
+
+    Returns:
+        list[str]: The conformation IDs in the order of the indices.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> n = ra.count_ring_ids(4)
+        >>> shards = [
+        ...     ra.ring_unrank_range(i, min(i + 1000, n), 4)
+        ...     for i in range(0, n, 1000)]
+    """
+    if not 0 <= start <= stop <= count_ring_ids(num_of_ligs, theta):
+        raise IndexError(f"Index out of range: {start}:{stop}")
+    if start == stop:
+        return []
+    first = _code_to_key(
+        int(_ids_to_codes([ring_unrank(start, num_of_ligs, theta)])[0]),
+        num_of_ligs, theta)
+
+    # The representatives are about one in the number of the operations
+    # making duplicates, i.e. 4 * num_of_ligs, among the keys.
+    codes = []
+    n_found = 0
+    n_keys = 1 << len(_key_positions(num_of_ligs, theta))
+    while n_found < stop - start:
+        chunk_size = min(
+            8 * num_of_ligs * (stop - start - n_found), _MAX_CHUNK_SIZE)
+        keys = np.uint64(first) + np.arange(
+            min(chunk_size, n_keys - first), dtype=np.uint64)
+        chunk = _key_to_code(keys, num_of_ligs, theta)
+        chunk = chunk[_is_canonical(chunk, num_of_ligs, theta)]
+        codes.append(chunk[:stop - start - n_found])
+        n_found += len(codes[-1])
+        first += chunk_size
+    return _codes_to_ids(np.concatenate(codes), num_of_ligs)
+
+
+# The representatives are normalized, i.e. the lig-con set reverses
+# (theta = 0) and the R-L reversals (theta = 90) make some of their bits
+# always 1. The other bits, in the order of the positions, are the "key"
+# of a representative, which is the binary string the operations of
+# ``count_ring_ids._operations`` act on. The keys are in the same order
+# as the codes.
+
+def _key_positions(
+        num_of_ligs: int, theta: float | None = None) -> list[int]:
+    """Return the positions of the bits of the codes in the keys."""
+    n_bits = 4 * num_of_ligs
+    theta_class = _theta_class(theta)
+    if theta_class == "theta0":
+        # Whether the letters of each pair of (1, 2), (3, 4), ...,
+        # (n_bits - 1, 0) are the same, which is the less significant
+        # letter after normalization. The other letter is always 1.
+        return list(range(2, n_bits - 1, 2)) + [n_bits - 1]
+    if theta_class == "theta90":
+        # The connection types.
+        return [pos for pos in range(n_bits) if pos % 4 >= 2]
+    return list(range(n_bits))
+
+
+def _code_to_key(
+        code: int, num_of_ligs: int, theta: float | None = None) -> int:
+    """Return the key of the normalized code."""
+    n_bits = 4 * num_of_ligs
+    key = 0
+    for pos in _key_positions(num_of_ligs, theta):
+        key = key << 1 | code >> (n_bits - 1 - pos) & 1
+    return key
+
+
+def _key_to_code(
+        keys: np.ndarray, num_of_ligs: int, theta: float | None = None
+        ) -> np.ndarray:
+    """Return the normalized codes of the keys."""
+    n_bits = 4 * num_of_ligs
+    positions = _key_positions(num_of_ligs, theta)
+    fixed = sum(
+        1 << (n_bits - 1 - pos) for pos in range(n_bits)
+        if pos not in positions)
+    codes = np.full(len(keys), fixed, dtype=np.uint64)
+    for i, pos in enumerate(positions):
+        bits = keys >> np.uint64(len(positions) - 1 - i) & np.uint64(1)
+        codes |= bits << np.uint64(n_bits - 1 - pos)
+    return codes
+
+
+@dataclass(frozen=True)
+class _Reads:
+    """How the duplicates of a ring are read from its key.
+
+    The operations of ``count_ring_ids._operations`` are the rotations
+    by the units of the key, e.g. 4 bits of a ligand, and the reverse
+    orders following them. A duplicate is therefore the key read from
+    a unit boundary forward, or from ``back_start`` modulo the unit
+    backward, and with the enantiomer, the bits at ``inverted`` modulo
+    the unit inverted.
+
+    Attributes:
+        unit (int): The number of the bits of a ligand in the key.
+        back_start (int): The first bit of the backward reads.
+        inverted (tuple[int, ...]):
+            Whether the enantiomer inverts each bit of a unit.
+    """
+    unit: int
+    back_start: int
+    inverted: tuple[int, ...]
+
+    def flips(self) -> list[tuple[int, ...]]:
+        """Return the bits inverted by the different duplicates."""
+        no_inversion = (0,) * self.unit
+        if any(self.inverted):
+            return [no_inversion, self.inverted]
+        return [no_inversion]
+
+
+def _count_smaller(
+        key: int, num_of_ligs: int, theta: float | None = None) -> int:
+    """Count the unique rings whose representatives have keys smaller
+    than ``key``.
+
+    By Burnside's lemma, the number is the average over the operations
+    of the number of the keys left unchanged by the operation whose
+    duplicates are all smaller than ``key``. The set of such keys is
+    closed under the operations, so that its orbits are the rings.
+    """
+    perms, inverted = _operations(num_of_ligs, theta)
+    n_bits = len(inverted)
+    unit = n_bits // num_of_ligs
+    reads = _Reads(
+        unit, perms[1][0] % unit, tuple(map(int, inverted[:unit])))
+    # The rotations of the same period leave the same keys unchanged.
+    # The reflections whose axes differ by two units are conjugated by
+    # the rotation by a unit, and leave as many keys unchanged.
+    terms = {}
+    total = 0
+    for i, perm in enumerate(perms):
+        for enantiomer in (False, True):
+            if i % 2 == 0:
+                args = (
+                    False, gcd(perm[0] // unit, num_of_ligs), enantiomer)
+            else:
+                args = (True, perm[0] % gcd(2 * unit, n_bits), enantiomer)
+            if args not in terms:
+                count = _count_fixed_by_reflection if args[0] \
+                    else _count_fixed_by_rotation
+                terms[args] = count(key, *args[1:], n_bits, reads)
+            total += terms[args]
+    return total // (2 * len(perms))
+
+
+def _count_fixed_by_rotation(
+        key: int, shift: int, enantiomer: bool, n_bits: int,
+        reads: _Reads) -> int:
+    """Count the keys left unchanged by the rotation by ``shift``
+    units, optionally followed by the enantiomer, whose duplicates are
+    all smaller than ``key``.
+
+    Such a key repeats its first ``period`` units, which are inverted
+    every other time with the enantiomer. So do its duplicates, which
+    are therefore compared with ``key`` by their first ``period`` units.
+    """
+    n_units = n_bits // reads.unit
+    period = gcd(shift, n_units)
+    twisted = enantiomer and any(reads.inverted)
+    if twisted and n_units // period % 2:
+        return 0
+    n_period_bits = period * reads.unit
+    head = key >> (n_bits - n_period_bits)
+    mask = int("".join(
+        str(reads.inverted[pos % reads.unit])
+        for pos in range(n_period_bits)), 2)
+    repeated, block = 0, head
+    for _ in range(n_units // period):
+        repeated = repeated << n_period_bits | block
+        if twisted:
+            block ^= mask
+    # The duplicates starting with ``head`` are smaller than ``key``
+    # only if ``repeated`` is.
+    return _count_cyclic(
+        head + (repeated < key), n_period_bits, twisted, reads)
+
+
+def _count_cyclic(
+        key: int, n_bits: int, twisted: bool, reads: _Reads) -> int:
+    """Count the binary strings of ``n_bits`` whose cyclic reads are
+    all smaller than ``key``.
+
+    The strings are read cyclically, forward and backward as described
+    by ``reads``. If ``twisted``, the bits are inverted by the
+    enantiomer every time the reads wrap around.
+
+    The automaton of the reads tied with ``key`` rejects a string as
+    soon as one of them exceeds ``key`` or equals it. A cyclic string
+    is accepted iff the automaton returns to the state where it starts,
+    which is the one after reading the string; the number of the
+    strings is therefore the trace of the product of the transitions.
+    """
+    if key <= 0:
+        return 0
+    if key >= 1 << n_bits:
+        return 1 << n_bits
+    automaton = _automaton(key, n_bits, reads, backward=True)
+    # The states at unit boundaries, where the walks start.
+    starts = np.flatnonzero(automaton.at_phase(reads.unit - 1))
+    counts = np.zeros((automaton.n_states, len(starts)), dtype=np.int64)
+    counts[starts, np.arange(len(starts))] = 1
+    for pos in range(n_bits):
+        trans = automaton.transitions[pos % reads.unit]
+        counts = trans[0] @ counts + trans[1] @ counts
+    ends = automaton.twists[starts] if twisted else starts
+    # The counts are modulo 2 ** 64, but the total is smaller.
+    return int(counts[ends, np.arange(len(starts))].astype(np.uint64).sum())
+
+
+def _count_fixed_by_reflection(
+        key: int, axis: int, enantiomer: bool, n_bits: int,
+        reads: _Reads) -> int:
+    """Count the keys left unchanged by the reflection ``pos -> axis -
+    pos``, optionally followed by the enantiomer, whose duplicates are
+    all smaller than ``key``.
+
+    The backward reads of such a key are its forward reads, so only the
+    latter are checked with the automaton. The walk starts at the axis
+    and is run forward over the first half of the key and backward, by
+    the inverse transitions, over the mirrored second half, until both
+    meet in the middle.
+    """
+    flips = [
+        reads.inverted[pos % reads.unit] if enantiomer else 0
+        for pos in range(n_bits)]
+    if any(flips[pos] != flips[(axis - pos) % n_bits]
+           for pos in range(n_bits)):
+        return 0
+    automaton = _automaton(key, n_bits, reads, backward=False)
+    trans = automaton.transitions
+    half = n_bits // 2
+    first = (axis + 1) // 2
+    # For an even axis, the bits at ``first`` and ``first + half`` are
+    # mirrored to themselves.
+    fixed = axis % 2 == 0
+    start_phase = (first - 1) % reads.unit
+
+    counts = np.diag(automaton.at_phase(start_phase)).astype(np.int64)
+    for i in range(half + fixed):
+        pos = (first + i) % n_bits
+        phase = pos % reads.unit
+        if fixed and i in (0, half):
+            if flips[pos]:
+                return 0
+            counts = trans[phase][0] @ counts + trans[phase][1] @ counts
+            continue
+        mirror = (axis - pos) % n_bits
+        mirror_phase = mirror % reads.unit
+        counts = sum(
+            trans[phase][bit] @ (
+                automaton.sources[mirror_phase][bit ^ flips[pos]]
+                @ counts.T).T
+            for bit in (0, 1))
+    return int(np.diagonal(counts).astype(np.uint64).sum())
+
+
+@lru_cache(maxsize=256)
+def _automaton(
+        key: int, n_bits: int, reads: _Reads, backward: bool
+        ) -> "_Automaton":
+    """Return the automaton of the reads tied with ``key``, which is
+    shared by the operations and the bits of ``ring_unrank``."""
+    return _Automaton(_read_patterns(key, n_bits, reads, backward), reads)
+
+
+def _read_patterns(
+        key: int, n_bits: int, reads: _Reads, backward: bool
+        ) -> list[list[int]]:
+    """Return the patterns of the bits which make a read larger than
+    ``key`` or equal to it.
+
+    A read is not smaller than ``key`` iff it matches the first k bits
+    of ``key`` and then has 1 where ``key`` has 0, or matches all of
+    ``key``. Each bit of the patterns is given as ``2 * phase + bit``,
+    where ``phase`` is its position modulo the unit, in the order of
+    the positions.
+    """
+    key_bits = [key >> (n_bits - 1 - i) & 1 for i in range(n_bits)]
+    lengths = [k for k in range(n_bits) if key_bits[k] == 0] + [n_bits]
+    patterns = []
+    for flips in reads.flips():
+        for k in lengths:
+            # The bits of the read, the last one larger than ``key``.
+            bits = (key_bits[:k] + [1])[:n_bits]
+            patterns.append([
+                2 * (i % reads.unit) + (bit ^ flips[i % reads.unit])
+                for i, bit in enumerate(bits)])
+            if backward:
+                phases = [
+                    (reads.back_start - i) % reads.unit
+                    for i in range(len(bits))]
+                patterns.append([
+                    2 * phase + (bit ^ flips[phase])
+                    for phase, bit in zip(phases, bits)][::-1])
+    return patterns
+
+
+class _Automaton:
+    """The Aho-Corasick automaton of the patterns, whose states are the
+    prefixes of the patterns and are dead if they end with a pattern.
+
+    Attributes:
+        n_states (int): The number of the states.
+        alive (np.ndarray): Whether each state is alive.
+        twists (np.ndarray):
+            The state of each state with the bits inverted by the
+            enantiomer.
+        transitions (list[list[sparse.csr_matrix]]):
+            The transposed matrices of the transitions between the
+            alive states by each bit at each phase, i.e. the element
+            (j, i) is 1 if the bit leads from the state i to j.
+        sources (list[list[sparse.csr_matrix]]):
+            The transposes of ``transitions``, whose element (i, j) is
+            1 if the bit leads from the state i to j.
+    """
+
+    def __init__(self, patterns: list[list[int]], reads: _Reads) -> None:
+        n_symbols = 2 * reads.unit
+        children = [{}]
+        parents, symbols = [-1], [-1]
+        dead = [False]
+        for pattern in patterns:
+            state = 0
+            for symbol in pattern:
+                if symbol not in children[state]:
+                    children[state][symbol] = len(children)
+                    children.append({})
+                    parents.append(state)
+                    symbols.append(symbol)
+                    dead.append(False)
+                state = children[state][symbol]
+            dead[state] = True
+
+        # The transitions are filled in breadth-first order, so that the
+        # state of the longest proper suffix is always done.
+        self.n_states = len(children)
+        nexts = np.zeros((self.n_states, n_symbols), dtype=np.intp)
+        suffixes = np.zeros(self.n_states, dtype=np.intp)
+        self.twists = np.zeros(self.n_states, dtype=np.intp)
+        queue = [0]
+        for state in queue:
+            if state:
+                dead[state] |= dead[suffixes[state]]
+                parent, symbol = parents[state], symbols[state]
+                self.twists[state] = children[self.twists[parent]][
+                    symbol ^ reads.inverted[symbol // 2]]
+            for symbol in range(n_symbols):
+                child = children[state].get(symbol)
+                if child is None:
+                    nexts[state, symbol] = nexts[suffixes[state], symbol]
+                else:
+                    nexts[state, symbol] = child
+                    suffixes[child] = \
+                        nexts[suffixes[state], symbol] if state else 0
+                    queue.append(child)
+
+        self.alive = ~np.array(dead)
+        self._phases = np.array(symbols) // 2
+        self.transitions = []
+        for phase in range(reads.unit):
+            self.transitions.append([])
+            for bit in (0, 1):
+                dests = nexts[:, 2 * phase + bit]
+                valid = np.flatnonzero(self.alive & self.alive[dests])
+                self.transitions[-1].append(sparse.csr_matrix(
+                    (np.ones(len(valid), dtype=np.int64),
+                     (dests[valid], valid)),
+                    shape=(self.n_states, self.n_states)))
+        self.sources = [
+            [matrix.T.tocsr() for matrix in matrices]
+            for matrices in self.transitions]
+
+    def at_phase(self, phase: int) -> np.ndarray:
+        """Return whether each state can be the one before the bit at
+        ``phase + 1``, i.e. is alive and empty or ends at ``phase``."""
+        return self.alive & (
+            (self._phases == phase) | (np.arange(self.n_states) == 0))
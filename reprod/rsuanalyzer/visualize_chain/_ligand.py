@@ -1,16 +1,41 @@
-from math import cos, pi, sin
-from typing import Literal
+from functools import cache
+from math import pi
+from typing import Iterable, Literal
 
 import numpy as np
 
-from ..core._local_vecs_rots import (_rot_ab1, _rot_ac, _x_ab_coord_a,
-                                     _x_bc_coord_a)
+from ..core._transforms import LIG_TYPES, _lig_mats
 
+# Number of points of the fragments of a ligand: three hexagons (closed,
+# so the first vertex is repeated) and two edges.
+_N_PTS_OF_FRAGS = (7, 7, 7, 2, 2)
 
+
+@cache
+def _hex_template(hex_radius: float) -> np.ndarray:
+    """Return the vertices of the prototype hexagon.
+
+    The hexagon is centered at the origin in the xy-plane and closed,
+    i.e., the first vertex is repeated at the end.
+
+    Args:
+        hex_radius (float): Radius of the hexagon.
+
+    Returns:
+        np.ndarray: The vertices of the hexagon. Shape: (7, 3).
+    """
+    phis = np.arange(7) * pi / 3
+    hex = hex_radius * np.stack(
+        [np.cos(phis), np.sin(phis), np.zeros(7)], axis=1)
+    hex.flags.writeable = False
+    return hex
+
+
+@cache
 def _calc_c_positions_of_frags_in_lig(
         lig_type: Literal["RR", "RL", "LR", "LL"], theta: float,
         hex_radius: float = .2, pd_n_dist: float = .16
-        ) -> list[list[np.ndarray]]:
+        ) -> np.ndarray:
     """Calculate approximate positions of carbon atoms in a ligand.
 
     This function calculates the positions of carbon atoms within 
@@ -37,15 +62,20 @@ def _calc_c_positions_of_frags_in_lig(
             ring. Default is 0.16.
 
     Returns:
-        list[list[np.ndarray]]: 
-            A list of lists of numpy arrays.
-            Each list corresponds to a fragment of the ligand molecule.
-            The first three lists correspond to the first pyridine ring,
+        np.ndarray: 
+            The positions of the carbon atoms. Shape: (5, 7, 3).
+            Each row corresponds to a fragment of the ligand molecule.
+            The first three rows correspond to the first pyridine ring,
             the central benzene ring, and the second pyridine ring, 
-            respectively. The fourth and fifth lists correspond to the 
-            edges between the first and second pyridine rings and between 
-            the second pyridine ring and the central benzene ring, 
-            respectively.
+            respectively. The fourth and fifth rows correspond to the 
+            edges between the first pyridine ring and the central benzene
+            ring and between the central benzene ring and the second
+            pyridine ring, respectively.
+
+            Note:
+                The edges have only two points. They are padded to seven
+                points by repeating the last point, which does not change
+                the appearance of the plotted lines.
 
     Example:
         >>> import matplotlib.pyplot as plt
@@ -62,33 +92,77 @@ def _calc_c_positions_of_frags_in_lig(
         >>> ax.set_box_aspect([1, 1, 1])
         >>> plt.show()
     """
-    # Make a prototype hexagon
-    hex = []
-    for i in range(7):
-        phi = i * pi / 3
-        hex.append(hex_radius * np.array([cos(phi), sin(phi), 0]))
+    if lig_type not in LIG_TYPES:
+        raise ValueError(f"Invalid lig_type: {lig_type}")
+
+    frags = _calc_c_positions_of_frags_in_ligs(
+        theta, hex_radius, pd_n_dist)[LIG_TYPES.index(lig_type)]
+    frags.flags.writeable = False
+    return frags
+
+
+def _calc_c_positions_of_frags_in_ligs(
+        thetas: float | Iterable[float],
+        hex_radius: float = .2, pd_n_dist: float = .16
+        ) -> np.ndarray:
+    """Calculate approximate positions of carbon atoms in the ligands of
+    all the ligand types for many thetas at once.
+
+    This is the vectorized version of 
+    :func:`_calc_c_positions_of_frags_in_lig`.
+
+    Args:
+        thetas (float | Iterable[float]): 
+            Tilt angles of C-C bonds in degrees. 
+            Valid range is 0 <= theta <= 90.
+        hex_radius (float, optional): 
+            Radius of the hexagons. Default is 0.2.
+        pd_n_dist (float, optional): 
+            Distance between the Pd atom and the N atom in the pyridine 
+            ring. Default is 0.16.
+
+    Returns:
+        np.ndarray: 
+            The positions of the carbon atoms in the local coordinate
+            system A. Shape: np.shape(thetas) + (4, 5, 7, 3), where the
+            first 4 is for the ligand types in ``LIG_TYPES``.
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    hex = _hex_template(hex_radius)
+    lig_mats = _lig_mats(thetas)  # (..., 4, 4, 4)
+    x_ab = np.array([1, 0, 0])
+    x_bc = lig_mats[..., :3, 3] - x_ab
+
+    # Rotations from the coordinate system A to B1, i.e., around the
+    # x-axis by theta for "RR" and "RL", and by -theta for "LR" and "LL".
+    signs = np.array([1, 1, -1, -1])
+    angles = np.radians(thetas)[..., np.newaxis] * signs
+    rot_ab1 = np.zeros(angles.shape + (3, 3))
+    rot_ab1[..., 0, 0] = 1
+    rot_ab1[..., 1, 1] = rot_ab1[..., 2, 2] = np.cos(angles)
+    rot_ab1[..., 2, 1] = np.sin(angles)
+    rot_ab1[..., 1, 2] = -np.sin(angles)
+
+    frags = np.empty(angles.shape + (5, 7, 3))
 
     # Pyridine ring adjacent to the previous ligand
-    first_hex = [
-        np.array([(pd_n_dist + hex_radius), 0, 0]) + vtx for vtx in hex]
+    frags[..., 0, :, :] = hex + np.array([(pd_n_dist + hex_radius), 0, 0])
 
     # Central benzene ring
-    second_hex = [
-        _rot_ab1(lig_type, theta).apply(vtx)
-        + _x_ab_coord_a(lig_type, theta) for vtx in hex]
+    frags[..., 1, :, :] = hex @ rot_ab1.swapaxes(-1, -2) + x_ab
 
     # Pyridine ring adjacent to the next ligand
-    third_hex = [
-        _rot_ac(lig_type, theta).apply(vtx)
-        + _x_ab_coord_a(lig_type, theta)
-        + _x_bc_coord_a(lig_type, theta) * (1 - pd_n_dist - hex_radius)
-        for vtx in hex
-        ]
+    frags[..., 2, :, :] = hex @ lig_mats[..., :3, :3].swapaxes(-1, -2) \
+        + (x_ab + x_bc * (1 - pd_n_dist - hex_radius))[..., np.newaxis, :]
 
     # Edge between the first and second hexagons
-    edge_ab = [first_hex[0], second_hex[3]]
+    frags[..., 3, 0, :] = frags[..., 0, 0, :]
+    frags[..., 3, 1:, :] = frags[..., 1, 3, np.newaxis, :]
 
     # Edge between the second and third hexagons
-    edge_bc = [second_hex[1 if lig_type in ("RR", "RL") else 5], third_hex[3]]
+    second_hex_vtx_idxs = [
+        1 if lig_type in ("RR", "RL") else 5 for lig_type in LIG_TYPES]
+    frags[..., 4, 0, :] = frags[..., range(4), 1, second_hex_vtx_idxs, :]
+    frags[..., 4, 1:, :] = frags[..., 2, 3, np.newaxis, :]
 
-    return [first_hex, second_hex, third_hex, edge_ab, edge_bc]
+    return frags
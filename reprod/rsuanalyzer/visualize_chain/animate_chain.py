@@ -0,0 +1,142 @@
+import os
+from itertools import cycle
+from typing import Iterable
+
+import numpy as np
+from matplotlib.animation import FFMpegWriter, PillowWriter
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+from ..core._transforms import _encode_ids
+from ._utils import _limit_axis
+from .carbons import _calc_global_c_positions
+from .metals import _calc_global_metal_positions
+from .visualize_chain import _LIG_COLORS
+
+
+def animate_chain(
+        conf_id: str, thetas: Iterable[float], delta_: float = 87,
+        out_path: str = "chain.gif", fps: int = 30, dpi: int = 100
+        ) -> str:
+    """Make an animation of the structure of a chain over tilt angles.
+
+    The geometry of all the frames is computed at once in a vectorized
+    pass. The figure is created only once, and its artists are updated
+    with the geometry of each frame. The animation is encoded through
+    the matplotlib writers: Pillow for GIF and FFmpeg for MP4.
+
+    Caution:
+        This function is intended to provide an approximate visualization
+        of the chain structure. It may not accurately represent the precise
+        positions of the atoms.
+
+    Args:
+        conf_id (str):
+            The conformation ID of the chain, e.g. "RLFFRLFFRL".
+            Ring ID (e.g. "RLFFRLFFRLFF") is also acceptable,
+            but the last two characters will be ignored.
+        thetas (Iterable[float]):
+            The tilt angles of the C-C bonds in degrees, one for each
+            frame, e.g. ``np.linspace(0, 90, 900)``.
+        delta_ (float, optional):
+            The N-Pd-N angle in degrees. Default is 87.
+        out_path (str, optional):
+            The path of the output file. The extension should be ".gif"
+            or ".mp4". Default is ``"chain.gif"``.
+        fps (int, optional):
+            Frames per second. Default is 30.
+        dpi (int, optional):
+            Resolution of the frames in dots per inch. Default is 100.
+
+    Returns:
+        str: The path of the output file.
+
+    Example:
+        >>> import numpy as np
+        >>> import rsuanalyzer as ra
+        >>> ra.animate_chain(
+        ...     "RLFFRLFFRLFF", np.linspace(0, 90, 91), out_path="syn-T-1.gif")
+        'syn-T-1.gif'
+    """
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext == ".gif":
+        writer = PillowWriter(fps=fps)
+    elif ext == ".mp4":
+        writer = FFMpegWriter(fps=fps)
+    else:
+        raise ValueError(f"Unsupported file extension: {ext}")
+
+    thetas = np.asarray(list(thetas), dtype=float)
+    if len(thetas) == 0:
+        raise ValueError("thetas should not be empty.")
+
+    # Geometry of all the frames.
+    # metal_positions: (n_frames, n_ligs + 1, 3)
+    # frags_of_ligs: (n_frames, n_ligs, 5, 7, 3)
+    lig_codes, con_codes = _encode_ids([conf_id])
+    metal_positions = _calc_global_metal_positions(
+        lig_codes, con_codes, thetas, delta_)[:, 0]
+    frags_of_ligs = _calc_global_c_positions(
+        lig_codes, con_codes, thetas, delta_)[:, 0]
+
+    fig = Figure(figsize=(6, 6), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(projection='3d')
+
+    # Create the artists with the geometry of the first frame.
+    metal_line, = ax.plot(
+        *metal_positions[0].T, c='orange', marker='o', linestyle='')
+    metal_labels = [
+        ax.text(*metal_pos, f"{i+1}", color='orange')
+        for i, metal_pos in enumerate(metal_positions[0])]
+    lig_collections = []
+    for lig, lig_color in zip(frags_of_ligs[0], cycle(_LIG_COLORS)):
+        lig_collections.append(Line3DCollection(lig, colors=lig_color))
+        ax.add_collection3d(lig_collections[-1])
+
+    # The display limits are fixed to contain all the frames.
+    points = np.concatenate([
+        metal_positions.reshape(-1, 3), frags_of_ligs.reshape(-1, 3)])
+    ax.set_xlim(points[:, 0].min(), points[:, 0].max())
+    ax.set_ylim(points[:, 1].min(), points[:, 1].max())
+    ax.set_zlim(points[:, 2].min(), points[:, 2].max())
+
+    # View settings
+    ax.set_box_aspect([1, 1, 1])
+    ax.set_xlabel('X')
+    ax.set_ylabel('Y')
+    ax.set_zlabel('Z')
+    _limit_axis(ax, 3)
+    ax.view_init(20, -160, 0)  # (elevation, azimuth, rotate by z-axis)
+
+    # The panes, grids and ticks do not change over the frames. They are
+    # rendered once and put behind the other artists as an image, so that
+    # only the chain is drawn for each frame.
+    dynamic_artists = [metal_line, *metal_labels, *lig_collections]
+    for artist in dynamic_artists:
+        artist.set_visible(False)
+    fig.canvas.draw()
+    background = np.array(fig.canvas.buffer_rgba())
+    ax.set_axis_off()
+    fig.figimage(background, zorder=-1, origin="upper")
+    for artist in dynamic_artists:
+        artist.set_visible(True)
+    title = ax.set_title("")
+
+    # The writer is driven directly instead of through FuncAnimation,
+    # which would draw the figure twice per frame.
+    with writer.saving(fig, out_path, dpi):
+        for frame in range(len(thetas)):
+            metal_line.set_data_3d(*metal_positions[frame].T)
+            for label, metal_pos in zip(
+                    metal_labels, metal_positions[frame]):
+                label.set_position_3d(metal_pos)
+            for lig_collection, lig in zip(
+                    lig_collections, frags_of_ligs[frame]):
+                lig_collection.set_segments(lig)
+            title.set_text(
+                f"{conf_id}, theta={thetas[frame]:g}, delta={delta_:g}")
+            writer.grab_frame()
+
+    return out_path
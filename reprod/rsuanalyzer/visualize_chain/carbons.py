@@ -1,14 +1,15 @@
+from typing import Iterable
+
 import numpy as np
 
-from ..core._conf_id import _id_to_con_types, _id_to_lig_types
-from ..core._global_vecs_rots import _calc_global_lig_ends_in_chain
-from ..core._local_vecs_rots import _rot_ca
-from ._ligand import _calc_c_positions_of_frags_in_lig
+from ..core._transforms import (_compose_lig_ends, _con_mats, _encode_ids,
+                                _lig_mats)
+from ._ligand import _calc_c_positions_of_frags_in_ligs
 
 
 def calc_carbon_positions(
         conf_id: str, theta: float, delta_: float = 87
-        ) -> list[list[list[np.ndarray]]]:
+        ) -> np.ndarray:
     """Calculate the positions of the carbon atoms in the ligands of a chain.
 
     This function is intended to be used for visualizing chains with
@@ -32,12 +33,14 @@ def calc_carbon_positions(
         delta_ (float, optional): The N-Pd-N angle in degrees. Default is 87.
 
     Returns:
-        list[list[list[np.ndarray]]]: 
-            A list of lists of lists of numpy arrays.
-            Each list corresponds to a ligand in the chain. Each inner list 
-            corresponds to a fragment of the ligand molecule. The numpy arrays 
-            in the innermost lists represent the positions of the carbon atoms 
-            in the global coordinate system.
+        np.ndarray: 
+            The positions of the carbon atoms in the global coordinate
+            system. Shape: (n_ligs, n_frags, n_pts, 3) = (n_ligs, 5, 7, 3).
+            The first axis corresponds to the ligands in the chain, and 
+            the second axis corresponds to the fragments of the ligand 
+            molecule: the three hexagons and the two edges between them.
+            The edges have only two points and are padded to seven points
+            by repeating the last point.
 
     Example:
         >>> import matplotlib.pyplot as plt
@@ -56,42 +59,99 @@ def calc_carbon_positions(
         >>> ax.set_box_aspect([1, 1, 1])
         >>> plt.show()
     """
-    lig_types = _id_to_lig_types(conf_id)  # "RRFFLL" -> ["RR", "LL"]
-    con_types = _id_to_con_types(conf_id)  # "RRFFLL" -> ["FF"]
-
-    # global_lig_ends: [(x1, rot1), (x2, rot2), ...]
-    #   x (np.ndarray): position of the end of the ligand in the 
-    #       global coordinate system.
-    #   rot (np.ndarray): rotation matrix from the global coordinate 
-    #       system to the local coordinate system C.
-    global_lig_ends = _calc_global_lig_ends_in_chain(conf_id, theta, delta_)
-
-    # local_c_positions_of_ligs: [[[np.ndarray, ...], ...], ...]
-    #   (list)  > (list) > (list)    > (np.ndarray)
-    #   ligands > ligand > fragments > carbon atom positions
-    # 
-    # Initialize with the carbon positions of the first ligand, since
-    # the local coordinate system A of the first ligand is the same as
-    # the global coordinate system.
-    global_c_positions_of_ligs = [
-        _calc_c_positions_of_frags_in_lig(lig_types[0], theta)]
-
-    # Convert the carbon positions of from the local coordinate system 
-    # to the global coordinate system.
-    for lig_type, con_type, prev_lig_end in zip(
-            lig_types[1:], con_types, global_lig_ends[:-1]):
-        x_of_prev_lig_end, rot_of_prev_lig_end = prev_lig_end
-        rot_ca_ = _rot_ca(con_type, delta_)
-        local_carbon_positions = _calc_c_positions_of_frags_in_lig(
-            lig_type, theta)
-
-        # Convert the local carbon positions to the global coordinate 
-        # system.
-        global_carbon_positions = [
-            x_of_prev_lig_end
-                + (rot_of_prev_lig_end * rot_ca_).apply(carbon_position)
-            for carbon_position in local_carbon_positions]
-
-        global_c_positions_of_ligs.append(global_carbon_positions)
-
-    return global_c_positions_of_ligs
+    return calc_carbon_positions_batch([conf_id], theta, delta_)[0]
+
+
+def calc_carbon_positions_batch(
+        ring_ids: Iterable[str], theta: float, delta_: float = 87
+        ) -> np.ndarray:
+    """Calculate the positions of the carbon atoms in many rings at once.
+
+    This is the batch version of :func:`calc_carbon_positions
+    <rsuanalyzer.visualize_chain.carbons.calc_carbon_positions>`. The
+    rings are opened into chains by ignoring the last connection, as in
+    :func:`visualize_chain 
+    <rsuanalyzer.visualize_chain.visualize_chain.visualize_chain>`,
+    and all of them are computed in one vectorized pass.
+
+    Caution:
+        This function is intended to provide an approximate visualization 
+        of the ligand structure. It may not accurately represent the 
+        precise positions of the atoms.
+
+    Args:
+        ring_ids (Iterable[str]): 
+            The conformation IDs of the rings, e.g. 
+            ``["RLFFRLFFRLFF", "RRFFLLBBRRFF"]``. All of them should have
+            the same number of units. Chain IDs (e.g. "RLFFRLFFRL") are
+            also acceptable.
+        theta (float): 
+            The tilt angle of the C-C bonds in degrees.
+        delta_ (float, optional): 
+            The N-Pd-N angle in degrees. Default is 87.
+
+    Returns:
+        np.ndarray: 
+            The positions of the carbon atoms in the global coordinate
+            system. Shape: (n_rings, n_units, 5, 7, 3). The last three
+            axes are the same as the result of :func:`calc_carbon_positions
+            <rsuanalyzer.visualize_chain.carbons.calc_carbon_positions>`.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ring_ids = sorted(ra.enum_ring_ids(3))
+        >>> ra.calc_carbon_positions_batch(ring_ids, 34).shape
+        (376, 3, 5, 7, 3)
+    """
+    lig_codes, con_codes = _encode_ids(ring_ids)
+    return _calc_global_c_positions(lig_codes, con_codes, theta, delta_)
+
+
+def _calc_global_c_positions(
+        lig_codes: np.ndarray, con_codes: np.ndarray,
+        thetas: float | np.ndarray, delta_: float
+        ) -> np.ndarray:
+    """Calculate the positions of the carbon atoms of encoded chains.
+
+    Args:
+        lig_codes (np.ndarray): 
+            Codes of the ligand types. Shape: (n_chains, n_ligs).
+        con_codes (np.ndarray): 
+            Codes of the connection types. Shape: (n_chains, n_cons).
+        thetas (float | np.ndarray): 
+            The tilt angles of the C-C bonds in degrees.
+        delta_ (float): 
+            The N-Pd-N angle in degrees.
+
+    Returns:
+        np.ndarray: 
+            The positions of the carbon atoms in the global coordinate
+            system. Shape: np.shape(thetas) + (n_chains, n_ligs, 5, 7, 3).
+    """
+    n_ligs = lig_codes.shape[1]
+
+    # local_c_positions: (..., n_chains, n_ligs, 5, 7, 3)
+    #   carbon positions of each ligand in its local coordinate system A.
+    local_c_positions = np.take(
+        _calc_c_positions_of_frags_in_ligs(thetas), lig_codes, axis=-4)
+
+    # Transforms from the global coordinate system to the local 
+    # coordinate systems A of the ligands. The local coordinate system A
+    # of the first ligand is the same as the global coordinate system,
+    # and that of each following ligand is reached from the end of the
+    # previous ligand by the connection on the metal.
+    con_mats = _con_mats(delta_)[con_codes]
+    lig_ends = _compose_lig_ends(
+        np.take(_lig_mats(thetas), lig_codes, axis=-3), con_mats)
+    frames = np.broadcast_to(np.eye(4), lig_ends.shape).copy()
+    frames[..., 1:, :, :] = \
+        lig_ends[..., :-1, :, :] @ con_mats[..., :n_ligs - 1, :, :]
+
+    # Convert the carbon positions from the local coordinate systems
+    # to the global coordinate system with one matrix multiplication
+    # per ligand.
+    global_c_positions = \
+        local_c_positions.reshape(local_c_positions.shape[:-3] + (-1, 3)) \
+        @ frames[..., :3, :3].swapaxes(-1, -2) + frames[..., np.newaxis, :3, 3]
+
+    return global_c_positions.reshape(local_c_positions.shape)
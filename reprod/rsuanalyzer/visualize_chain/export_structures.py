@@ -0,0 +1,212 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Literal
+
+import numpy as np
+
+from .carbons import calc_carbon_positions_batch
+from .metals import calc_metal_positions_batch
+
+# Indices of the vertices of the hexagons that are nitrogen atoms:
+# the vertices of the two pyridine rings nearest to the metal atoms.
+# The indices are in the 18 vertices of the three hexagons of a ligand.
+_N_VTX_IDXS = (3, 12)
+
+
+def export_structures(
+        items: Iterable[tuple[str, float, float]], out_path: str,
+        fmt: Literal["xyz", "extxyz", "pdb"] = "xyz",
+        chunk_size: int = 1024, workers: int = 1
+        ) -> int:
+    """Export approximate structures of rings to a multi-frame file.
+
+    One frame is written for each (ring ID, theta, delta\_) tuple. The
+    tuples are consumed lazily in chunks of ``chunk_size``, so the
+    memory usage does not depend on the number of tuples, and generators
+    such as ``itertools.product(ring_ids, thetas, deltas)`` can be
+    passed directly. The frames are written in the order of the input.
+
+    Each frame contains the atoms of the ligands, which are the vertices
+    of the three hexagons (the nitrogen atoms of the pyridine rings are
+    marked as "N" and the others as "C"), followed by the metal atoms
+    ("Pd") of the chain obtained by opening the ring. The last metal atom
+    coincides with the first one only if the ring has no strain. The
+    coordinates are in the unit of the ligand arm length.
+
+    Caution:
+        This function is intended to provide approximate structures.
+        It may not accurately represent the precise positions of the
+        atoms.
+
+    Args:
+        items (Iterable[tuple[str, float, float]]):
+            The (ring ID, theta, delta\_) tuples, e.g.
+            ``[("RLFFRLFFRLFF", 34, 87), ("RRFFLLBBRRFFLLBB", 38, 87)]``.
+            Chain IDs are also acceptable as ring IDs.
+        out_path (str):
+            The path of the output file.
+        fmt (Literal["xyz", "extxyz", "pdb"], optional):
+            The file format. ``"xyz"`` for the XYZ format, ``"extxyz"``
+            for the extended XYZ format, and ``"pdb"`` for the PDB format
+            with one MODEL record per frame. Default is ``"xyz"``.
+        chunk_size (int, optional):
+            The number of tuples processed at once. Default is 1024.
+        workers (int, optional):
+            The number of worker processes. Default is 1, which means
+            that the chunks are processed in the current process.
+
+    Returns:
+        int: The number of written frames.
+
+    Example:
+        >>> from itertools import product
+        >>> import rsuanalyzer as ra
+        >>> tetrameric_rings = sorted(ra.enum_ring_ids(4))
+        >>> ra.export_structures(
+        ...     product(tetrameric_rings, range(0, 91, 10), [87]),
+        ...     "tetrameric_rings.xyz", workers=4)
+        42600
+    """
+    if fmt not in ("xyz", "extxyz", "pdb"):
+        raise ValueError(f"Invalid fmt: {fmt}")
+    if chunk_size < 1:
+        raise ValueError(f"Invalid chunk_size: {chunk_size}")
+
+    items = iter(items)
+    chunks = iter(lambda: list(islice(items, chunk_size)), [])
+
+    n_frames = 0
+    with open(out_path, "w") as f:
+        if workers == 1:
+            for chunk in chunks:
+                f.write(_format_chunk(chunk, fmt, n_frames))
+                n_frames += len(chunk)
+        else:
+            # Keep a bounded number of chunks in flight and write them
+            # in order as they are done.
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(
+                        _format_chunk, chunk, fmt, n_frames))
+                    n_frames += len(chunk)
+                    if len(pending) >= 2 * workers:
+                        f.write(pending.popleft().result())
+                while pending:
+                    f.write(pending.popleft().result())
+
+        if fmt == "pdb":
+            f.write("END\n")
+
+    return n_frames
+
+
+def _calc_atom_positions(
+        ring_ids: list[str], theta: float, delta_: float) -> np.ndarray:
+    """Calculate the positions of the atoms written by the exporter.
+
+    Args:
+        ring_ids (list[str]):
+            Conformation IDs of rings with the same number of units.
+        theta (float): The tilt angle of the C-C bonds in degrees.
+        delta_ (float): The N-Pd-N angle in degrees.
+
+    Returns:
+        np.ndarray:
+            The positions of the atoms. Shape: (n_rings, n_atoms, 3),
+            where n_atoms = 18 * n_units + n_units + 1.
+    """
+    # The hexagons are closed by repeating the first vertex, which is
+    # not an atom.
+    hex_vtxs = calc_carbon_positions_batch(
+        ring_ids, theta, delta_)[:, :, :3, :6]
+    metals = calc_metal_positions_batch(ring_ids, theta, delta_)
+    return np.concatenate(
+        [hex_vtxs.reshape(len(ring_ids), -1, 3), metals], axis=1)
+
+
+def _elements(n_units: int) -> list[str]:
+    """Return the element symbols of the atoms of a frame."""
+    lig_elements = [
+        "N" if i in _N_VTX_IDXS else "C" for i in range(18)]
+    return lig_elements * n_units + ["Pd"] * (n_units + 1)
+
+
+def _format_chunk(
+        chunk: list[tuple[str, float, float]], fmt: str, first_frame: int
+        ) -> str:
+    """Format the frames of the chunk of (ring ID, theta, delta\_) tuples.
+
+    Args:
+        chunk (list[tuple[str, float, float]]):
+            The (ring ID, theta, delta\_) tuples.
+        fmt (str): The file format, "xyz", "extxyz" or "pdb".
+        first_frame (int): The index of the first frame of the chunk.
+
+    Returns:
+        str: The formatted frames.
+    """
+    # Tuples sharing the number of units, theta and delta_ are computed
+    # together in a vectorized way.
+    groups: dict[tuple[int, float, float], list[int]] = {}
+    for i, (ring_id, theta, delta_) in enumerate(chunk):
+        groups.setdefault(
+            ((len(ring_id) + 2) // 4, theta, delta_), []).append(i)
+
+    positions = [None] * len(chunk)
+    for (_, theta, delta_), idxs in groups.items():
+        ring_ids = [chunk[i][0] for i in idxs]
+        for i, positions_of_ring in zip(
+                idxs, _calc_atom_positions(ring_ids, theta, delta_)):
+            positions[i] = positions_of_ring
+
+    formatter = _format_pdb_frame if fmt == "pdb" else _format_xyz_frame
+    return "".join(
+        formatter(item, positions_of_ring, first_frame + i, fmt)
+        for i, (item, positions_of_ring) in enumerate(zip(chunk, positions)))
+
+
+def _format_xyz_frame(
+        item: tuple[str, float, float], positions: np.ndarray,
+        frame: int, fmt: str) -> str:
+    """Format a frame in the XYZ or the extended XYZ format."""
+    ring_id, theta, delta_ = item
+    elements = _elements((len(ring_id) + 2) // 4)
+    if fmt == "extxyz":
+        comment = (
+            f'Properties=species:S:1:pos:R:3 ring_id={ring_id} '
+            f'theta={theta} delta={delta_} frame={frame}')
+    else:
+        comment = f"ring_id={ring_id} theta={theta} delta={delta_}"
+
+    atom_lines = ("%s %.6f %.6f %.6f\n" * len(elements)) % tuple(
+        value for element, position in zip(elements, positions.tolist())
+        for value in (element, *position))
+    return f"{len(elements)}\n{comment}\n{atom_lines}"
+
+
+def _format_pdb_frame(
+        item: tuple[str, float, float], positions: np.ndarray,
+        frame: int, fmt: str) -> str:
+    """Format a frame as a MODEL record of the PDB format."""
+    ring_id, theta, delta_ = item
+    n_units = (len(ring_id) + 2) // 4
+    elements = _elements(n_units)
+
+    lines = [
+        f"MODEL     {frame + 1:4d}\n",
+        f"REMARK   1 RING_ID {ring_id} THETA {theta} DELTA {delta_}\n"]
+    for serial, (element, (x, y, z)) in enumerate(
+            zip(elements, positions.tolist()), start=1):
+        if element == "Pd":
+            atom_name, res_name = "PD  ", " PD"
+            res_seq = serial - 18 * n_units
+        else:
+            atom_name, res_name = f" {element:<3s}", "LIG"
+            res_seq = (serial - 1) // 18 + 1
+        lines.append(
+            f"HETATM{serial:5d} {atom_name} {res_name} A{res_seq:4d}    "
+            f"{x:8.3f}{y:8.3f}{z:8.3f}  1.00  0.00          {element.upper():>2s}\n")
+    lines.append("ENDMDL\n")
+    return "".join(lines)
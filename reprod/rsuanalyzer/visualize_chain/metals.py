@@ -1,11 +1,14 @@
+from typing import Iterable
+
 import numpy as np
 
-from ..core._global_vecs_rots import _calc_global_lig_ends_in_chain
+from ..core._transforms import (_compose_lig_ends, _con_mats, _encode_ids,
+                                _lig_mats)
 
 
 def calc_metal_positions(
         conf_id: str, theta: float, delta_: float = 87
-        ) -> list[np.ndarray]:
+        ) -> np.ndarray:
     """Calculate the positions of the metal atoms in a chain.
 
     Caution:
@@ -28,9 +31,9 @@ def calc_metal_positions(
             The N-Pd-N angle in degrees. Default is 87.
 
     Returns:
-        list[np.ndarray]: 
-            A list of numpy arrays representing the
-            positions of the metal atoms in the global coordinate system.
+        np.ndarray: 
+            The positions of the metal atoms in the global coordinate
+            system. Shape: (n_ligs + 1, 3).
 
     Example:
         >>> import matplotlib.pyplot as plt
@@ -47,17 +50,81 @@ def calc_metal_positions(
         >>> ax.set_box_aspect([1, 1, 1])
         >>> plt.show()
     """
+    return calc_metal_positions_batch([conf_id], theta, delta_)[0]
+
+
+def calc_metal_positions_batch(
+        ring_ids: Iterable[str], theta: float, delta_: float = 87
+        ) -> np.ndarray:
+    """Calculate the positions of the metal atoms in many rings at once.
+
+    This is the batch version of :func:`calc_metal_positions
+    <rsuanalyzer.visualize_chain.metals.calc_metal_positions>`. The
+    rings are opened into chains by ignoring the last connection, as in
+    :func:`visualize_chain 
+    <rsuanalyzer.visualize_chain.visualize_chain.visualize_chain>`,
+    and all of them are computed in one vectorized pass.
+
+    Args:
+        ring_ids (Iterable[str]): 
+            The conformation IDs of the rings, e.g. 
+            ``["RLFFRLFFRLFF", "RRFFLLBBRRFF"]``. All of them should have
+            the same number of units. Chain IDs (e.g. "RLFFRLFFRL") are
+            also acceptable.
+        theta (float): 
+            The tilt angle of the C-C bonds in degrees.
+        delta_ (float, optional): 
+            The N-Pd-N angle in degrees. Default is 87.
+
+    Returns:
+        np.ndarray: 
+            The positions of the metal atoms in the global coordinate
+            system. Shape: (n_rings, n_units + 1, 3). For a closed ring,
+            the first and the last positions coincide.
+
+    Example:
+        >>> import numpy as np
+        >>> import rsuanalyzer as ra
+        >>> ring_ids = sorted(ra.enum_ring_ids(3))
+        >>> metal_positions = ra.calc_metal_positions_batch(ring_ids, 34)
+        >>> metal_positions.shape
+        (376, 4, 3)
+        >>> # Distances between the first and the last metal atoms.
+        >>> gaps = np.linalg.norm(
+        ...     metal_positions[:, -1] - metal_positions[:, 0], axis=1)
+    """
+    lig_codes, con_codes = _encode_ids(ring_ids)
+    return _calc_global_metal_positions(lig_codes, con_codes, theta, delta_)
+
+
+def _calc_global_metal_positions(
+        lig_codes: np.ndarray, con_codes: np.ndarray,
+        thetas: float | np.ndarray, delta_: float
+        ) -> np.ndarray:
+    """Calculate the positions of the metal atoms of encoded chains.
+
+    Args:
+        lig_codes (np.ndarray): 
+            Codes of the ligand types. Shape: (n_chains, n_ligs).
+        con_codes (np.ndarray): 
+            Codes of the connection types. Shape: (n_chains, n_cons).
+        thetas (float | np.ndarray): 
+            The tilt angles of the C-C bonds in degrees.
+        delta_ (float): 
+            The N-Pd-N angle in degrees.
+
+    Returns:
+        np.ndarray: 
+            The positions of the metal atoms in the global coordinate
+            system. Shape: np.shape(thetas) + (n_chains, n_ligs + 1, 3).
+    """
+    lig_ends = _compose_lig_ends(
+        np.take(_lig_mats(thetas), lig_codes, axis=-3),
+        _con_mats(delta_)[con_codes])
+
     # The first metal atom is at the origin of the global coordinate system.
-    metal_positions = [np.array([0, 0, 0])]
-
-    # global_lig_ends: [(x1, rot1), (x2, rot2), ...]
-    #   x (np.ndarray): position of the end of the ligand in the 
-    #       global coordinate system.
-    #   rot (np.ndarray): rotation matrix from the global coordinate 
-    #       system to the local coordinate system C.
-    global_lig_ends = _calc_global_lig_ends_in_chain(
-        conf_id, theta, delta_)
-    for global_lig_end in global_lig_ends:
-        global_x, _ = global_lig_end
-        metal_positions.append(global_x)
+    metal_positions = np.zeros(
+        lig_ends.shape[:-3] + (lig_codes.shape[1] + 1, 3))
+    metal_positions[..., 1:, :] = lig_ends[..., :3, 3]
+
     return metal_positions
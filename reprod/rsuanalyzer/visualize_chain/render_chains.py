@@ -0,0 +1,132 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Real
+from typing import Iterable, Literal
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.axes3d import Axes3D
+
+from .visualize_chain import _draw_chain
+
+# Figure and axes reused by all the jobs in a worker process.
+_worker_fig_ax: tuple[Figure, Axes3D] | None = None
+
+
+def render_chains(
+        conf_ids: Iterable[str], thetas: Iterable[float] | float,
+        out_dir: str, workers: int | None = None, delta_: float = 87,
+        fmt: Literal["png", "svg"] = "png",
+        names: Iterable[str] | None = None
+        ) -> list[str]:
+    """Render the structures of many chains to image files.
+
+    This is the headless, batch version of :func:`visualize_chain
+    <rsuanalyzer.visualize_chain.visualize_chain.visualize_chain>`.
+    The images are drawn with the Agg backend, so no display is
+    needed, and the jobs are distributed over worker processes, each of
+    which reuses a single figure for all of its jobs.
+
+    Caution:
+        This function is intended to provide an approximate visualization
+        of the chain structure. It may not accurately represent the precise
+        positions of the atoms.
+
+    Args:
+        conf_ids (Iterable[str]):
+            The conformation IDs of the chains, e.g. ``["RLFFRLFFRL"]``.
+            Ring IDs (e.g. "RLFFRLFFRLFF") are also acceptable,
+            but the last two characters will be ignored.
+        thetas (Iterable[float] | float):
+            The tilt angles of the C-C bonds in degrees, one for each
+            conformation ID. A single value is used for all of them.
+        out_dir (str):
+            The directory to write the images to. It is created if it
+            does not exist.
+        workers (int, optional):
+            The number of worker processes. Default is None, which
+            means the number of CPUs. If 1, the images are rendered in
+            the current process.
+        delta_ (float, optional):
+            The N-Pd-N angle in degrees. Default is 87.
+        fmt (Literal["png", "svg"], optional):
+            The format of the images. Default is ``"png"``.
+        names (Iterable[str], optional):
+            The names used in the file names instead of the conformation
+            IDs, e.g. ``["syn-T-1"]``. Default is None.
+
+    Returns:
+        list[str]:
+            The paths of the written images, in the order of the input.
+            The file names are ``visualized_{name}_theta{theta}.{fmt}``.
+
+    Example:
+        >>> import rsuanalyzer as ra
+        >>> ra.render_chains(
+        ...     ["RLFFRLFFRLFF", "RRFBRLBBRRFBRLBB"], [34, 30], "results",
+        ...     names=["syn-T-1", "syn-S-2"])
+        ['results/visualized_syn-T-1_theta34.png',
+         'results/visualized_syn-S-2_theta30.png']
+    """
+    if fmt not in ("png", "svg"):
+        raise ValueError(f"Invalid fmt: {fmt}")
+
+    conf_ids = list(conf_ids)
+    if isinstance(thetas, Real):
+        thetas = [thetas] * len(conf_ids)
+    thetas = list(thetas)
+    names = conf_ids if names is None else list(names)
+    if not len(conf_ids) == len(thetas) == len(names):
+        raise ValueError(
+            "The number of conformation IDs, thetas and names should "
+            "be the same.")
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [
+        (conf_id, theta, delta_, os.path.join(
+            out_dir, f"visualized_{name}_theta{theta:g}.{fmt}"))
+        for conf_id, theta, name in zip(conf_ids, thetas, names)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1 or len(jobs) <= 1:
+        _init_worker()
+        return [_render_one(job) for job in jobs]
+
+    # Several jobs are sent to a worker at once to reduce the
+    # inter-process communication.
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(_render_one, jobs, chunksize=chunksize))
+
+
+def _init_worker() -> None:
+    """Create the figure reused by all the jobs in the process."""
+    global _worker_fig_ax
+    if _worker_fig_ax is None:
+        fig = Figure(figsize=(6, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot(projection='3d')
+        _worker_fig_ax = fig, ax
+
+
+def _render_one(job: tuple[str, float, float, str]) -> str:
+    """Render a chain to an image file with the figure of the process.
+
+    Args:
+        job (tuple[str, float, float, str]):
+            The conformation ID, theta, delta\_ and the output path.
+
+    Returns:
+        str: The output path.
+    """
+    conf_id, theta, delta_, out_path = job
+    fig, ax = _worker_fig_ax
+
+    ax.cla()
+    _draw_chain(ax, conf_id, theta, delta_)
+    fig.savefig(out_path)
+
+    return out_path
@@ -1,11 +1,17 @@
+from itertools import cycle
+
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.figure import Figure
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 from mpl_toolkits.mplot3d.axes3d import Axes3D
 
-from ._utils import _limit_axis, _transpose_to_xyz
+from ._utils import _limit_axis
 from .carbons import calc_carbon_positions
 from .metals import calc_metal_positions
 
+_LIG_COLORS = ['#1f77b4', '#2ca02c', '#ff7f0e', '#9467bd', '#17becf']
+
 
 def visualize_chain(
         conf_id: str, theta: float, delta_: float = 87,
@@ -56,23 +62,53 @@ def visualize_chain(
             >>> ax.set_title("syn-T-1, theta=34, delta=87")
             >>> plt.show()
     """
-    metal_positions = calc_metal_positions(conf_id, theta, delta_)
-    frags_of_ligs = calc_carbon_positions(conf_id, theta, delta_)
-
     # Make a 3D plot
     fig, ax = plt.subplots(
         figsize=(6, 6), subplot_kw={'projection': '3d'})
 
+    _draw_chain(ax, conf_id, theta, delta_)
+
+    if show:
+        # Show the plot
+        plt.show()
+
+    return fig, ax
+
+
+def _draw_chain(
+        ax: Axes3D, conf_id: str, theta: float, delta_: float
+        ) -> None:
+    """Draw the structure of a chain on the given 3D axes.
+
+    All fragments of a ligand are drawn as a single
+    ``Line3DCollection``, so the number of artists grows with the
+    number of ligands, not with the number of fragments.
+
+    Args:
+        ax (Axes3D): The 3D axes object to draw on.
+        conf_id (str): The conformation ID of the chain, e.g. "RLFFRLFFRL".
+        theta (float): The tilt angle of the C-C bonds in degrees.
+        delta_ (float): The N-Pd-N angle in degrees.
+    """
+    metal_positions = calc_metal_positions(conf_id, theta, delta_)
+    frags_of_ligs = calc_carbon_positions(conf_id, theta, delta_)
+
     # Scatter the metal positions and label them
+    ax.scatter(*metal_positions.T, c='orange', marker='o')
     for i, metal_pos in enumerate(metal_positions):
-        ax.scatter(*metal_pos, c='orange', marker='o')
         ax.text(*metal_pos, f"{i+1}", color='orange')
 
     # Plot the ligands
-    lig_colors = ['#1f77b4', '#2ca02c', '#ff7f0e', '#9467bd', '#17becf'] * 10
-    for lig, lig_colors in zip(frags_of_ligs, lig_colors):
-        for frag in lig:
-            ax.plot(*_transpose_to_xyz(frag), c=lig_colors)
+    for lig, lig_color in zip(frags_of_ligs, cycle(_LIG_COLORS)):
+        ax.add_collection3d(Line3DCollection(lig, colors=lig_color))
+
+    # Collections are not taken into account by autoscaling, so the
+    # display limits are set from the drawn points.
+    points = np.concatenate(
+        [metal_positions, frags_of_ligs.reshape(-1, 3)])
+    ax.set_xlim(points[:, 0].min(), points[:, 0].max())
+    ax.set_ylim(points[:, 1].min(), points[:, 1].max())
+    ax.set_zlim(points[:, 2].min(), points[:, 2].max())
 
     # View settings
     ax.set_box_aspect([1, 1, 1])
@@ -81,9 +117,3 @@ def visualize_chain(
     ax.set_zlabel('Z')
     _limit_axis(ax, 3)
     ax.view_init(20, -160, 0)  # (elevation, azimuth, rotate by z-axis)
-
-    if show:
-        # Show the plot
-        plt.show()
-
-    return fig, ax
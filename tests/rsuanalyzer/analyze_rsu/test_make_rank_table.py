@@ -1,3 +1,7 @@
+import os
+import subprocess
+import sys
+
 import pytest
 
 from reprod.rsuanalyzer.analyze_rsu.small_rsu_ranking import \
@@ -25,3 +29,82 @@ def test_create_small_rsu_ranking(mocker, top_num, mock_rsus, expected_ids, expe
     rank_table = create_small_rsu_ranking(ring_ids, theta, delta_, top_num)
     assert rank_table["Ring ID"].to_list() == expected_ids
     assert rank_table["RSU"].to_list() == expected_rsus
+
+
+def test_create_small_rsu_ranking_resumes_from_checkpoint(mocker, tmp_path):
+    import reprod.rsuanalyzer.analyze_rsu.small_rsu_ranking as module
+    from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+    from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+    ring_ids = sorted(enum_ring_ids(2))
+    path = str(tmp_path / "checkpoint.json")
+    expected = create_small_rsu_ranking(ring_ids, 30, 87, 5)
+
+    def interrupted(ring_id, *args):
+        if ring_id == ring_ids[10]:
+            raise KeyboardInterrupt
+        return calc_rsu(ring_id, *args)
+
+    mocker.patch.object(module, "calc_rsu", side_effect=interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        create_small_rsu_ranking(
+            ring_ids, 30, 87, 5, checkpoint_path=path,
+            checkpoint_interval=0)
+
+    spy = mocker.patch.object(module, "calc_rsu", side_effect=calc_rsu)
+    rank_table = create_small_rsu_ranking(
+        ring_ids, 30, 87, 5, checkpoint_path=path, checkpoint_interval=0)
+    assert spy.call_count == len(ring_ids) - 10
+    assert rank_table.equals(expected)
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+_RESUME_SCRIPT = """
+import json
+import sys
+
+import reprod.rsuanalyzer.analyze_rsu.small_rsu_ranking as module
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+path, stop = sys.argv[1], int(sys.argv[2])
+ring_ids = enum_ring_ids(2)
+expected = module.create_small_rsu_ranking(ring_ids, 30, 87, 5)
+calls = []
+
+def counted(*args):
+    if len(calls) == stop:
+        raise KeyboardInterrupt
+    calls.append(args)
+    return calc_rsu(*args)
+
+module.calc_rsu = counted
+try:
+    rank_table = module.create_small_rsu_ranking(
+        ring_ids, 30, 87, 5, checkpoint_path=path, checkpoint_interval=0)
+except KeyboardInterrupt:
+    sys.exit(1)
+print(len(calls))
+print(rank_table.equals(expected))
+"""
+
+
+def test_create_small_rsu_ranking_resumes_in_another_process(tmp_path):
+    from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+    n_rings = len(enum_ring_ids(2))
+    path = str(tmp_path / "checkpoint.json")
+    root = os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__)))))
+
+    def run(hash_seed, stop):
+        # The order of the set of the IDs depends on the hash seed.
+        return subprocess.run(
+            [sys.executable, "-c", _RESUME_SCRIPT, path, str(stop)],
+            cwd=root, env={**os.environ, "PYTHONHASHSEED": str(hash_seed)},
+            capture_output=True, text=True)
+
+    assert run(1, 10).returncode == 1
+    assert os.path.exists(path)
+    result = run(2, n_rings)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == [str(n_rings - 10), "True"]
+    assert not os.path.exists(path)
@@ -1,7 +1,11 @@
+import numpy as np
 import pytest
 
 from reprod.rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta import (
-    _calc_min_rsu_for_specific_theta, create_min_rsu_vs_theta_df)
+    _calc_min_rsu_for_specific_theta, create_min_rsu_vs_theta_df,
+    create_min_rsu_vs_theta_multi_n)
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
 
 
 @pytest.mark.parametrize(
@@ -47,3 +51,83 @@ def test_create_min_rsu_vs_theta_df(
     assert min_rsu_table["theta"].to_list() == thetas
     assert min_rsu_table["Ring ID"].to_list() == expected_ids
     assert min_rsu_table["RSU"].to_list() == expected_rsus
+
+
+def _interrupt_after(num_of_calls, func):
+    calls = []
+
+    def wrapper(*args):
+        if len(calls) == num_of_calls:
+            raise KeyboardInterrupt
+        calls.append(args)
+        return func(*args)
+    return wrapper
+
+
+def test_create_min_rsu_vs_theta_df_resumes_from_checkpoint(
+        mocker, tmp_path):
+    import reprod.rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta as module
+    from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+    ring_ids = ["RRFFRRFF", "RLFFRLFF", "RRFBRRFB", "RRFFLLBB"]
+    thetas = [0, 30, 60]
+    path = str(tmp_path / "checkpoint.json")
+    expected = create_min_rsu_vs_theta_df(ring_ids, thetas, 87)
+
+    mocker.patch.object(
+        module, "calc_rsu", side_effect=_interrupt_after(6, calc_rsu))
+    with pytest.raises(KeyboardInterrupt):
+        create_min_rsu_vs_theta_df(
+            ring_ids, thetas, 87, checkpoint_path=path,
+            checkpoint_interval=0)
+
+    spy = mocker.patch.object(module, "calc_rsu", side_effect=calc_rsu)
+    df = create_min_rsu_vs_theta_df(
+        ring_ids, thetas, 87, checkpoint_path=path, checkpoint_interval=0)
+    assert spy.call_count == 6
+    assert df.equals(expected)
+    assert not (tmp_path / "checkpoint.json").exists()
+
+
+def test_create_min_rsu_vs_theta_df_rejects_other_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    (tmp_path / "checkpoint.json").write_text(
+        '{"job_hash": "other", "state": {"min_rsus": [], "rsus": []}}')
+    with pytest.raises(ValueError):
+        create_min_rsu_vs_theta_df(
+            ["RRFFRRFF"], [0], 87, checkpoint_path=path)
+
+
+@pytest.mark.parametrize("delta_", [87, 120])
+def test_create_min_rsu_vs_theta_multi_n(delta_):
+    thetas = [0, 15, 34, 60, 90]
+    df = create_min_rsu_vs_theta_multi_n([3, 1, 2], thetas, delta_)
+    assert df.columns.to_list() == ["n", "theta", "Ring ID", "RSU"]
+    assert df["n"].to_list() == [1] * 5 + [2] * 5 + [3] * 5
+    assert df["theta"].to_list() == thetas * 3
+
+    for n in (1, 2, 3):
+        ring_ids = sorted(enum_ring_ids(n))
+        rsus = calc_rsu_batch(ring_ids, thetas, delta_)
+        rows = df[df["n"] == n]
+        assert np.allclose(rows["RSU"], rsus.min(axis=1), rtol=0, atol=1e-14)
+        # The largest ID of the rings with the minimum RSU.
+        assert rows["Ring ID"].to_list() == [
+            ring_ids[np.flatnonzero(rsus_i <= rsus_i.min() + 1e-14)[-1]]
+            for rsus_i in rsus]
+
+
+def test_create_min_rsu_vs_theta_multi_n_matches_single_n():
+    thetas = range(0, 91, 3)
+    df = create_min_rsu_vs_theta_multi_n([2], thetas)
+    expected = create_min_rsu_vs_theta_df(enum_ring_ids(2), thetas)
+    assert np.allclose(df["RSU"], expected["RSU"], rtol=0, atol=1e-14)
+    # Of the rings tied within rounding errors, the largest ID is
+    # reported, e.g. RRFFLLFF rather than RLFFRLFF.
+    assert (df["Ring ID"] >= expected["Ring ID"]).all()
+    assert df.loc[df["theta"] == 30, "Ring ID"].item() == "RRFFLLFF"
+
+
+@pytest.mark.parametrize("ns", [[], [0, 2]])
+def test_create_min_rsu_vs_theta_multi_n_rejects_invalid_ns(ns):
+    with pytest.raises(ValueError):
+        create_min_rsu_vs_theta_multi_n(ns, [0])
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from reprod.rsuanalyzer.analyze_rsu.monte_carlo_rsu import \
+    create_rsu_monte_carlo_df
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+
+RING_IDS = ["RRFFLLBBRLFB", "RLFFRLFFRLFF", "LLBFRLFBLRBB"]
+
+
+def test_create_rsu_monte_carlo_df_fixed_angles():
+    df = create_rsu_monte_carlo_df(
+        RING_IDS, 34, 90, num_of_samples=10, quantiles=[0.5])
+    assert df.columns.to_list() == [
+        "Ring ID", "mean", "var", "q0.5", "S_theta1", "S_theta2",
+        "S_theta3", "S_delta1", "S_delta2", "S_delta3"]
+    assert df["Ring ID"].to_list() == RING_IDS
+    expected = [calc_rsu(ring_id, 34, 90) for ring_id in RING_IDS]
+    assert np.allclose(df["mean"], expected, rtol=0, atol=1e-12)
+    assert np.allclose(df["q0.5"], expected, rtol=0, atol=1e-12)
+    assert np.allclose(df["var"], 0, rtol=0, atol=1e-24)
+    assert (df.filter(like="S_") == 0).all().all()
+
+
+def test_create_rsu_monte_carlo_df():
+    df = create_rsu_monte_carlo_df(
+        RING_IDS, stats.norm(34, 3), stats.uniform(85, 5),
+        num_of_samples=20_000, seed=0)
+    assert len(df) == 3
+    assert (df["var"] > 0).all()
+    assert (df["q0.05"] <= df["q0.5"]).all()
+    assert (df["q0.5"] <= df["q0.95"]).all()
+    indices = df.filter(like="S_")
+    assert ((indices >= 0) & (indices <= 1)).all().all()
+    # The indices of the independent inputs add up to at most 1, up to
+    # the estimation error.
+    assert (indices.sum(axis=1) < 1.05).all()
+
+    same_df = create_rsu_monte_carlo_df(
+        RING_IDS, stats.norm(34, 3), stats.uniform(85, 5),
+        num_of_samples=20_000, seed=0)
+    assert df.equals(same_df)
+
+
+def test_create_rsu_monte_carlo_df_one_random_ligand():
+    df = create_rsu_monte_carlo_df(
+        RING_IDS, [stats.uniform(20, 30), 34, 34],
+        num_of_samples=20_000, seed=1)
+    assert (df["S_theta1"] > 0.95).all()
+    assert (df[["S_theta2", "S_theta3", "S_delta1"]] == 0).all().all()
+
+
+
+@pytest.mark.parametrize(
+    "ring_ids, theta_dist",
+    [(["RRFF", "RRFFLLBB"], 30), ([], 30), (["RRFFLLBB"], [30, 30, 30])])
+def test_create_rsu_monte_carlo_df_invalid(ring_ids, theta_dist):
+    with pytest.raises(ValueError):
+        create_rsu_monte_carlo_df(ring_ids, theta_dist, num_of_samples=10)
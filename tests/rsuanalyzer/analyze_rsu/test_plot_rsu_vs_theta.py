@@ -0,0 +1,20 @@
+from matplotlib import pyplot as plt
+from matplotlib.figure import Figure
+
+from reprod.rsuanalyzer.analyze_rsu.calc_rsu_vs_theta import (
+    create_rsu_vs_theta_df)
+from reprod.rsuanalyzer.analyze_rsu.plot_rsu_vs_theta import (
+    plot_rsu_vs_theta)
+
+
+def test_plot_rsu_vs_theta_without_showing(tmp_path, mocker):
+    show = mocker.patch.object(plt, "show")
+    df = create_rsu_vs_theta_df("RLFFRLFFRLFF", range(0, 91, 10))
+    fig = plot_rsu_vs_theta(df, df, labels=["a", "b"], show=False)
+
+    assert isinstance(fig, Figure)
+    assert [line.get_label() for line in fig.axes[0].lines] == ["a", "b"]
+    assert not plt.get_fignums()
+    show.assert_not_called()
+    fig.savefig(tmp_path / "plot.png")
+    assert (tmp_path / "plot.png").stat().st_size > 0
@@ -0,0 +1,112 @@
+import os
+
+import pandas as pd
+import pytest
+
+from reprod.rsuanalyzer.analyze_rsu import reproduction
+from reprod.rsuanalyzer.analyze_rsu.calc_rsu_vs_theta import (
+    create_rsu_vs_theta_df)
+from reprod.rsuanalyzer.analyze_rsu.reproduction import (ReproTable,
+                                                        ReproTarget,
+                                                        run_reproduction)
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+
+
+def _write_csv(dfs, path, sep=","):
+    pd.concat(dfs).to_csv(path, index=False, sep=sep)
+
+
+def _table(ring_id, delta_=87):
+    return ReproTable(
+        "rsu_vs_theta",
+        {"ring_id": ring_id, "thetas": [0, 30, 60], "delta_": delta_})
+
+
+def _targets(sep=","):
+    return [
+        ReproTarget(
+            "a.csv", (_table("RLFFRLFFRLFF"), _table("RRFFLLBBRRFFLLBB")),
+            _write_csv, {"sep": sep}),
+        ReproTarget(
+            "sub/b.csv", (_table("RLFFRLFFRLFF"), _table("RLFFRLFFRLFF", 90)),
+            _write_csv),
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_reproduction(tmp_path, workers):
+    status = run_reproduction(_targets(), str(tmp_path), workers=workers)
+    assert status == {"a.csv": "built", "sub/b.csv": "built"}
+
+    df = pd.read_csv(
+        tmp_path / "sub" / "b.csv", float_precision="round_trip")
+    expected = pd.concat([
+        create_rsu_vs_theta_df("RLFFRLFFRLFF", [0, 30, 60]),
+        create_rsu_vs_theta_df("RLFFRLFFRLFF", [0, 30, 60], 90)])
+    assert df["RSU"].to_list() == expected["RSU"].to_list()
+    # The table shared by the targets is computed once.
+    assert len(os.listdir(tmp_path / ".cache" / "tables")) == 3
+    assert not [
+        name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_run_reproduction_reuses_cache(tmp_path, mocker):
+    run_reproduction(_targets(), str(tmp_path), workers=1)
+    spy = mocker.spy(ReproTable, "compute")
+
+    assert run_reproduction(_targets(), str(tmp_path), workers=1) == {
+        "a.csv": "up to date", "sub/b.csv": "up to date"}
+    # Only the target whose options are changed is rendered again,
+    # from the cached tables.
+    assert run_reproduction(_targets(";"), str(tmp_path), workers=1) == {
+        "a.csv": "built", "sub/b.csv": "up to date"}
+    assert ";" in (tmp_path / "a.csv").read_text()
+    # A removed file is rendered again.
+    os.remove(tmp_path / "sub" / "b.csv")
+    assert run_reproduction(_targets(";"), str(tmp_path), workers=1) == {
+        "a.csv": "up to date", "sub/b.csv": "built"}
+    assert run_reproduction(
+        _targets(";"), str(tmp_path), workers=1, force=True) == {
+        "a.csv": "built", "sub/b.csv": "built"}
+    assert spy.call_count == 0
+
+
+def test_run_reproduction_recomputes_changed_library(tmp_path, mocker):
+    run_reproduction(_targets(), str(tmp_path), workers=1)
+    mocker.patch.object(
+        reproduction, "_library_version", return_value="changed")
+    spy = mocker.spy(ReproTable, "compute")
+    assert run_reproduction(_targets(), str(tmp_path), workers=1) == {
+        "a.csv": "built", "sub/b.csv": "built"}
+    assert spy.call_count == 3
+
+
+def test_run_reproduction_of_rsu_table(tmp_path):
+    table = ReproTable(
+        "rsu", {"ring_ids": ["RLFFRLFFRLFF", "RRFFLLBB"], "thetas": [34, 0]})
+    run_reproduction(
+        [ReproTarget("rsu.csv", (table,), _write_csv)], str(tmp_path))
+    df = pd.read_csv(tmp_path / "rsu.csv", float_precision="round_trip")
+    assert df["RSU"].to_list() == [
+        calc_rsu("RLFFRLFFRLFF", 34), calc_rsu("RRFFLLBB", 0)]
+
+
+def test_repro_table_rejects_unknown_function():
+    with pytest.raises(ValueError):
+        ReproTable("unknown", {})
+
+
+def test_run_reproduction_rejects_duplicate_paths(tmp_path):
+    target = _targets()[0]
+    with pytest.raises(ValueError):
+        run_reproduction([target, target], str(tmp_path))
+
+
+def test_repro_target_rejects_unpicklable_renderer():
+    def render(dfs, path):
+        pass
+
+    with pytest.raises(ValueError):
+        ReproTarget("a.csv", (_table("RLFFRLFFRLFF"),), render)
+    with pytest.raises(ValueError):
+        ReproTarget("a.csv", (_table("RLFFRLFFRLFF"),), lambda dfs, path: None)
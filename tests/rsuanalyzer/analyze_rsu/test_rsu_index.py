@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.analyze_rsu.rsu_index import RSUIndex
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.rank_ring_ids import ring_rank
+
+
+@pytest.fixture(scope="module")
+def index():
+    return RSUIndex.build(3, 34, 90)
+
+
+@pytest.fixture(scope="module")
+def rsus_by_id():
+    ring_ids = sorted(enum_ring_ids(3, 34))
+    return dict(zip(ring_ids, calc_rsu_batch(ring_ids, 34, 90)))
+
+
+def test_rsu_index_build(index, rsus_by_id):
+    assert len(index) == len(rsus_by_id)
+    assert (np.diff(index.rsus) >= 0).all()
+    assert np.array_equal(index.positions[index.ranks], np.arange(len(index)))
+    for ring_id, rsu in rsus_by_id.items():
+        assert index.rsu(ring_id) == pytest.approx(rsu, abs=1e-12)
+        assert index.ranks[index.position(ring_id)] == ring_rank(ring_id)
+
+
+@pytest.mark.parametrize("lower, upper", [(0, 0.3), (0.5, 0.7), (1, 0.5)])
+def test_rsu_index_range(index, rsus_by_id, lower, upper):
+    expected = sorted(
+        (rsu, ring_id) for ring_id, rsu in rsus_by_id.items()
+        if lower <= rsu <= upper)
+    assert index.count_range(lower, upper) == len(expected)
+    assert len(index.range_ranks(lower, upper)) == len(expected)
+    found = list(index.iter_range(lower, upper, chunk_size=7))
+    assert [ring_id for ring_id, _ in found] \
+        == [ring_id for _, ring_id in expected]
+    assert np.allclose(
+        [rsu for _, rsu in found], [rsu for rsu, _ in expected])
+
+
+def test_rsu_index_percentile(index, rsus_by_id):
+    rsus = np.array(list(rsus_by_id.values()))
+    for ring_id in list(rsus_by_id)[::50]:
+        rsu = rsus_by_id[ring_id]
+        expected = 100 * np.mean(rsus < rsu - 1e-12)
+        assert index.percentile(ring_id) == pytest.approx(expected)
+        # The duplicates of a ring have the same percentile.
+        assert index.percentile(ring_id[4:] + ring_id[:4]) \
+            == index.percentile(ring_id)
+    assert index.rsu_at_percentile(0) == rsus.min()
+    assert index.rsu_at_percentile(100) == rsus.max()
+    assert index.rsu_at_percentile(50) == np.sort(rsus)[len(rsus) // 2]
+    with pytest.raises(ValueError):
+        index.rsu_at_percentile(101)
+    with pytest.raises(ValueError):
+        index.position("RRFFLLBB")
+
+
+def test_rsu_index_rsu_at_percentile_round_trip(index, rsus_by_id):
+    for ring_id in rsus_by_id:
+        assert index.rsu_at_percentile(index.percentile(ring_id)) \
+            == index.rsu(ring_id)
+    # The percentiles of 9 rings, e.g. 100 * 7 / 9, are rounded.
+    index_of_9 = RSUIndex(
+        1, 0, 90, np.arange(9.0), np.arange(9), np.arange(9),
+        np.arange(9, dtype=np.uint64))
+    for position in range(9):
+        assert index_of_9.rsu_at_percentile(100 * position / 9) == position
+
+
+def test_rsu_index_save_and_load(index, tmp_path, mocker):
+    import reprod.rsuanalyzer.analyze_rsu.rsu_index as module
+    index.save(str(tmp_path))
+    loaded = RSUIndex.load(str(tmp_path))
+    assert (loaded.num_of_ligs, loaded.theta, loaded.delta_) == (3, 34, 90)
+    for name in ("rsus", "ranks", "positions", "codes"):
+        assert np.array_equal(getattr(loaded, name), getattr(index, name))
+    assert loaded.count_range(0.2, 0.4) == index.count_range(0.2, 0.4)
+
+    # The queries of a loaded index do not enumerate the rings again.
+    mocker.patch.object(module, "_sorted_codes", side_effect=AssertionError)
+    assert list(loaded.iter_range(0.2, 0.4)) \
+        == list(index.iter_range(0.2, 0.4))
+    for ring_id in ("RLFFRLFFRLFF", "RRFFLLBBRLFB"):
+        assert loaded.position(ring_id) == index.position(ring_id)
+        assert loaded.percentile(ring_id) == index.percentile(ring_id)
+
+    # An interrupted save leaves no metadata.
+    (tmp_path / "meta.json").unlink()
+    with pytest.raises(FileNotFoundError):
+        RSUIndex.load(str(tmp_path))
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+
+from reprod.rsuanalyzer.analyze_rsu.calc_min_rsu_vs_theta import \
+    create_min_rsu_vs_theta_df
+from reprod.rsuanalyzer.analyze_rsu.rsu_server import RSUServer
+from reprod.rsuanalyzer.analyze_rsu.small_rsu_ranking import \
+    create_small_rsu_ranking
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = b"" if body is None else json.dumps(body).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+def _run_with_server(test, **kwargs):
+    async def main():
+        async with RSUServer(**kwargs) as server:
+            return await test(server.port, server)
+    return asyncio.run(main())
+
+
+def test_rsu_requests_are_coalesced():
+    ring_ids = sorted(enum_ring_ids(2))
+
+    async def test(port, server):
+        responses = await asyncio.gather(*(
+            _request(port, "POST", "/rsu", {"ring_id": ring_id, "theta": 30})
+            for ring_id in ring_ids))
+        return responses, server.num_of_batches
+
+    responses, num_of_batches = _run_with_server(
+        test, coalesce_window=0.2)
+    assert num_of_batches < len(ring_ids)
+    for ring_id, (status, body) in zip(ring_ids, responses):
+        assert status == 200
+        assert body["ring_id"] == ring_id
+        assert body["rsu"] == pytest.approx(calc_rsu(ring_id, 30, 87))
+
+
+def test_ranking():
+    expected = create_small_rsu_ranking(enum_ring_ids(3), 40, 87, 5)
+
+    async def test(port, server):
+        return await _request(
+            port, "POST", "/ranking",
+            {"num_of_ligs": 3, "theta": 40, "top_num": 5})
+
+    status, body = _run_with_server(test)
+    assert status == 200
+    assert [row["rank"] for row in body["ranking"]] == [1, 2, 3, 4, 5]
+    assert [row["ring_id"] for row in body["ranking"]] == \
+        expected["Ring ID"].to_list()
+    assert [row["rsu"] for row in body["ranking"]] == \
+        pytest.approx(expected["RSU"].to_list())
+
+
+
+def test_ranking_ties():
+    # The RSUs of the rings are the same at theta = 90.
+    ring_ids = ["RRFFLLFF", "RLFFLRFF", "RRFFRRFF", "RLFFRLFF", "RRFFRLFF"]
+
+    async def test(port, server):
+        return await asyncio.gather(*(
+            _request(port, "POST", path, {
+                "ring_ids": ring_ids, "theta": 90, "thetas": [90],
+                "top_num": 3})
+            for path in ("/ranking", "/min-rsu")))
+
+    (_, ranking), (_, min_rsu) = _run_with_server(test)
+    # The same tie order as merge_shards and /min_rsu.
+    assert [row["ring_id"] for row in ranking["ranking"]] == \
+        ["RRFFRRFF", "RRFFRLFF", "RRFFLLFF"]
+    assert min_rsu["min_rsus"][0]["ring_id"] == "RRFFRRFF"
+
+def test_min_rsu():
+    ring_ids = sorted(enum_ring_ids(2))
+    expected = create_min_rsu_vs_theta_df(ring_ids, [0, 45, 90])
+
+    async def test(port, server):
+        return await _request(
+            port, "POST", "/min-rsu",
+            {"ring_ids": ring_ids, "thetas": [0, 45, 90]})
+
+    status, body = _run_with_server(test)
+    assert status == 200
+    assert [row["theta"] for row in body["min_rsus"]] == [0, 45, 90]
+    assert [row["ring_id"] for row in body["min_rsus"]] == \
+        expected["Ring ID"].to_list()
+    assert [row["rsu"] for row in body["min_rsus"]] == \
+        pytest.approx(expected["RSU"].to_list())
+
+
+@pytest.mark.parametrize(
+    "method, path, body, expected_status", [
+        ("GET", "/health", None, 200),
+        ("GET", "/unknown", None, 404),
+        ("GET", "/rsu", None, 405),
+        ("POST", "/rsu", {"ring_id": "RRFFLL", "theta": 30}, 400),
+        ("POST", "/rsu", {"ring_id": "RRFFLLBX", "theta": 30}, 400),
+        ("POST", "/rsu", {"theta": 30}, 400),
+        ("POST", "/ranking", [1, 2], 400),
+    ]
+)
+def test_status(method, path, body, expected_status):
+    async def test(port, server):
+        return await _request(port, method, path, body)
+
+    status, _ = _run_with_server(test)
+    assert status == expected_status
@@ -0,0 +1,93 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.analyze_rsu.sharded_sweep import (
+    main, merge_shards, plan_sweep, run_shard)
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+THETAS = [0, 34, 90]
+DELTAS = [87, 103]
+
+
+def _run_all(manifest_path):
+    with open(manifest_path) as f:
+        n_shards = len(json.load(f)["shards"])
+    for shard_id in range(n_shards):
+        run_shard(manifest_path, shard_id)
+
+
+def test_sharded_sweep(tmp_path):
+    manifest_path = plan_sweep(
+        str(tmp_path), [2, 3], THETAS, DELTAS, rings_per_shard=50,
+        thetas_per_shard=2, top_num=5)
+    _run_all(manifest_path)
+    min_rsu_df, ranking_df = merge_shards(manifest_path)
+
+    assert len(min_rsu_df) == 2 * len(THETAS) * len(DELTAS)
+    assert len(ranking_df) == 5 * len(min_rsu_df)
+    assert os.path.exists(tmp_path / "min_rsu.csv")
+    assert os.path.exists(tmp_path / "ranking.csv")
+
+    for n in (2, 3):
+        ring_ids = sorted(enum_ring_ids(n))
+        for theta in THETAS:
+            for delta_ in DELTAS:
+                rsus = sorted(
+                    calc_rsu(ring_id, theta, delta_) for ring_id in ring_ids)
+                ranking = ranking_df[
+                    (ranking_df["num_of_ligs"] == n)
+                    & (ranking_df["theta"] == theta)
+                    & (ranking_df["delta"] == delta_)]
+                assert ranking["Rank"].tolist() == [1, 2, 3, 4, 5]
+                assert np.allclose(ranking["RSU"], rsus[:5])
+                for ring_id, rsu in zip(ranking["Ring ID"], ranking["RSU"]):
+                    assert ring_id in ring_ids
+                    assert np.isclose(calc_rsu(ring_id, theta, delta_), rsu)
+
+
+@pytest.mark.parametrize("precision", ["float64", "float32"])
+def test_sharded_sweep_does_not_depend_on_sharding(tmp_path, precision):
+    results = []
+    for i, rings_per_shard in enumerate([7, 1000]):
+        manifest_path = plan_sweep(
+            str(tmp_path / str(i)), 3, THETAS, DELTAS,
+            rings_per_shard=rings_per_shard, deltas_per_shard=1,
+            precision="float64" if i == 0 else precision)
+        _run_all(manifest_path)
+        results.append(merge_shards(manifest_path)[1])
+    assert results[0].equals(results[1])
+
+
+def test_merge_shards_incomplete(tmp_path):
+    manifest_path = plan_sweep(str(tmp_path), 2, THETAS, rings_per_shard=10)
+    run_shard(manifest_path, 0)
+    with pytest.raises(FileNotFoundError):
+        merge_shards(manifest_path)
+
+
+def test_merge_shards_stale_result(tmp_path):
+    manifest_path = plan_sweep(str(tmp_path), 2, THETAS)
+    _run_all(manifest_path)
+    plan_sweep(str(tmp_path), 2, THETAS)  # new sweep in the same directory
+    with pytest.raises(ValueError):
+        merge_shards(manifest_path)
+
+    # The stale results are computed again.
+    _run_all(manifest_path)
+    min_rsu_df, _ = merge_shards(manifest_path)
+    assert len(min_rsu_df) == len(THETAS)
+
+
+def test_main(tmp_path, capsys):
+    out_dir = str(tmp_path)
+    main(["plan", out_dir, "--num-of-ligs", "2", "--thetas", "0", "34",
+          "--rings-per-shard", "10"])
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    main(["run-shard", manifest_path, "--worker", "0/2"])
+    main(["run-shard", manifest_path, "--worker", "1/2"])
+    main(["merge", manifest_path])
+    assert "RLFFRLFF" in capsys.readouterr().out
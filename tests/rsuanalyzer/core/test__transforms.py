@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._global_vecs_rots import \
+    _calc_global_lig_ends_in_chain
+from reprod.rsuanalyzer.core._local_vecs_rots import (_rot_ac, _rot_ca,
+                                                      _x_ac_coord_a)
+from reprod.rsuanalyzer.core._transforms import (CON_TYPES, LIG_TYPES,
+                                                 _compose_lig_ends,
+                                                 _con_elements, _con_mats,
+                                                 _encode_ids, _lig_elements,
+                                                 _lig_mats)
+from reprod.rsuanalyzer.core.ligand_geometry import LigandGeometry
+
+
+def test__encode_ids():
+    lig_codes, con_codes = _encode_ids(["RRFFLLBB", "RLBFLRFB"])
+    assert lig_codes.tolist() == [[0, 3], [1, 2]]
+    assert con_codes.tolist() == [[0, 3], [2, 1]]
+
+
+def test__encode_ids_of_no_ids():
+    lig_codes, con_codes = _encode_ids([], 10)
+    assert lig_codes.shape == (0, 3)
+    assert con_codes.shape == (0, 2)
+
+
+@pytest.mark.parametrize(
+    "conf_ids, length",
+    [(["RRFF", "RRFFLL"], None), (["RRFFLX"], None), (["RRF"], None),
+     ([], None), (["RRFF"], 8)])
+def test__encode_ids_invalid(conf_ids, length):
+    with pytest.raises(ValueError):
+        _encode_ids(conf_ids, length)
+
+
+@pytest.mark.parametrize("theta", [0, 30, 90])
+def test__lig_mats(theta):
+    mats = _lig_mats(theta)
+    assert mats.shape == (4, 4, 4)
+    for lig_type, mat in zip(LIG_TYPES, mats):
+        assert np.allclose(mat[:3, :3], _rot_ac(lig_type, theta).as_matrix())
+        assert np.allclose(mat[:3, 3], _x_ac_coord_a(lig_type, theta))
+        assert np.allclose(mat[3], [0, 0, 0, 1])
+
+
+def test__con_mats():
+    mats = _con_mats([87, 120])
+    assert mats.shape == (2, 4, 4, 4)
+    for delta_, mats_of_delta in zip([87, 120], mats):
+        for con_type, mat in zip(CON_TYPES, mats_of_delta):
+            assert np.allclose(
+                mat[:3, :3], _rot_ca(con_type, delta_).as_matrix())
+            assert np.allclose(mat[:3, 3], 0)
+
+
+def test__con_mats_invalid_delta():
+    with pytest.raises(ValueError):
+        _con_mats([87, 0])
+
+
+@pytest.mark.parametrize(
+    "conf_id", ["RR", "RRFFLL", "RRFFLLBBRLFBLR", "LRBFRLFBLLBB"])
+def test__compose_lig_ends(conf_id):
+    lig_codes, con_codes = _encode_ids([conf_id])
+    lig_ends = _compose_lig_ends(
+        _lig_mats(30)[lig_codes], _con_mats(120)[con_codes])[0]
+    expected = _calc_global_lig_ends_in_chain(conf_id, 30, 120)
+    assert len(lig_ends) == len(expected)
+    for lig_end, (x, rot) in zip(lig_ends, expected):
+        assert np.allclose(lig_end[:3, 3], x)
+        assert np.allclose(lig_end[:3, :3], rot.as_matrix())
+
+
+@pytest.mark.parametrize("geometry", [None, LigandGeometry(70, 1.2, 0.8)])
+def test__lig_elements(geometry):
+    thetas = np.array([[0, 30], [45, 90]])
+    rots, trans = _lig_elements(thetas, geometry)
+    for theta in np.unique(thetas):
+        mats = _lig_mats(theta, geometry)
+        mask = thetas == theta
+        for lig_code in range(4):
+            assert np.allclose(
+                [e[mask] for e in rots[lig_code]],
+                mats[lig_code, :3, :3].reshape(9, 1))
+            assert np.allclose(
+                [e[mask] for e in trans[lig_code]],
+                mats[lig_code, :3, 3].reshape(3, 1))
+
+
+def test__con_elements():
+    deltas = np.array([87, 120, 180])
+    rots = _con_elements(deltas)
+    mats = _con_mats(deltas)
+    for con_code in range(4):
+        assert np.allclose(
+            rots[con_code], mats[:, con_code, :3, :3].reshape(-1, 9).T)
+
+
+def test__con_elements_invalid():
+    with pytest.raises(ValueError):
+        _con_elements(np.array([0, 87]))
@@ -33,6 +33,45 @@ def test_calc_rsu(conf_id, theta, delta_, chains):
     assert rsu == expected
 
 
+@pytest.mark.parametrize(
+    "conf_id, theta, deltas, chains",
+    [
+        ("RRFF", 30, [120], [("RR", [120])]),
+        ("RRFFLLBB", 30, [87, 120], [
+            ("RRFFLL", [87]), ("LLBBRR", [120])]),
+        ("RRFFLLBBRLFB", 45, [87, 90, 120], [
+            ("RRFFLLBBRL", [87, 90]), ("LLBBRLFBRR", [90, 120]),
+            ("RLFBRRFFLL", [120, 87])])
+    ]
+)
+def test_calc_rsu_with_site_deltas(conf_id, theta, deltas, chains):
+    rsu = calc_rsu(conf_id, theta, deltas)
+
+    expected_sum_dist = sum(
+            _calc_chain_end_dist(chain, theta, chain_deltas)
+            for chain, chain_deltas in chains)
+
+    assert rsu == pytest.approx(expected_sum_dist / len(chains) ** 2)
+
+
+def test_calc_rsu_with_same_site_deltas():
+    assert calc_rsu("RRFFLLBBRLFB", 30, [103] * 3) == pytest.approx(
+        calc_rsu("RRFFLLBBRLFB", 30, 103))
+
+
+def test_calc_rsu_with_wrong_number_of_deltas():
+    with pytest.raises(ValueError):
+        calc_rsu("RRFFLLBB", 30, [87, 90, 120])
+
+
+def test_calc_chain_end_with_deltas():
+    x = _calc_chain_end("RRFFLLBBRL", 30, [87, 120])[0]
+    x_reversed = _calc_chain_end("RRFFLLBBRL", 30, [120, 87])[0]
+    assert not np.allclose(x, x_reversed)
+    with pytest.raises(ValueError):
+        _calc_chain_end("RRFFLLBBRL", 30, [87])
+
+
 @pytest.mark.parametrize(
     "conf_id, expected",
     [
@@ -0,0 +1,158 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._transforms import (_con_mats, _encode_ids,
+                                                 _lig_mats, _unit_tables)
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+from reprod.rsuanalyzer.core.calc_rsu_batch import (
+    _calc_rsu_of_codes, _calc_rsu_of_sampled_angles, _float32_error_bound,
+    _soa_unit_tables, calc_rsu_batch, calc_rsu_batch_per_site,
+    calc_smallest_rsus)
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+RING_IDS = [
+    "RRFF", "LRBF", "RRFFLLBB", "RLFFRLFF", "RLFFRLFFRLFF",
+    "RRFBRLBBRRFBRLBB", "RRFFLRFBRRFFLLBB", "LLBFRLFBLRBBRRFF"]
+
+
+def test__unit_tables():
+    rots, trans = _unit_tables([0, 30, 90], [87, 120])
+    assert rots.shape == (3, 2, 16, 3, 3)
+    assert trans.shape == (3, 2, 16, 3)
+    lig_mats, con_mats = _lig_mats(30), _con_mats(120)
+    for lig_code in range(4):
+        for con_code in range(4):
+            unit = lig_mats[lig_code] @ con_mats[con_code]
+            assert np.allclose(rots[1, 1, 4 * lig_code + con_code], unit[:3, :3])
+            assert np.allclose(trans[1, 1, 4 * lig_code + con_code], unit[:3, 3])
+
+
+@pytest.mark.parametrize(
+    "thetas, deltas",
+    [(34, 87), ([0, 30, 90], 87), (30, [87, 103]), ([[0, 45], [60, 90]], [87])])
+def test_calc_rsu_batch(thetas, deltas):
+    rsus = calc_rsu_batch(RING_IDS, thetas, deltas)
+    assert rsus.shape == np.shape(thetas) + np.shape(deltas) + (len(RING_IDS),)
+    for theta_idx in np.ndindex(np.shape(thetas)):
+        for delta_idx in np.ndindex(np.shape(deltas)):
+            theta = np.asarray(thetas)[theta_idx]
+            delta_ = np.asarray(deltas)[delta_idx]
+            assert np.allclose(
+                rsus[theta_idx + delta_idx],
+                [calc_rsu(ring_id, theta, delta_) for ring_id in RING_IDS],
+                rtol=0, atol=1e-12)
+
+
+def test__calc_rsu_of_codes_with_soa_tables():
+    thetas, deltas = np.array([0.0, 34.0]), np.array([87.0, 90.0])
+    lig_codes, con_codes = _encode_ids(["RLFFRLFFRLFF", "RRFBRLBBRRFB"])
+    soa_tables = _soa_unit_tables(_unit_tables(thetas, deltas))
+    assert soa_tables[0].shape == (9, 4, 16)
+    assert soa_tables[1].shape == (3, 4, 16)
+    assert np.array_equal(
+        _calc_rsu_of_codes(
+            lig_codes, con_codes, thetas, deltas, soa_tables=soa_tables),
+        _calc_rsu_of_codes(lig_codes, con_codes, thetas, deltas))
+
+
+def test_calc_rsu_batch_invalid_ring_id():
+    with pytest.raises(ValueError):
+        calc_rsu_batch(["RRFFLL"], 30)
+
+
+def test_calc_rsu_batch_float32():
+    thetas = np.arange(0, 91)
+    rsus = calc_rsu_batch(RING_IDS, thetas, [87, 120], precision="float32")
+    assert rsus.dtype == np.float32
+    errors = np.abs(rsus - calc_rsu_batch(RING_IDS, thetas, [87, 120]))
+    bounds = [_float32_error_bound(len(ring_id) // 4) for ring_id in RING_IDS]
+    assert (errors <= bounds).all()
+
+
+def test_calc_rsu_batch_invalid_precision():
+    with pytest.raises(ValueError):
+        calc_rsu_batch(RING_IDS, 30, precision="float16")
+
+
+@pytest.mark.parametrize("top_num", [1, 5, 1000])
+def test_calc_smallest_rsus(top_num):
+    # Duplicates have the same RSUs, so that ties are included.
+    ring_ids = RING_IDS + sorted(enum_ring_ids(3)) + RING_IDS[-3:]
+    thetas, deltas = [0, 34, 90], [87, 103]
+    rsus = calc_rsu_batch(ring_ids, thetas, deltas)
+    idxs, top_rsus = calc_smallest_rsus(ring_ids, thetas, deltas, top_num)
+    k = min(top_num, len(ring_ids))
+    assert idxs.shape == top_rsus.shape == (3, 2, k)
+    for i, j in np.ndindex(3, 2):
+        order = np.lexsort((-np.arange(len(ring_ids)), rsus[i, j]))[:k]
+        assert idxs[i, j].tolist() == order.tolist()
+        assert np.array_equal(top_rsus[i, j], rsus[i, j, order])
+
+    idxs32, top_rsus32 = calc_smallest_rsus(
+        ring_ids, thetas, deltas, top_num, precision="float32")
+    assert np.array_equal(idxs32, idxs)
+    assert np.array_equal(top_rsus32, top_rsus)
+
+
+def test_calc_rsu_batch_per_site():
+    ring_ids = ["RRFFLLBBRLFB", "RLFFRLFFRLFF", "LLBFRLFBLRBB"]
+    thetas = [0, 34, 90]
+    site_deltas = [
+        [[87, 90, 120], [120, 87, 90]], [[90, 90, 90], [87, 87, 103]]]
+    rsus = calc_rsu_batch_per_site(ring_ids, thetas, site_deltas)
+    assert rsus.shape == (3, 2, 2, 3)
+    for i, theta in enumerate(thetas):
+        for j, k in np.ndindex(2, 2):
+            assert np.allclose(
+                rsus[i, j, k],
+                [calc_rsu(ring_id, theta, site_deltas[j][k])
+                 for ring_id in ring_ids],
+                rtol=0, atol=1e-12)
+
+
+def test_calc_rsu_batch_per_site_with_same_deltas():
+    ring_ids = sorted(enum_ring_ids(3))
+    rsus = calc_rsu_batch_per_site(
+        ring_ids, [0, 45], [[87] * 3, [103] * 3])
+    assert np.array_equal(
+        rsus, calc_rsu_batch(ring_ids, [0, 45], [87, 103]))
+
+
+@pytest.mark.parametrize(
+    "ring_ids, site_deltas",
+    [(["RRFFLLBB"], [87, 90, 120]), (["RRFF", "RRFFLLBB"], [87, 90]),
+     (["RRFFLLBB"], 87)])
+def test_calc_rsu_batch_per_site_invalid(ring_ids, site_deltas):
+    with pytest.raises(ValueError):
+        calc_rsu_batch_per_site(ring_ids, 30, site_deltas)
+
+
+def test__calc_rsu_of_sampled_angles():
+    ring_ids = ["RRFFLLBBRLFB", "RLFFRLFFRLFF", "LLBFRLFBLRBB"]
+    thetas = np.repeat([[0], [34], [90]], 3, axis=1)
+    deltas = np.array([[87, 90, 120], [120, 87, 90], [90, 90, 90]])
+    rsus = _calc_rsu_of_sampled_angles(*_encode_ids(ring_ids), thetas, deltas)
+    assert rsus.shape == (3, 3)
+    for i, ring_id in enumerate(ring_ids):
+        assert np.allclose(
+            rsus[i],
+            [calc_rsu(ring_id, theta[0], delta_)
+             for theta, delta_ in zip(thetas, deltas)],
+            rtol=0, atol=1e-12)
+
+
+def test__calc_rsu_of_sampled_angles_rotated():
+    # The RSU does not depend on where the ring is cut, if the angles
+    # are moved together with the ligands and the metals.
+    rng = np.random.default_rng(0)
+    thetas = rng.uniform(0, 90, (50, 4))
+    deltas = rng.uniform(80, 130, (50, 4))
+    ring_id = "RRFBRLBBRRFFLLBF"
+    rotated_id = ring_id[4:] + ring_id[:4]
+    rsus = _calc_rsu_of_sampled_angles(
+        *_encode_ids([ring_id, rotated_id]), thetas, deltas)
+    rotated_rsus = _calc_rsu_of_sampled_angles(
+        *_encode_ids([rotated_id]),
+        np.roll(thetas, -1, axis=1), np.roll(deltas, -1, axis=1))
+    assert np.allclose(rsus[0], rotated_rsus[0], rtol=0, atol=1e-12)
+    assert not np.allclose(rsus[0], rsus[1])
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._shared_memory import (_attach_arrays,
+                                                    _SharedArrays)
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.core.calc_rsu_parallel import calc_rsu_parallel
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+
+@pytest.mark.parametrize("num_workers", [1, 3])
+def test_calc_rsu_parallel_matches_batch(num_workers):
+    ring_ids = sorted(enum_ring_ids(3)) + ["RRFFLLBB", "RLFFRLFF"]
+    thetas = [[0, 30], [60, 90]]
+    deltas = [87, 120]
+    rsus = calc_rsu_parallel(ring_ids, thetas, deltas, num_workers)
+    assert rsus.shape == (2, 2, 2, len(ring_ids))
+    assert np.array_equal(rsus, calc_rsu_batch(ring_ids, thetas, deltas))
+
+
+def test_calc_rsu_parallel_empty():
+    assert calc_rsu_parallel([], 30, num_workers=1).shape == (0,)
+
+
+def test_calc_rsu_parallel_invalid_length():
+    with pytest.raises(ValueError):
+        calc_rsu_parallel(["RRFFLL"], 30, num_workers=1)
+
+
+def test_shared_arrays():
+    source = np.arange(6.).reshape(2, 3)
+    with _SharedArrays({"a": source, "empty": np.empty(0)}) as shared:
+        arrays, blocks = _attach_arrays(shared.specs)
+        assert np.array_equal(arrays["a"], source)
+        assert arrays["empty"].shape == (0,)
+        arrays["a"][0, 0] = -1
+        assert shared.arrays["a"][0, 0] == -1
+        del arrays
+        for block in blocks:
+            block.close()
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core.calc_rsu import calc_rsu
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.core.certified_min_rsu import (_calc_rsu_of_pairs,
+                                                       _lipschitz_consts,
+                                                       calc_certified_min_rsu)
+from reprod.rsuanalyzer.core.ligand_geometry import LigandGeometry
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+RING_IDS = sorted(enum_ring_ids(2)) + sorted(enum_ring_ids(3))
+
+
+def test__calc_rsu_of_pairs():
+    rings = np.array([0, 50, 3, 100, 50])
+    thetas = np.array([0, 12.5, 30, 77, 90])
+    rsus = _calc_rsu_of_pairs(RING_IDS, rings, thetas, 103, None)
+    assert np.allclose(
+        rsus,
+        [calc_rsu(RING_IDS[ring], theta, 103)
+         for ring, theta in zip(rings, thetas)],
+        rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize(
+    "geometry", [LigandGeometry(), LigandGeometry(75, 1.3, 0.7)])
+def test__lipschitz_consts(geometry):
+    thetas = np.linspace(0, 90, 9001)
+    rsus = calc_rsu_batch(RING_IDS, thetas, geometry=geometry)
+    slopes = np.abs(np.diff(rsus, axis=0)).max(axis=0) / 0.01
+    consts = _lipschitz_consts(
+        np.array([len(ring_id) // 4 for ring_id in RING_IDS]), geometry)
+    assert (slopes <= consts).all()
+
+
+
+@pytest.mark.parametrize("num_of_ligs", [2, 4, 6])
+@pytest.mark.parametrize("delta_", [87, 120, 180])
+def test__lipschitz_consts_many_ligs(num_of_ligs, delta_):
+    rng = np.random.default_rng(num_of_ligs)
+    ring_ids = [
+        "".join(
+            rng.choice(["RR", "RL", "LR", "LL"])
+            + rng.choice(["FF", "FB", "BF", "BB"])
+            for _ in range(num_of_ligs))
+        for _ in range(100)]
+    ring_ids += ["RRFFLLBB" * (num_of_ligs // 2)]
+    if num_of_ligs == 6:
+        ring_ids += ["RRFFRRFFRRFFRRBBRRFFRRBB"]
+    thetas = np.linspace(0, 90, 4501)
+    rsus = calc_rsu_batch(ring_ids, thetas, delta_)
+    slopes = np.abs(np.diff(rsus, axis=0)).max(axis=0) / 0.02
+    consts = _lipschitz_consts(
+        np.full(len(ring_ids), num_of_ligs), LigandGeometry())
+    assert (slopes <= consts).all()
+
+
+@pytest.mark.parametrize(
+    "theta_range, delta_", [((0, 90), 87), ((40.2, 47.9), 103)])
+def test_calc_certified_min_rsu(theta_range, delta_):
+    result = calc_certified_min_rsu(RING_IDS, theta_range, delta_, 1e-9)
+    assert result.lower_bound <= result.rsu <= result.lower_bound + 1e-9
+    assert theta_range[0] <= result.theta <= theta_range[1]
+    assert np.isclose(
+        result.rsu, calc_rsu(result.ring_id, result.theta, delta_),
+        rtol=0, atol=1e-12)
+    grid_rsus = calc_rsu_batch(
+        RING_IDS, np.linspace(*theta_range, 2001), delta_)
+    assert result.lower_bound <= grid_rsus.min()
+    assert result.num_of_evaluations < grid_rsus.size
+
+
+@pytest.mark.parametrize(
+    "ring_ids, theta_range, tol",
+    [([], (0, 90), 1e-9), (["RRFF"], (50, 40), 1e-9),
+     (["RRFF"], (0, 91), 1e-9), (["RRFF"], (0, 90), 0)])
+def test_calc_certified_min_rsu_invalid(ring_ids, theta_range, tol):
+    with pytest.raises(ValueError):
+        calc_certified_min_rsu(ring_ids, theta_range, tol=tol)
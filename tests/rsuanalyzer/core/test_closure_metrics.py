@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from scipy.spatial.transform import Rotation
+
+from reprod.rsuanalyzer.core._transforms import (_con_mats, _encode_ids,
+                                                 _lig_mats)
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.core.closure_metrics import calc_closure_metrics
+
+RING_IDS = [
+    "RRFF", "LRBF", "RRFFLLBB", "RLFFRLFF", "RLFFRLFFRLFF",
+    "RRFBRLBBRRFBRLBB", "RRFFLRFBRRFFLLBB", "LLBFRLFBLRBBRRFF"]
+
+
+def _ring_rotation_angle(ring_id, theta, delta_):
+    lig_mats, con_mats = _lig_mats(theta), _con_mats(delta_)
+    lig_codes, con_codes = _encode_ids([ring_id])
+    mat = np.eye(4)
+    for lig_code, con_code in zip(lig_codes[0], con_codes[0]):
+        mat = mat @ lig_mats[lig_code] @ con_mats[con_code]
+    return Rotation.from_matrix(mat[:3, :3]).magnitude()
+
+
+@pytest.mark.parametrize(
+    "thetas, deltas", [(34, 87), ([0, 30, 90], [87, 103])])
+def test_calc_closure_metrics(thetas, deltas):
+    metrics = calc_closure_metrics(RING_IDS, thetas, deltas)
+    shape = np.shape(thetas) + np.shape(deltas) + (len(RING_IDS),)
+    assert sorted(metrics) == ["gap", "misalignment", "score"]
+    assert all(values.shape == shape for values in metrics.values())
+    assert np.array_equal(
+        metrics["gap"], calc_rsu_batch(RING_IDS, thetas, deltas))
+
+    for theta_idx in np.ndindex(np.shape(thetas)):
+        for delta_idx in np.ndindex(np.shape(deltas)):
+            theta = np.asarray(thetas)[theta_idx]
+            delta_ = np.asarray(deltas)[delta_idx]
+            angles = [
+                _ring_rotation_angle(ring_id, theta, delta_)
+                for ring_id in RING_IDS]
+            assert np.allclose(
+                metrics["misalignment"][theta_idx + delta_idx],
+                np.degrees(angles), rtol=0, atol=1e-9)
+
+
+def test_calc_closure_metrics_score():
+    metrics = calc_closure_metrics(["RRFFLLBB", "RLFFRLFFRLFF"], 34, 87, 2)
+    n_ligs = np.array([2, 3])
+    assert np.allclose(
+        metrics["score"],
+        np.sqrt(metrics["gap"]**2 + (
+            2 * np.radians(metrics["misalignment"]) / n_ligs)**2))
+
+
+def test_calc_closure_metrics_cut_independent():
+    ring_id = "RRFBRLBBRRFFLLBF"
+    metrics = calc_closure_metrics(
+        [ring_id, ring_id[8:] + ring_id[:8]], range(0, 91, 15))
+    assert np.allclose(
+        metrics["misalignment"][:, 0], metrics["misalignment"][:, 1])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._transforms import _lig_mats
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.core.ligand_geometry import LigandGeometry
+
+RING_IDS = ["RRFFLLBB", "RLFFRLFFRLFF", "RRFBRLBBRRFBRLBB"]
+
+
+@pytest.mark.parametrize(
+    "kwargs", [
+        {"bend_angle": -1}, {"bend_angle": 181},
+        {"arm_length_ab": 0}, {"arm_length_bc": -1}])
+def test_invalid_geometry(kwargs):
+    with pytest.raises(ValueError):
+        LigandGeometry(**kwargs)
+
+
+@pytest.mark.parametrize("bend_angle", [30, 60, 120])
+def test__lig_mats_with_geometry(bend_angle):
+    geometry = LigandGeometry(bend_angle, 1.5, 0.5)
+    mats = _lig_mats([0, 45], geometry)
+    x_ab = np.array([1.5, 0, 0])
+    x_bc = mats[..., :3, 3] - x_ab
+    assert np.allclose(np.linalg.norm(x_bc, axis=-1), 0.5)
+    # At theta = 0, the arms are in the xy-plane with the bend angle.
+    cos = x_bc[0] @ x_ab / (0.5 * 1.5)
+    assert np.allclose(np.degrees(np.arccos(cos)), bend_angle)
+    assert np.allclose(x_bc[0, :, 2], 0)
+
+
+def test_calc_rsu_batch_with_default_geometry():
+    rsus = calc_rsu_batch(RING_IDS, [0, 30, 90], [87, 120])
+    assert np.array_equal(
+        calc_rsu_batch(
+            RING_IDS, [0, 30, 90], [87, 120], geometry=LigandGeometry()),
+        rsus)
+
+
+def test_calc_rsu_batch_with_geometries():
+    geometries = [
+        LigandGeometry(50), LigandGeometry(), LigandGeometry(70, 1, 1.2)]
+    thetas, deltas = [[0, 30], [60, 90]], [87, 120]
+    rsus = calc_rsu_batch(RING_IDS, thetas, deltas, geometry=geometries)
+    assert rsus.shape == (3, 2, 2, 2, len(RING_IDS))
+    for rsus_of_geometry, geometry in zip(rsus, geometries):
+        assert np.array_equal(
+            rsus_of_geometry,
+            calc_rsu_batch(RING_IDS, thetas, deltas, geometry=geometry))
+
+
+def test_calc_rsu_batch_scales_with_arm_lengths():
+    rsus = calc_rsu_batch(RING_IDS, [0, 30, 90], geometry=LigandGeometry())
+    scaled = calc_rsu_batch(
+        RING_IDS, [0, 30, 90], geometry=LigandGeometry(60, 3, 3))
+    assert np.allclose(scaled, 3 * rsus)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.core.ligand_geometry import LigandGeometry
+from reprod.rsuanalyzer.core.rsu_surrogate import RSUSurrogate
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+RING_IDS = sorted(enum_ring_ids(3))
+THETAS = np.random.default_rng(0).uniform(0, 90, 200)
+
+
+def test_rsu_surrogate():
+    surrogate = RSUSurrogate.fit(RING_IDS, tol=1e-8)
+    assert surrogate.converged.mean() > 0.9
+    rsus = surrogate(THETAS)
+    assert rsus.shape == (200, len(RING_IDS))
+    errors = np.abs(rsus - calc_rsu_batch(RING_IDS, THETAS)).max(axis=0)
+    assert (errors <= surrogate.error_bounds).all()
+    assert (errors <= 1e-8).all()
+    assert surrogate(30).shape == (len(RING_IDS),)
+
+
+def test_rsu_surrogate_with_delta():
+    ring_ids = RING_IDS[::10]
+    surrogate = RSUSurrogate.fit(
+        ring_ids, (20, 60), (85, 110), tol=1e-6,
+        geometry=LigandGeometry(bend_angle=65))
+    assert surrogate.delta_range == (85, 110)
+    thetas, deltas = np.linspace(20, 60, 11), np.linspace(85, 110, 7)
+    rsus = surrogate(thetas, deltas)
+    assert rsus.shape == (11, 7, len(ring_ids))
+    assert np.allclose(
+        rsus, calc_rsu_batch(
+            ring_ids, thetas, deltas,
+            geometry=LigandGeometry(bend_angle=65)),
+        rtol=0, atol=1e-6)
+    with pytest.raises(ValueError):
+        surrogate(thetas)
+
+
+def test_rsu_surrogate_exact_fallback():
+    surrogate = RSUSurrogate.fit(RING_IDS[:20], (20, 40), tol=1e-8)
+    thetas = [10, 30, 60]
+    rsus = surrogate(thetas, [87, 90])
+    exact = calc_rsu_batch(RING_IDS[:20], thetas, [87, 90])
+    # Outside the fitted domain.
+    assert np.array_equal(rsus[[0, 2]], exact[[0, 2]])
+    assert np.array_equal(rsus[:, 1], exact[:, 1])
+    assert np.allclose(rsus[1, 0], exact[1, 0], rtol=0, atol=1e-8)
+
+    # Not converged to the tolerance.
+    surrogate = RSUSurrogate.fit(RING_IDS[:20], tol=1e-30, max_degree=32)
+    assert not surrogate.converged.any()
+    assert np.array_equal(
+        surrogate(THETAS), calc_rsu_batch(RING_IDS[:20], THETAS))
+
+
+def test_rsu_surrogate_save_and_load(tmp_path):
+    surrogate = RSUSurrogate.fit(
+        RING_IDS[:20], geometry=LigandGeometry(arm_length_ab=1.1))
+    surrogate.save(tmp_path / "surrogate.npz")
+    loaded = RSUSurrogate.load(tmp_path / "surrogate.npz")
+    assert loaded.ring_ids == surrogate.ring_ids
+    assert loaded.geometry == surrogate.geometry
+    assert np.array_equal(loaded.error_bounds, surrogate.error_bounds)
+    assert np.array_equal(loaded(THETAS), surrogate(THETAS))
+
+
+@pytest.mark.parametrize(
+    "theta_range, delta_",
+    [((30, 30), 87), ((-1, 90), 87), ((0, 90), (90, 87))])
+def test_rsu_surrogate_invalid_domain(theta_range, delta_):
+    with pytest.raises(ValueError):
+        RSUSurrogate.fit(RING_IDS[:2], theta_range, delta_)
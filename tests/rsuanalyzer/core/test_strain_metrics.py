@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._conf_id import \
+    _list_chains_derived_from_the_ring
+from reprod.rsuanalyzer.core.calc_rsu import _calc_chain_end_dist
+from reprod.rsuanalyzer.core.calc_rsu_batch import calc_rsu_batch
+from reprod.rsuanalyzer.core.closure_metrics import calc_closure_metrics
+from reprod.rsuanalyzer.core.strain_metrics import (_STRAIN_METRICS,
+                                                    calc_strain_metrics,
+                                                    register_strain_metric,
+                                                    strain_metric_names)
+
+RING_IDS = [
+    "RRFF", "RRFFLLBB", "RLFFRLFFRLFF", "RRFBRLBBRRFBRLBB",
+    "LLBFRLFBLRBBRRFF"]
+
+
+@pytest.fixture
+def restore_registry():
+    registry = dict(_STRAIN_METRICS)
+    yield
+    _STRAIN_METRICS.clear()
+    _STRAIN_METRICS.update(registry)
+
+
+def test_calc_strain_metrics():
+    metrics = calc_strain_metrics(RING_IDS, [0, 34, 90], [87, 103])
+    assert list(metrics) == strain_metric_names()
+    assert np.array_equal(
+        metrics["rsu"], calc_rsu_batch(RING_IDS, [0, 34, 90], [87, 103]))
+
+    for ring_id, rms, max_ in zip(
+            RING_IDS, metrics["rms_rsu"][1, 1].T, metrics["max_rsu"][1, 1]):
+        n_ligs = len(ring_id) // 4
+        dists = [
+            _calc_chain_end_dist(chain_id, 34, 103)
+            for chain_id in _list_chains_derived_from_the_ring(ring_id)]
+        assert np.isclose(rms, np.sqrt(np.mean(np.square(dists))) / n_ligs)
+        assert np.isclose(max_, max(dists) / n_ligs)
+
+    closure = calc_closure_metrics(RING_IDS, [0, 34, 90], [87, 103])
+    assert np.allclose(metrics["misalignment"], closure["misalignment"])
+    assert np.allclose(metrics["closure_score"], closure["score"])
+
+
+def test_calc_strain_metrics_subset():
+    metrics = calc_strain_metrics(RING_IDS, 30, metrics=["max_rsu"])
+    assert list(metrics) == ["max_rsu"]
+    assert metrics["max_rsu"].shape == (len(RING_IDS),)
+    with pytest.raises(ValueError):
+        calc_strain_metrics(RING_IDS, 30, metrics=["unknown"])
+
+
+def test_register_strain_metric(restore_registry):
+    @register_strain_metric("min_rsu")
+    def min_rsu(ends):
+        return ends.end_dists.min(axis=0) / ends.n_ligs
+
+    metrics = calc_strain_metrics(
+        RING_IDS, range(0, 91, 30), metrics=["min_rsu", "max_rsu"])
+    assert (metrics["min_rsu"] <= metrics["max_rsu"]).all()
+    with pytest.raises(ValueError):
+        register_strain_metric("min_rsu", min_rsu)
+    register_strain_metric("min_rsu", min_rsu, overwrite=True)
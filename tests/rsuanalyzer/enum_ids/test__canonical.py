@@ -0,0 +1,50 @@
+import random
+
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.enum_ring_ids._canonical import (
+    _canonicalize, _codes_to_ids, _ids_to_codes, _is_canonical)
+from reprod.rsuanalyzer.enum_ring_ids._id_duplicates import (
+    _enum_duplicate_ids)
+
+
+def _random_ring_ids(num_of_ligs, size, seed=0):
+    rng = random.Random(seed)
+    return [
+        "".join(
+            rng.choice("RL") + rng.choice("RL")
+            + rng.choice("FB") + rng.choice("FB")
+            for _ in range(num_of_ligs))
+        for _ in range(size)]
+
+
+def test__ids_to_codes_and__codes_to_ids():
+    codes = _ids_to_codes(["RRFFLLBB", "RLFBRLFB"])
+    assert codes.dtype == np.uint64
+    assert codes.tolist() == [0b11110000, 0b10101010]
+    assert _codes_to_ids(codes, 2) == ["RRFFLLBB", "RLFBRLFB"]
+
+
+def test__ids_to_codes_keeps_order():
+    ring_ids = sorted(_random_ring_ids(3, 100))
+    codes = _ids_to_codes(ring_ids)
+    assert np.all(np.diff(codes.astype(np.int64)) >= 0)
+
+
+def test__ids_to_codes_rejects_chain_ids():
+    with pytest.raises(ValueError):
+        _ids_to_codes(["RRFFLL"])
+
+
+@pytest.mark.parametrize("num_of_ligs", [1, 2, 3, 4])
+@pytest.mark.parametrize("theta", [None, 0, 30, 90])
+def test__canonicalize(num_of_ligs, theta):
+    ring_ids = _random_ring_ids(num_of_ligs, 100)
+    codes = _ids_to_codes(ring_ids)
+    canon = _canonicalize(codes, num_of_ligs, theta)
+    assert _codes_to_ids(canon, num_of_ligs) == [
+        max(_enum_duplicate_ids(ring_id, theta)) for ring_id in ring_ids]
+    assert np.array_equal(
+        _is_canonical(codes, num_of_ligs, theta), canon == codes)
+    assert _is_canonical(canon, num_of_ligs, theta).all()
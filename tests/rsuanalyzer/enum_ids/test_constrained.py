@@ -0,0 +1,71 @@
+import re
+from itertools import product
+
+import pytest
+
+from reprod.rsuanalyzer.enum_ring_ids.constrained import \
+    enum_constrained_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+
+
+def _units(ring_id):
+    return [ring_id[i:i+4] for i in range(0, len(ring_id), 4)]
+
+
+def _satisfies(ring_id):
+    units = _units(ring_id)
+    return all(unit[2:] in ("FF", "BB") for unit in units) \
+        and sum(unit[:2] == "LL" for unit in units) <= 1 \
+        and sum(unit[2:] == "FF" for unit in units) >= 2
+
+
+@pytest.mark.parametrize("num_of_ligs", [1, 2, 3, 4])
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test_enum_constrained_ring_ids_without_constraints(num_of_ligs, theta):
+    assert enum_constrained_ring_ids(num_of_ligs, theta=theta) \
+        == enum_ring_ids(num_of_ligs, theta)
+
+
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test_enum_constrained_ring_ids_with_pattern(theta):
+    pattern = "LL[FB]F" + "." * 8
+    assert enum_constrained_ring_ids(3, pattern, theta=theta) == {
+        ring_id for ring_id in enum_ring_ids(3, theta)
+        if re.fullmatch(pattern, ring_id)}
+
+
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test_enum_constrained_ring_ids_with_types_and_counts(theta):
+    assert enum_constrained_ring_ids(
+        4, con_types={"FF", "BB"}, max_counts={"LL": 1},
+        min_counts={"FF": 2}, theta=theta) == {
+        ring_id for ring_id in enum_ring_ids(4, theta)
+        if _satisfies(ring_id)}
+
+
+def test_enum_constrained_ring_ids_with_duplicates():
+    expected = {
+        "".join(units) for units in product(
+            ("".join(chars) for chars in product("RL", "RL", "FB", "FB")),
+            repeat=3)}
+    expected = {ring_id for ring_id in expected if _satisfies(ring_id)}
+    assert enum_constrained_ring_ids(
+        3, con_types={"FF", "BB"}, max_counts={"LL": 1},
+        min_counts={"FF": 2}, unique=False) == expected
+
+
+def test_enum_constrained_ring_ids_with_infeasible_counts():
+    assert enum_constrained_ring_ids(
+        3, lig_types={"RR"}, min_counts={"LL": 1}) == set()
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"pattern": "RRFF"},
+    {"pattern": "RRFX" * 2},
+    {"pattern": "RR[FX]F" * 2},
+    {"lig_types": {"FF"}},
+    {"max_counts": {"RF": 1}},
+])
+def test_enum_constrained_ring_ids_with_invalid_constraints(kwargs):
+    with pytest.raises(ValueError):
+        enum_constrained_ring_ids(2, **kwargs)
@@ -0,0 +1,25 @@
+import pytest
+
+from reprod.rsuanalyzer.enum_ring_ids.count_ring_ids import count_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.incremental import (
+    _enum_canonical_codes)
+
+
+@pytest.mark.parametrize("num_of_ligs", [1, 2, 3, 4])
+@pytest.mark.parametrize("theta", [None, 0, 30, 90])
+def test_count_ring_ids(num_of_ligs, theta):
+    assert count_ring_ids(num_of_ligs, theta) \
+        == len(enum_ring_ids(num_of_ligs, theta))
+
+
+@pytest.mark.parametrize("num_of_ligs", [5, 6])
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test_count_ring_ids_large(num_of_ligs, theta):
+    assert count_ring_ids(num_of_ligs, theta) \
+        == len(_enum_canonical_codes(num_of_ligs, theta))
+
+
+def test_count_ring_ids_invalid_num_of_ligs():
+    with pytest.raises(ValueError):
+        count_ring_ids(0)
@@ -0,0 +1,57 @@
+import random
+
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.enum_ring_ids._id_duplicates import (
+    _enum_duplicate_ids)
+from reprod.rsuanalyzer.enum_ring_ids.dedupe_ring_ids import dedupe_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import (
+    _enum_dup_included_ids, enum_ring_ids)
+
+
+def _random_ring_ids(num_of_ligs, size, seed=0):
+    rng = random.Random(seed)
+    return [
+        "".join(
+            rng.choice("RL") + rng.choice("RL")
+            + rng.choice("FB") + rng.choice("FB")
+            for _ in range(num_of_ligs))
+        for _ in range(size)]
+
+
+@pytest.mark.parametrize("num_of_ligs", [1, 2, 3])
+@pytest.mark.parametrize("theta", [None, 0, 30, 90])
+def test_dedupe_ring_ids_of_all_ids(num_of_ligs, theta):
+    ring_ids = sorted(_enum_dup_included_ids(num_of_ligs))
+    unique_ids, inverse = dedupe_ring_ids(ring_ids, theta)
+    assert unique_ids == sorted(enum_ring_ids(num_of_ligs, theta))
+    assert [unique_ids[i] for i in inverse] == [
+        max(_enum_duplicate_ids(ring_id, theta)) for ring_id in ring_ids]
+
+
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test_dedupe_ring_ids_with_mixed_lengths(theta):
+    ring_ids = _random_ring_ids(3, 50) + _random_ring_ids(1, 20) \
+        + _random_ring_ids(5, 50, seed=1)
+    random.Random(2).shuffle(ring_ids)
+    unique_ids, inverse = dedupe_ring_ids(ring_ids, theta)
+
+    assert inverse.shape == (len(ring_ids),)
+    assert [unique_ids[i] for i in inverse] == [
+        max(_enum_duplicate_ids(ring_id, theta)) for ring_id in ring_ids]
+    assert len(set(unique_ids)) == len(unique_ids)
+    assert unique_ids == sorted(unique_ids, key=lambda x: (len(x), x))
+
+
+def test_dedupe_ring_ids_of_no_ids():
+    unique_ids, inverse = dedupe_ring_ids([])
+    assert unique_ids == []
+    assert np.array_equal(inverse, [])
+
+
+@pytest.mark.parametrize("ring_ids", [
+    ["RRFFLL"], ["RRFF", ""], ["RRFFLLBX"], ["RRFF" * 17]])
+def test_dedupe_ring_ids_rejects_invalid_ids(ring_ids):
+    with pytest.raises(ValueError):
+        dedupe_ring_ids(ring_ids)
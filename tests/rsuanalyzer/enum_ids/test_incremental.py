@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.enum_ring_ids import incremental
+from reprod.rsuanalyzer.enum_ring_ids._canonical import _canonicalize
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.incremental import (
+    _enum_canonical_codes, enum_ring_ids_incrementally)
+
+
+@pytest.mark.parametrize("num_of_ligs", [1, 2, 3])
+@pytest.mark.parametrize("theta", [None, 0, 30, 90])
+def test_enum_ring_ids_incrementally(num_of_ligs, theta):
+    assert enum_ring_ids_incrementally(num_of_ligs, theta) \
+        == enum_ring_ids(num_of_ligs, theta)
+
+
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test__enum_canonical_codes_with_all_codes(theta):
+    all_codes = np.arange(16**5, dtype=np.uint64)
+    assert np.array_equal(
+        _enum_canonical_codes(5, theta),
+        np.unique(_canonicalize(all_codes, 5, theta)))
+
+
+def test_enum_ring_ids_incrementally_resumes(tmp_path, mocker):
+    expected = enum_ring_ids_incrementally(4, 30)
+    assert enum_ring_ids_incrementally(3, 30, cache_dir=tmp_path) \
+        == enum_ring_ids(3, 30)
+    assert sorted(os.listdir(tmp_path)) == [
+        f"ring_codes_{n}_general.npy" for n in (1, 2, 3)]
+
+    spy = mocker.spy(incremental, "_extend_canonical_codes")
+    assert enum_ring_ids_incrementally(4, 30, cache_dir=tmp_path) == expected
+    assert spy.call_count == 1
+    assert os.path.exists(tmp_path / "ring_codes_4_general.npy")
+
+
+def test_enum_ring_ids_incrementally_invalid_num_of_ligs():
+    with pytest.raises(ValueError):
+        enum_ring_ids_incrementally(0)
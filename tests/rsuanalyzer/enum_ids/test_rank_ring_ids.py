@@ -0,0 +1,49 @@
+import pytest
+
+from reprod.rsuanalyzer.enum_ring_ids._id_duplicates import (
+    _enum_duplicate_ids)
+from reprod.rsuanalyzer.enum_ring_ids.count_ring_ids import count_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.enum_ring_ids import enum_ring_ids
+from reprod.rsuanalyzer.enum_ring_ids.rank_ring_ids import (
+    ring_rank, ring_unrank, ring_unrank_range)
+
+
+@pytest.mark.parametrize("theta", [None, 0, 30, 90])
+def test_ring_rank_and_ring_unrank(theta):
+    sorted_ids = sorted(enum_ring_ids(3, theta))
+    assert ring_unrank_range(0, len(sorted_ids), 3, theta) == sorted_ids
+    for i, ring_id in enumerate(sorted_ids):
+        assert ring_rank(ring_id, theta) == i
+    for i in range(0, len(sorted_ids), 17):
+        assert ring_unrank(i, 3, theta) == sorted_ids[i]
+
+
+def test_ring_rank_of_large_ring():
+    # Too many rings of 10 ligands to enumerate.
+    ring_id = "RRFBLRBFRLFFRRFFLLBBRRFBLRBFRLFFRRFFLLBB"
+    rank = ring_rank(ring_id)
+    unique_id = ring_unrank(rank, 10)
+    assert unique_id in _enum_duplicate_ids(ring_id) | {ring_id}
+    assert ring_unrank_range(rank, rank + 3, 10)[0] == unique_id
+    n_rings = count_ring_ids(10)
+    last_ids = ring_unrank_range(n_rings - 2, n_rings, 10)
+    assert [ring_rank(ring_id) for ring_id in last_ids] == [
+        n_rings - 2, n_rings - 1]
+
+
+@pytest.mark.parametrize("theta", [None, 0, 90])
+def test_ring_rank_of_duplicates(theta):
+    rank = ring_rank("RRFBLRBF", theta)
+    for dup in _enum_duplicate_ids("RRFBLRBF", theta):
+        assert ring_rank(dup, theta) == rank
+
+
+def test_ring_unrank_out_of_range():
+    n_rings = len(enum_ring_ids(2))
+    with pytest.raises(IndexError):
+        ring_unrank(n_rings, 2)
+    with pytest.raises(IndexError):
+        ring_unrank(-1, 2)
+    with pytest.raises(IndexError):
+        ring_unrank_range(0, n_rings + 1, 2)
+
@@ -0,0 +1,20 @@
+import pytest
+from PIL import Image
+
+from reprod.rsuanalyzer.visualize_chain.animate_chain import animate_chain
+
+
+def test_animate_chain_gif(tmp_path):
+    out_path = str(tmp_path / "chain.gif")
+    assert animate_chain(
+        "RLFFRLFFRLFF", [0, 30, 60, 90], out_path=out_path, dpi=40
+        ) == out_path
+    with Image.open(out_path) as img:
+        assert img.format == "GIF"
+        assert img.n_frames == 4
+
+
+def test_animate_chain_invalid_extension(tmp_path):
+    with pytest.raises(ValueError):
+        animate_chain("RLFFRLFFRLFF", [0, 30], out_path=str(tmp_path / "a.avi"))
+
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._transforms import _encode_ids
+from reprod.rsuanalyzer.visualize_chain._ligand import (
+    _calc_c_positions_of_frags_in_lig, _hex_template)
+from reprod.rsuanalyzer.visualize_chain.carbons import (
+    _calc_global_c_positions, calc_carbon_positions,
+    calc_carbon_positions_batch)
+from reprod.rsuanalyzer.visualize_chain.metals import calc_metal_positions
+
+
+def test__hex_template():
+    hex = _hex_template(.2)
+    assert hex.shape == (7, 3)
+    assert np.allclose(np.linalg.norm(hex, axis=1), .2)
+    assert np.allclose(hex[0], hex[-1])
+
+
+def test__calc_c_positions_of_frags_in_lig_pads_edges():
+    frags = _calc_c_positions_of_frags_in_lig("RR", 30)
+    assert frags.shape == (5, 7, 3)
+    assert np.allclose(frags[3, 0], frags[0, 0])
+    assert np.allclose(frags[3, 1:], frags[1, 3])
+    assert np.allclose(frags[4, 0], frags[1, 1])
+    assert np.allclose(frags[4, 1:], frags[2, 3])
+
+
+@pytest.mark.parametrize(
+    "conf_id, theta, delta_",
+    [
+        ("RR", 30, 87),
+        ("RRFFLLBBRLFBRR", 0, 87),
+        ("RLFFRLFFRL", 34, 87),
+        ("LRBFLLFBRRBB", 90, 120),  # ring ID
+    ]
+)
+def test_calc_carbon_positions(conf_id, theta, delta_):
+    c_positions = calc_carbon_positions(conf_id, theta, delta_)
+    metal_positions = calc_metal_positions(conf_id, theta, delta_)
+    n_ligs = (len(conf_id) + 2) // 4
+    assert c_positions.shape == (n_ligs, 5, 7, 3)
+    assert metal_positions.shape == (n_ligs + 1, 3)
+
+    # The first ligand is in the global coordinate system.
+    assert np.allclose(
+        c_positions[0], _calc_c_positions_of_frags_in_lig(conf_id[:2], theta))
+
+    # The N atoms of the pyridine rings are next to the metal atoms.
+    n_of_first_pys = c_positions[:, 0, 3]
+    n_of_second_pys = c_positions[:, 2, 0]
+    assert np.allclose(
+        np.linalg.norm(n_of_first_pys - metal_positions[:-1], axis=1), .16)
+    assert np.allclose(
+        np.linalg.norm(n_of_second_pys - metal_positions[1:], axis=1), .16)
+
+
+def test_calc_carbon_positions_batch():
+    ring_ids = ["RLFFRLFFRLFF", "RRFBRLBBRRFB", "LLBBRLFFRRFB"]
+    c_positions = calc_carbon_positions_batch(ring_ids, 34, 87)
+    assert c_positions.shape == (3, 3, 5, 7, 3)
+    for ring_id, c_positions_of_ring in zip(ring_ids, c_positions):
+        assert np.allclose(
+            c_positions_of_ring, calc_carbon_positions(ring_id, 34, 87))
+
+
+def test_calc_carbon_positions_batch_no_rings():
+    with pytest.raises(ValueError):
+        calc_carbon_positions_batch([], 34)
+
+
+def test__calc_global_c_positions_over_thetas():
+    conf_ids = ["RLFFRLFFRL", "LRBFLLFBRR"]
+    thetas = np.array([0, 34, 90])
+    lig_codes, con_codes = _encode_ids(conf_ids)
+    c_positions = _calc_global_c_positions(lig_codes, con_codes, thetas, 87)
+    assert c_positions.shape == (3, 2, 3, 5, 7, 3)
+    for i, theta in enumerate(thetas):
+        for j, conf_id in enumerate(conf_ids):
+            assert np.allclose(
+                c_positions[i, j], calc_carbon_positions(conf_id, theta, 87))
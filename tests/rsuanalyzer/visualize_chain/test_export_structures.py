@@ -0,0 +1,85 @@
+from itertools import product
+
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.visualize_chain.carbons import calc_carbon_positions
+from reprod.rsuanalyzer.visualize_chain.export_structures import \
+    export_structures
+from reprod.rsuanalyzer.visualize_chain.metals import calc_metal_positions
+
+ITEMS = [
+    ("RLFFRLFFRLFF", 34, 87),
+    ("RRFFLLBBRRFFLLBB", 38, 87),
+    ("RLFFRLFFRLFF", 0, 90),
+    ("RRFBRLBBRRFBRLBB", 30, 87),
+]
+
+
+def _read_xyz_frames(path):
+    frames = []
+    with open(path) as f:
+        lines = f.read().splitlines()
+    i = 0
+    while i < len(lines):
+        n_atoms = int(lines[i])
+        comment = lines[i + 1]
+        atoms = [line.split() for line in lines[i + 2:i + 2 + n_atoms]]
+        frames.append((comment, atoms))
+        i += 2 + n_atoms
+    return frames
+
+
+def test_export_structures_xyz(tmp_path):
+    path = tmp_path / "rings.xyz"
+    n_frames = export_structures(iter(ITEMS), str(path), chunk_size=3)
+    assert n_frames == len(ITEMS)
+
+    frames = _read_xyz_frames(path)
+    assert len(frames) == len(ITEMS)
+    for (ring_id, theta, delta_), (comment, atoms) in zip(ITEMS, frames):
+        n_units = len(ring_id) // 4
+        assert comment == f"ring_id={ring_id} theta={theta} delta={delta_}"
+        assert len(atoms) == 18 * n_units + n_units + 1
+        elements = [atom[0] for atom in atoms]
+        assert elements.count("N") == 2 * n_units
+        assert elements.count("Pd") == n_units + 1
+
+        positions = np.array([atom[1:] for atom in atoms], dtype=float)
+        expected_c = calc_carbon_positions(ring_id, theta, delta_)
+        assert np.allclose(
+            positions[:6], expected_c[0, 0, :6], atol=1e-6)
+        assert np.allclose(
+            positions[-(n_units + 1):],
+            calc_metal_positions(ring_id, theta, delta_), atol=1e-6)
+
+
+def test_export_structures_extxyz(tmp_path):
+    path = tmp_path / "rings.xyz"
+    export_structures(ITEMS[:1], str(path), fmt="extxyz")
+    comment, _ = _read_xyz_frames(path)[0]
+    assert comment.startswith("Properties=species:S:1:pos:R:3 ")
+    assert "ring_id=RLFFRLFFRLFF" in comment
+
+
+def test_export_structures_pdb(tmp_path):
+    path = tmp_path / "rings.pdb"
+    export_structures(ITEMS, str(path), fmt="pdb")
+    lines = path.read_text().splitlines()
+    assert sum(line.startswith("MODEL") for line in lines) == len(ITEMS)
+    assert sum(line.startswith("ENDMDL") for line in lines) == len(ITEMS)
+    assert lines[-1] == "END"
+    hetatms = [line for line in lines if line.startswith("HETATM")]
+    assert len(hetatms) == sum(
+        19 * (len(ring_id) // 4) + 1 for ring_id, _, _ in ITEMS)
+    assert float(hetatms[0][30:38]) == pytest.approx(.56)
+
+
+def test_export_structures_parallel_is_same(tmp_path):
+    items = list(product(
+        ["RLFFRLFFRLFF", "RRFFLLBBRRFF", "LLBBRLFFRRFB"], [0, 34, 90], [87]))
+    export_structures(items, str(tmp_path / "serial.xyz"), chunk_size=2)
+    export_structures(
+        items, str(tmp_path / "parallel.xyz"), chunk_size=2, workers=2)
+    assert (tmp_path / "serial.xyz").read_text() \
+        == (tmp_path / "parallel.xyz").read_text()
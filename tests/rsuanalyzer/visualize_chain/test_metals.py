@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from reprod.rsuanalyzer.core._global_vecs_rots import \
+    _calc_global_lig_ends_in_chain
+from reprod.rsuanalyzer.core._transforms import _encode_ids
+from reprod.rsuanalyzer.visualize_chain.metals import (
+    _calc_global_metal_positions, calc_metal_positions,
+    calc_metal_positions_batch)
+
+
+@pytest.mark.parametrize("conf_id", ["RR", "RLFFRLFFRL", "RRFFLLBBRLFBLR"])
+def test_calc_metal_positions(conf_id):
+    metal_positions = calc_metal_positions(conf_id, 34, 87)
+    expected = [np.zeros(3)] + [
+        x for x, _ in _calc_global_lig_ends_in_chain(conf_id, 34, 87)]
+    assert np.allclose(metal_positions, expected)
+
+
+def test_calc_metal_positions_batch():
+    ring_ids = ["RLFFRLFFRLFF", "RRFBRLBBRRFB", "LLBBRLFFRRFB"]
+    metal_positions = calc_metal_positions_batch(ring_ids, 34, 87)
+    assert metal_positions.shape == (3, 4, 3)
+    for ring_id, metal_positions_of_ring in zip(ring_ids, metal_positions):
+        assert np.allclose(
+            metal_positions_of_ring, calc_metal_positions(ring_id, 34, 87))
+
+
+def test_calc_metal_positions_batch_different_lengths():
+    with pytest.raises(ValueError):
+        calc_metal_positions_batch(["RLFFRLFFRLFF", "RRFBRLBB"], 34)
+
+
+def test_calc_metal_positions_batch_no_rings():
+    with pytest.raises(ValueError):
+        calc_metal_positions_batch([], 34)
+
+
+def test__calc_global_metal_positions_over_thetas():
+    conf_ids = ["RLFFRLFFRL", "LRBFLLFBRR"]
+    thetas = np.array([0, 34, 90])
+    lig_codes, con_codes = _encode_ids(conf_ids)
+    metal_positions = _calc_global_metal_positions(
+        lig_codes, con_codes, thetas, 87)
+    assert metal_positions.shape == (3, 2, 4, 3)
+    for i, theta in enumerate(thetas):
+        for j, conf_id in enumerate(conf_ids):
+            assert np.allclose(
+                metal_positions[i, j],
+                calc_metal_positions(conf_id, theta, 87))
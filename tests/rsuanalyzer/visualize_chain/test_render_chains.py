@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from reprod.rsuanalyzer.visualize_chain.render_chains import render_chains
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_chains_png(tmp_path, workers):
+    paths = render_chains(
+        ["RLFFRLFFRLFF", "RRFBRLBBRRFBRLBB", "RRFFLL"], [34, 30, 0],
+        str(tmp_path), workers=workers)
+    assert paths == [
+        os.path.join(tmp_path, "visualized_RLFFRLFFRLFF_theta34.png"),
+        os.path.join(tmp_path, "visualized_RRFBRLBBRRFBRLBB_theta30.png"),
+        os.path.join(tmp_path, "visualized_RRFFLL_theta0.png"),
+    ]
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_render_chains_svg_with_names(tmp_path):
+    paths = render_chains(
+        ["RLFFRLFFRLFF"], 34, str(tmp_path), workers=1, fmt="svg",
+        names=["syn-T-1"])
+    assert paths == [os.path.join(tmp_path, "visualized_syn-T-1_theta34.svg")]
+    with open(paths[0]) as f:
+        assert "<svg" in f.read()
+
+
+def test_render_chains_length_mismatch(tmp_path):
+    with pytest.raises(ValueError):
+        render_chains(["RLFFRLFFRLFF", "RRFFLL"], [34], str(tmp_path))